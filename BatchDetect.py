@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+DETECCIÓN DE MATRÍCULAS POR LOTES (SIN INTERFAZ)
+================================================
+
+Recorre un directorio, reparte las imágenes entre varios procesos y escribe
+un resultado JSONL por imagen a medida que cada una termina.
+
+FLUJO DEL SISTEMA:
+1. Buscar imágenes de forma recursiva en el directorio de entrada
+2. Arrancar un ProcessPoolExecutor; cada proceso precarga una sola vez los
+   Haar Cascades y el lector de EasyOCR (opcionalmente desde una instantánea)
+3. Enviar las imágenes con una ventana acotada de tareas pendientes
+4. Escribir cada resultado en JSONL en cuanto está listo (orden de llegada)
+5. Informar del rendimiento en imágenes/segundo
+6. Opcionalmente, guardar una traza de tiempos por etapa (formato Chrome trace)
+   y mostrar la latencia p50/p95 de cada etapa en todo el lote
+
+Uso:
+    python BatchDetect.py <directorio> [-o resultados.jsonl] [-w 32] [-s 0.5]
+                          [--trace traza.json]
+"""
+
+import argparse
+import collections
+import contextlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif', '.bmp', '.tif', '.tiff', '.webp')
+
+# Tareas en vuelo por proceso: suficiente para no dejar procesos ociosos
+# sin acumular en memoria todas las rutas del lote
+TASKS_PER_WORKER = 4
+
+
+def find_images(root_dir):
+    """Recorre el árbol de directorios y devuelve las imágenes encontradas"""
+    for dirpath, dirnames, filenames in os.walk(root_dir):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            if filename.lower().endswith(IMAGE_EXTENSIONS):
+                yield os.path.join(dirpath, filename)
+
+
+def _init_worker(verbose, ocr=True, ocr_snapshot=False, ocr_precision=None, ocr_threads=1,
+                 ocr_languages=None):
+    """Inicializa cada proceso: un hilo por proceso y modelos precargados"""
+    import cv2
+
+    # Un hilo interno por proceso para que N procesos escalen con N núcleos
+    cv2.setNumThreads(1)
+
+    if not verbose:
+        sys.stdout = open(os.devnull, 'w')
+
+    from CascadeRegistry import preload_cascades
+    from DetectLicenseSimple import preload_easyocr_reader, set_torch_threads
+    from FastPlateOCR import get_glyph_set
+    preload_cascades()
+    set_torch_threads(ocr_threads)
+    if ocr:
+        # Glifos del OCR por plantillas: se renderizan una vez aquí y no en la primera imagen
+        get_glyph_set()
+        # Cada proceso lee sus imágenes de una en una: un solo lector por proceso
+        preload_easyocr_reader(languages=ocr_languages, snapshot=ocr_snapshot,
+                               precision=ocr_precision, threads=ocr_threads, size=1)
+
+
+def _detect_one(image_path, sensitivity, trace=False, ocr=True, cache=False, tiled=False,
+                roi=False, coarse=False, plate_threshold=None, fast_ocr=True, ocr_languages=None):
+    """[Proceso trabajador] Detecta matrículas en una imagen"""
+    from DetectLicenseSimple import OCR_PATH_STATS, detect_plates_file
+    from Instrumentation import Tracer, NULL_TRACER
+    from PlateVerifier import PLATE_SCORE_THRESHOLD
+    
+    if plate_threshold is None:
+        plate_threshold = PLATE_SCORE_THRESHOLD
+
+    tracer = Tracer() if trace else NULL_TRACER
+    paths_before = OCR_PATH_STATS.wins()
+    start = time.perf_counter()
+    # Las imágenes ya se reparten entre procesos: las teselas de cada una van en un solo hilo.
+    # Sin imagen anotada, los JPEG se decodifican directamente reducidos y en grises
+    result = detect_plates_file(image_path, sensitivity, tracer=tracer, ocr=ocr, cache=cache,
+                                tiled=tiled, cascade_workers=1, annotate=False,
+                                roi_proposals=roi, coarse_to_fine=coarse,
+                                plate_threshold=plate_threshold, fast_ocr=fast_ocr,
+                                ocr_languages=ocr_languages)
+    record = {
+        'path': image_path,
+        'success': result.success,
+        'plates': [detection.to_dict() for detection in result.detections],
+        'elapsed_s': round(time.perf_counter() - start, 4),
+    }
+    if not result.success:
+        record['error'] = result.error
+    # Rutas de OCR que ganaron en esta imagen (las detecciones de la caché no cuentan)
+    record['_ocr_paths'] = {path: wins - paths_before.get(path, 0)
+                            for path, wins in OCR_PATH_STATS.wins().items()}
+    if trace:
+        record['_trace'] = tracer.events
+    return record
+
+
+def run_batch(root_dir, output, workers=None, sensitivity=0.5, verbose=False, tracer=None,
+              ocr=True, cache=False, tiled=False, roi=False, coarse=False, plate_threshold=None,
+              fast_ocr=True, ocr_snapshot=False, ocr_precision=None, ocr_threads=1,
+              ocr_languages=None):
+    """
+    Procesa todas las imágenes de `root_dir` y escribe los resultados en `output`
+
+    Args:
+        root_dir (str): Directorio raíz con las imágenes
+        output: Fichero de texto abierto donde escribir el JSONL
+        workers (int): Número de procesos (por defecto, núcleos disponibles)
+        sensitivity (float): Sensibilidad de detección (0.0 - 1.0)
+        plate_threshold (float): Puntuación mínima del verificador rápido antes
+            del OCR (None = PLATE_SCORE_THRESHOLD, 0 = no verificar)
+        verbose (bool): Mostrar la salida detallada de cada proceso
+        tracer (Tracer): Si se indica, recibe los tiempos por etapa de todos los procesos
+        ocr (bool): Leer el texto de las matrículas (False = solo localizarlas)
+        cache (bool): Reutilizar la caché persistente de detecciones
+        tiled (bool): Procesar a resolución completa por teselas solapadas
+        roi (bool): Escanear solo las regiones candidatas (prefiltro ROI)
+        coarse (bool): Detección de grueso a fino (reducida + verificación nativa)
+        fast_ocr (bool): Leer primero por plantillas y usar EasyOCR solo si no basta
+        ocr_snapshot (bool): Cargar el lector de EasyOCR de cada proceso desde
+            una instantánea en disco (se crea la primera vez)
+        ocr_precision (str): Precisión del reconocedor, 'int8' o 'fp32'
+            (None = OCR_PRECISION)
+        ocr_threads (int): Hilos de torch por proceso (1 = no sobresuscribir
+            los núcleos cuando hay un proceso por núcleo)
+        ocr_languages (list): Idiomas del lector de EasyOCR (None = OCR_LANGUAGES)
+
+    Returns:
+        dict: Resumen con imágenes procesadas, errores, rendimiento y matrículas
+            leídas por cada ruta de OCR ('plantillas' / 'easyocr')
+    """
+    workers = workers or os.cpu_count() or 1
+    max_pending = workers * TASKS_PER_WORKER
+    images = find_images(root_dir)
+
+    processed = 0
+    failed = 0
+    ocr_paths = collections.Counter()
+    start = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(verbose, ocr, ocr_snapshot, ocr_precision,
+                                       ocr_threads, ocr_languages)) as executor:
+        pending = {}
+        exhausted = False
+        while pending or not exhausted:
+            # Rellenar la ventana de tareas pendientes
+            while not exhausted and len(pending) < max_pending:
+                image_path = next(images, None)
+                if image_path is None:
+                    exhausted = True
+                    break
+                future = executor.submit(_detect_one, image_path, sensitivity,
+                                         tracer is not None, ocr, cache, tiled, roi, coarse,
+                                         plate_threshold, fast_ocr, ocr_languages)
+                pending[future] = image_path
+
+            if not pending:
+                break
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                image_path = pending.pop(future)
+                try:
+                    record = future.result()
+                except Exception as e:
+                    record = {'path': image_path, 'success': False, 'plates': [],
+                              'error': f"Error en proceso: {str(e)}"}
+                ocr_paths.update(record.pop('_ocr_paths', {}))
+                events = record.pop('_trace', None)
+                if events and tracer is not None:
+                    tracer.extend(events)
+                if not record['success']:
+                    failed += 1
+                processed += 1
+                output.write(json.dumps(record, ensure_ascii=False) + '\n')
+            output.flush()
+
+    elapsed = time.perf_counter() - start
+    return {
+        'images': processed,
+        'failed': failed,
+        'workers': workers,
+        'elapsed_s': round(elapsed, 3),
+        'images_per_s': round(processed / elapsed, 3) if elapsed > 0 else 0.0,
+        'ocr_paths': dict(ocr_paths),
+    }
+
+
+def main(argv=None):
+    """Punto de entrada por línea de comandos"""
+    parser = argparse.ArgumentParser(
+        description="Detección de matrículas por lotes sobre un directorio")
+    parser.add_argument('directory', help="Directorio con imágenes (recursivo)")
+    parser.add_argument('-o', '--output', default='-',
+                        help="Fichero JSONL de salida ('-' = salida estándar)")
+    parser.add_argument('-w', '--workers', type=int, default=None,
+                        help="Número de procesos (por defecto, todos los núcleos)")
+    parser.add_argument('-s', '--sensitivity', type=float, default=0.5,
+                        help="Sensibilidad de detección (0.0 - 1.0)")
+    parser.add_argument('-t', '--plate-threshold', type=float, default=None,
+                        help="Puntuación mínima del verificador antes del OCR (0 = no verificar)")
+    parser.add_argument('-v', '--verbose', action='store_true',
+                        help="Mostrar la salida detallada de cada proceso")
+    parser.add_argument('--no-ocr', action='store_true',
+                        help="Solo localizar matrículas, sin leer su texto")
+    parser.add_argument('--no-fast-ocr', action='store_true',
+                        help="Leer todas las matrículas con EasyOCR (sin OCR por plantillas)")
+    parser.add_argument('--ocr-snapshot', action='store_true',
+                        help="Cargar EasyOCR desde una instantánea en disco (arranque más rápido)")
+    parser.add_argument('--ocr-precision', choices=('int8', 'fp32'), default=None,
+                        help="Precisión del reconocedor de EasyOCR en CPU (por defecto, fp32)")
+    parser.add_argument('--ocr-threads', type=int, default=1,
+                        help="Hilos de torch por proceso para el OCR")
+    parser.add_argument('--ocr-languages', nargs='+', default=None, metavar='IDIOMA',
+                        help="Idiomas del lector de EasyOCR (por defecto, en)")
+    parser.add_argument('--cache', action='store_true',
+                        help="Reutilizar detecciones de imágenes ya procesadas")
+    parser.add_argument('--tiled', action='store_true',
+                        help="Resolución completa por teselas (sin reducir a 1920x1080)")
+    parser.add_argument('--roi', action='store_true',
+                        help="Escanear solo las regiones candidatas (más rápido, puede perder matrículas)")
+    parser.add_argument('--coarse', action='store_true',
+                        help="Buscar en la imagen reducida y verificar a resolución completa")
+    parser.add_argument('--trace', default=None,
+                        help="Guardar los tiempos por etapa en formato Chrome trace")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.directory):
+        print(f"Error: no existe el directorio {args.directory}", file=sys.stderr)
+        return 1
+
+    if args.output == '-':
+        output_ctx = contextlib.nullcontext(sys.stdout)
+    else:
+        output_ctx = open(args.output, 'w', encoding='utf-8')
+
+    tracer = None
+    if args.trace:
+        from Instrumentation import Tracer
+        tracer = Tracer()
+
+    with output_ctx as output:
+        summary = run_batch(args.directory, output, args.workers,
+                            args.sensitivity, args.verbose, tracer, not args.no_ocr,
+                            args.cache, args.tiled, args.roi, args.coarse,
+                            args.plate_threshold, not args.no_fast_ocr, args.ocr_snapshot,
+                            args.ocr_precision, args.ocr_threads, args.ocr_languages)
+
+    print(f"Imágenes procesadas: {summary['images']} "
+          f"(errores: {summary['failed']}) con {summary['workers']} procesos "
+          f"en {summary['elapsed_s']:.2f}s -> {summary['images_per_s']:.2f} imágenes/s",
+          file=sys.stderr)
+    if summary['ocr_paths']:
+        print(f"Matrículas leídas por plantillas: {summary['ocr_paths'].get('plantillas', 0)}, "
+              f"por EasyOCR: {summary['ocr_paths'].get('easyocr', 0)}", file=sys.stderr)
+
+    if tracer is not None:
+        tracer.write_chrome_trace(args.trace)
+        print(f"Traza guardada en {args.trace}", file=sys.stderr)
+        for stage, stats in sorted(tracer.summary().items()):
+            print(f"  {stage:<58} n={stats['count']:<6} p50={stats['p50_s'] * 1000:8.2f}ms "
+                  f"p95={stats['p95_s'] * 1000:8.2f}ms total={stats['total_s']:.2f}s",
+                  file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,715 @@
+#!/usr/bin/env python3
+"""
+BENCHMARK DE DETECCIÓN Y OCR
+============================
+
+Mide las rutas críticas del flujo de `DetectLicenseSimple` sobre las imágenes
+de `source/Aparte/` y variantes sintéticas (escaladas y en mosaico), con
+varias sensibilidades. Funciona sin GPU ni red: el OCR solo se mide con `--ocr`.
+
+MEDICIONES:
+• Carga de cascadas: registro en frío y en caliente
+• NMS: cajas sintéticas
+• detectMultiScale por cascada y flujo completo (`detect_plates`)
+• OCR por plantillas y OCR por lotes sobre los recortes detectados: latencia,
+  matrículas resueltas sin EasyOCR y coincidencia con EasyOCR (opcional, `--ocr`)
+• Prefiltro de regiones (ROI) frente a escaneo completo: aceleración y
+  cajas conservadas (opcional, `--roi`)
+• Detección de grueso a fino frente al flujo normal (opcional, `--coarse`)
+• Teselas frente a escaneo completo en fotos mayores que TILE_SIZE:
+  cajas compartidas por ambos modos (opcional, `--tiled`)
+• Rendimiento en imágenes/segundo con 1..N procesos
+• Reconocedor de EasyOCR en int8 (cuantización dinámica) frente a fp32:
+  latencia y coincidencia de las lecturas (opcional, `--ocr-precision`)
+• Arranque en frío del lector EasyOCR en un proceso nuevo: construcción
+  normal frente a instantánea en disco (opcional, `--cold-start`)
+
+Para cada caso se informa de latencia p50/p95 y memoria pico. Los resultados
+se guardan en JSON y pueden compararse con una línea base para detectar
+regresiones.
+
+Uso:
+    python Benchmark.py [--repeat 3] [--workers 4] [--save-baseline base.json]
+    python Benchmark.py --compare base.json [--tolerance 0.2]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+import numpy as np
+
+try:
+    import resource  # Solo disponible en sistemas Unix
+except ImportError:
+    resource = None
+
+import BatchDetect
+from CascadeRegistry import CascadeRegistry, get_cascade_registry
+from DetectLicenseSimple import (
+    build_plate_variants, coarse_factor, compute_detection_params, detect_plates,
+    limit_image_size, load_image, non_max_suppression, propose_plate_regions,
+    run_cascades_coarse_to_fine, NMS_CONTAINMENT_THRESHOLD, read_plate_regions, run_cascades,
+    TILE_SIZE, default_tile_workers,
+    EASYOCR_AVAILABLE, FAST_OCR_MIN_CONFIDENCE, OCR_PATH_STATS, best_ocr_read,
+    recognize_plate_batch, set_torch_threads
+)
+from FastPlateOCR import read_plate_fast
+from PlateVerifier import verify_plate_boxes
+from ReaderSnapshot import load_reader
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+IMAGE_DIR = os.path.join(BASE_DIR, 'source', 'Aparte')
+DEFAULT_SENSITIVITIES = (0.0, 0.5, 1.0)
+
+
+# ========== CASOS DE PRUEBA ==========
+
+def build_cases(image_dir=IMAGE_DIR, synthetic=True):
+    """
+    Imágenes de prueba: las originales y, opcionalmente, variantes sintéticas
+
+    Returns:
+        list: Pares (nombre, imagen BGR)
+    """
+    cases = []
+    for filename in sorted(os.listdir(image_dir)):
+        if not filename.lower().endswith(BatchDetect.IMAGE_EXTENSIONS):
+            continue
+        img = load_image(os.path.join(image_dir, filename))
+        if img is None:
+            continue
+        name = os.path.splitext(filename)[0]
+        cases.append((name, img))
+        if synthetic:
+            cases.append((f"{name}@0.5x", cv2.resize(img, None, fx=0.5, fy=0.5,
+                                                     interpolation=cv2.INTER_AREA)))
+            cases.append((f"{name}@1.5x", cv2.resize(img, None, fx=1.5, fy=1.5,
+                                                     interpolation=cv2.INTER_CUBIC)))
+            cases.append((f"{name}@tile2x2", np.vstack([np.hstack([img, img])] * 2)))
+    return cases
+
+
+# ========== MEDICIÓN ==========
+
+def measure(fn, repeat=3, warmup=1):
+    """
+    Ejecuta `fn` varias veces y devuelve latencias y memoria pico
+
+    La memoria pico la mide tracemalloc (objetos Python y arrays de NumPy) en
+    una ejecución aparte, porque su coste distorsionaría las latencias; las
+    reservas internas de OpenCV se reflejan en `max_rss_mb` del informe.
+    """
+    for _ in range(warmup):
+        fn()
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return latency_stats(samples, peak)
+
+
+def latency_stats(samples, peak_bytes=0):
+    """p50/p95/media en milisegundos a partir de muestras en segundos"""
+    samples = sorted(samples)
+    count = len(samples)
+    return {
+        'runs': count,
+        'p50_ms': round(samples[int(0.50 * (count - 1))] * 1000, 3),
+        'p95_ms': round(samples[int(0.95 * (count - 1))] * 1000, 3),
+        'mean_ms': round(sum(samples) / count * 1000, 3),
+        'peak_mem_mb': round(peak_bytes / 2**20, 2),
+    }
+
+
+@contextlib.contextmanager
+def quiet():
+    """Silencia los mensajes de progreso de la detección"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+# ========== BENCHMARKS ==========
+
+def bench_cascade_loading(repeat):
+    """Carga de cascadas en frío (registro nuevo) y en caliente (juego libre reutilizado)"""
+    results = {}
+    results['cascade_load/cold'] = measure(
+        lambda: CascadeRegistry().checkout(), repeat)
+    registry = get_cascade_registry()
+    registry.preload()
+
+    def lease():
+        with registry.classifiers():
+            pass
+
+    results['cascade_load/warm'] = measure(lease, repeat * 100)
+    return results
+
+
+def bench_nms(repeat, sizes=(50, 500, 2000)):
+    """NMS sobre cajas aleatorias con mucho solapamiento"""
+    rng = np.random.default_rng(0)
+    results = {}
+    for n in sizes:
+        xy = rng.integers(0, 1500, size=(n, 2))
+        wh = np.column_stack([rng.integers(60, 200, n), rng.integers(20, 50, n)])
+        boxes = np.hstack([xy, wh]).astype(np.int32)
+        results[f'nms/{n}_boxes'] = measure(lambda: non_max_suppression(boxes), repeat * 10)
+    return results
+
+
+def bench_detection(cases, sensitivities, repeat, ocr=False, cascade_workers=1):
+    """Cascadas individuales y flujo completo por imagen y sensibilidad"""
+    classifiers = get_cascade_registry().checkout()
+    results = {}
+    for name, img in cases:
+        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        for sensitivity in sensitivities:
+            params = compute_detection_params(sensitivity)
+            key = f"{name}/s{sensitivity:.1f}"
+            for cascade_name, classifier in classifiers:
+                results[f"detectMultiScale/{cascade_name}/{key}"] = measure(
+                    lambda: run_cascades(gray, [(cascade_name, classifier)], params), repeat)
+            if cascade_workers > 1:
+                # Cascadas en secuencia, un hilo por cascada y escalas repartidas entre hilos
+                results[f"run_cascades/sequential/{key}"] = measure(
+                    lambda: run_cascades(gray, classifiers, params, workers=1), repeat)
+                results[f"run_cascades/threads{cascade_workers}/{key}"] = measure(
+                    lambda: run_cascades(gray, classifiers, params, workers=cascade_workers),
+                    repeat)
+                results[f"run_cascades/split{cascade_workers}/{key}"] = measure(
+                    lambda: run_cascades(gray, classifiers, params, workers=cascade_workers,
+                                         split_scales=True),
+                    repeat)
+            with quiet():
+                results[f"detect_plates/{key}"] = measure(
+                    lambda: detect_plates(img.copy(), sensitivity, ocr=ocr), repeat)
+    return results
+
+
+def box_recall(reference, boxes, min_iou=0.5, min_containment=NMS_CONTAINMENT_THRESHOLD):
+    """
+    Fracción de cajas de `reference` que siguen localizadas en `boxes`
+
+    Una caja cuenta como localizada si otra la solapa con IoU >= min_iou o si
+    la menor de las dos queda casi entera dentro de la otra (el mismo criterio
+    de "misma matrícula" que el NMS).
+    """
+    if len(reference) == 0:
+        return 1.0
+    if len(boxes) == 0:
+        return 0.0
+    a = np.asarray(reference, dtype=np.float64)[:, None, :]
+    b = np.asarray(boxes, dtype=np.float64)[None, :, :]
+    inter_w = np.clip(np.minimum(a[..., 0] + a[..., 2], b[..., 0] + b[..., 2]) -
+                      np.maximum(a[..., 0], b[..., 0]), 0, None)
+    inter_h = np.clip(np.minimum(a[..., 1] + a[..., 3], b[..., 1] + b[..., 3]) -
+                      np.maximum(a[..., 1], b[..., 1]), 0, None)
+    inter = inter_w * inter_h
+    area_a = a[..., 2] * a[..., 3]
+    area_b = b[..., 2] * b[..., 3]
+    same = ((inter / (area_a + area_b - inter) >= min_iou) |
+            (inter / np.minimum(area_a, area_b) >= min_containment))
+    return float(same.any(axis=1).mean())
+
+
+def bench_roi_proposals(cases, sensitivities, repeat):
+    """
+    Cascadas solo en las regiones propuestas frente al escaneo completo
+
+    Cada caso guarda la latencia con el prefiltro (propuesta incluida), la
+    aceleración respecto al escaneo completo, la fracción de la imagen
+    escaneada y la fracción de cajas del escaneo completo que se conservan.
+    """
+    classifiers = get_cascade_registry().checkout()
+    results = {}
+    speedups = []
+    recalls = []
+    for name, img in cases:
+        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        height, width = gray.shape[:2]
+        regions = propose_plate_regions(gray, img)
+        area = sum((x1 - x0) * (y1 - y0) for x0, y0, x1, y1 in regions) / (width * height)
+        for sensitivity in sensitivities:
+            params = compute_detection_params(sensitivity)
+            key = f"{name}/s{sensitivity:.1f}"
+            full = measure(lambda: run_cascades(gray, classifiers, params), repeat)
+            stats = measure(lambda: run_cascades(gray, classifiers, params,
+                                                 regions=propose_plate_regions(gray, img)),
+                            repeat)
+            recall = box_recall(run_cascades(gray, classifiers, params),
+                                run_cascades(gray, classifiers, params, regions=regions))
+            stats.update(
+                speedup=round(full['p50_ms'] / max(stats['p50_ms'], 1e-3), 3),
+                area=round(area, 3),
+                recall=round(recall, 3),
+            )
+            results[f"roi_proposals/{key}"] = stats
+            speedups.append(stats['speedup'])
+            recalls.append(recall)
+            print(f"  {key:<40} x{stats['speedup']:.2f} área={area:.2f} "
+                  f"cajas conservadas={recall:.2f}")
+    if speedups:
+        print(f"  Media: x{np.mean(speedups):.2f}, cajas conservadas={np.mean(recalls):.2f}")
+    return results
+
+
+def enlarged_cases(cases, tile_factor=2.0):
+    """Imágenes originales ampliadas hasta cubrir `tile_factor` teselas por lado"""
+    enlarged = []
+    for name, img in cases:
+        if '@' in name:
+            continue
+        height, width = img.shape[:2]
+        scale = max(tile_factor * TILE_SIZE[0] / width, tile_factor * TILE_SIZE[1] / height, 1.0)
+        img = cv2.resize(img, None, fx=scale, fy=scale, interpolation=cv2.INTER_CUBIC)
+        enlarged.append((f"{name}@{img.shape[1]}x{img.shape[0]}", img))
+    return enlarged
+
+
+def bench_coarse_to_fine(cases, sensitivities, repeat):
+    """
+    Grueso a fino a resolución nativa frente al flujo normal (imagen reducida)
+
+    Solo se miden los casos lo bastante grandes para la primera pasada
+    reducida; las cajas del flujo normal se llevan a coordenadas nativas
+    para calcular cuántas se conservan. En las imágenes originales ampliadas
+    (donde reducir sí pierde matrículas) se compara además con el escaneo
+    completo a resolución nativa, tras el verificador rápido en ambos casos.
+    """
+    classifiers = get_cascade_registry().checkout()
+    large = enlarged_cases(cases)
+    large_names = {name for name, _ in large}
+    results = {}
+    for name, img in cases + large:
+        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        factor = coarse_factor(gray.shape[1])
+        if factor == 1:
+            continue
+        small = limit_image_size(gray)
+        scale = gray.shape[1] / small.shape[1]
+        for sensitivity in sensitivities:
+            params = compute_detection_params(sensitivity)
+            key = f"{name}/s{sensitivity:.1f}"
+            with quiet():
+                normal = measure(lambda: run_cascades(limit_image_size(gray), classifiers, params),
+                                 repeat)
+                stats = measure(lambda: run_cascades_coarse_to_fine(gray, classifiers, params),
+                                repeat)
+                reference = np.asarray(run_cascades(small, classifiers, params),
+                                       dtype=np.float64).reshape(-1, 4) * scale
+                recall = box_recall(reference,
+                                    run_cascades_coarse_to_fine(gray, classifiers, params))
+            stats.update(
+                speedup=round(normal['p50_ms'] / max(stats['p50_ms'], 1e-3), 3),
+                factor=factor,
+                recall=round(recall, 3),
+            )
+            line = f"  {key:<40} 1/{factor} x{stats['speedup']:.2f} cajas conservadas={recall:.2f}"
+            if name in large_names:
+                with quiet():
+                    native = measure(lambda: run_cascades(gray, classifiers, params), repeat)
+                    reference = verify_plate_boxes(gray, run_cascades(gray, classifiers, params))
+                    native_recall = box_recall(
+                        reference,
+                        verify_plate_boxes(gray, run_cascades_coarse_to_fine(gray, classifiers,
+                                                                             params)))
+                stats.update(
+                    native_speedup=round(native['p50_ms'] / max(stats['p50_ms'], 1e-3), 3),
+                    native_recall=round(native_recall, 3),
+                )
+                line += (f" | nativo: x{stats['native_speedup']:.2f} "
+                         f"matrículas conservadas={native_recall:.2f}")
+            results[f"coarse_to_fine/{key}"] = stats
+            print(line)
+    return results
+
+
+def bench_tiled(cases, sensitivities, repeat, tile_factor=2.0):
+    """
+    Teselas frente a escaneo completo, ambos a resolución nativa
+
+    Cada imagen original se amplía hasta cubrir `tile_factor` teselas por
+    lado. Las cajas no tienen por qué coincidir (OpenCV redondea la pirámide
+    de cada tesela por separado): se informa de la fracción de cajas del
+    escaneo completo que conservan las teselas y de la inversa.
+    """
+    classifiers = get_cascade_registry().checkout()
+    workers = default_tile_workers()
+    results = {}
+    identical = 0
+    total = 0
+    for name, img in enlarged_cases(cases, tile_factor):
+        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        for sensitivity in sensitivities:
+            params = compute_detection_params(sensitivity)
+            key = f"{name}/s{sensitivity:.1f}"
+            full = measure(lambda: run_cascades(gray, classifiers, params), repeat)
+            stats = measure(lambda: run_cascades(gray, classifiers, params, workers=workers,
+                                                 tile_size=TILE_SIZE), repeat)
+            full_boxes = run_cascades(gray, classifiers, params)
+            tiled_boxes = run_cascades(gray, classifiers, params, workers=workers,
+                                       tile_size=TILE_SIZE)
+            recall = box_recall(full_boxes, tiled_boxes)
+            precision = box_recall(tiled_boxes, full_boxes)
+            stats.update(
+                speedup=round(full['p50_ms'] / max(stats['p50_ms'], 1e-3), 3),
+                workers=workers,
+                recall=round(recall, 3),
+                precision=round(precision, 3),
+            )
+            results[f"tiled/{key}"] = stats
+            total += 1
+            identical += recall == precision == 1.0
+            print(f"  {key:<40} completo={len(full_boxes)} teselas={len(tiled_boxes)} "
+                  f"conservadas={recall:.2f} coincidentes={precision:.2f}")
+    if total:
+        print(f"  Mismas cajas en {identical}/{total} casos")
+    return results
+
+
+def bench_ocr(cases, repeat, sensitivity=0.5):
+    """
+    OCR por plantillas y OCR por lotes de EasyOCR sobre los recortes detectados
+
+    Para las matrículas que el OCR rápido da por buenas (confianza >=
+    FAST_OCR_MIN_CONFIDENCE) se comprueba si su texto coincide con la mejor
+    lectura de EasyOCR, cuando está disponible.
+    """
+    if not EASYOCR_AVAILABLE:
+        print("EasyOCR no disponible: solo se mide el OCR por plantillas")
+    classifiers = get_cascade_registry().checkout()
+    params = compute_detection_params(sensitivity)
+    results = {}
+    for name, img in cases:
+        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        plate_variants = [build_plate_variants(gray[y:y + h, x:x + w])
+                          for x, y, w, h in run_cascades(gray, classifiers, params)]
+        if not plate_variants:
+            continue
+        binaries = [dict(variants)["Umbralización"] for variants in plate_variants]
+        key = f"{name}/{len(plate_variants)}_plates"
+        results[f"ocr_fast/{key}"] = measure(
+            lambda: [read_plate_fast(binary) for binary in binaries], repeat)
+        fast_reads = [read_plate_fast(binary) for binary in binaries]
+        accepted = [i for i, read in enumerate(fast_reads)
+                    if read.confidence >= FAST_OCR_MIN_CONFIDENCE]
+        line = f"  {key:<40} resueltas por plantillas={len(accepted)}/{len(fast_reads)}"
+
+        if EASYOCR_AVAILABLE:
+            regions = [region for variants in plate_variants for _, region in variants]
+            results[f"ocr_batch/{name}/{len(regions)}_regions"] = measure(
+                lambda: read_plate_regions(regions), repeat)
+            matches = 0
+            for i in accepted:
+                easy_reads = read_plate_regions([region for _, region in plate_variants[i]])
+                easy_best = max(easy_reads, key=lambda read: read.confidence)
+                matches += (easy_best.text.replace(" ", "") ==
+                            fast_reads[i].text.replace(" ", ""))
+            if accepted:
+                line += f" coinciden con EasyOCR={matches}/{len(accepted)}"
+        print(line)
+    return results
+
+
+def bench_ocr_precision(cases, repeat, sensitivity=0.5, threads=None):
+    """
+    Reconocedor int8 (cuantización dinámica) frente a fp32 sobre los recortes detectados
+
+    No hay etiquetas de referencia: la exactitud se mide como la fracción de
+    matrículas en las que la mejor lectura int8 coincide con la fp32.
+    """
+    if not EASYOCR_AVAILABLE:
+        print("EasyOCR no disponible: se omite la comparación int8 / fp32")
+        return {}
+    set_torch_threads(threads)
+    readers = {precision: load_reader(['en'], gpu=False, quantize=precision == 'int8',
+                                      snapshot=False)
+               for precision in ('fp32', 'int8')}
+    classifiers = get_cascade_registry().checkout()
+    params = compute_detection_params(sensitivity)
+    results = {}
+    for name, img in cases:
+        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        plate_variants = [build_plate_variants(gray[y:y + h, x:x + w])
+                          for x, y, w, h in run_cascades(gray, classifiers, params)]
+        if not plate_variants:
+            continue
+        regions = [region for variants in plate_variants for _, region in variants]
+        best = {}
+        for precision, reader in readers.items():
+            results[f"ocr_{precision}/{name}/{len(regions)}_regions"] = measure(
+                lambda: recognize_plate_batch(reader, regions), repeat)
+            reads = iter(best_ocr_read(r) for r in recognize_plate_batch(reader, regions))
+            best[precision] = [max((next(reads) for _ in variants), key=lambda read: read.confidence)
+                               for variants in plate_variants]
+        matches = sum(fp32.text == int8.text for fp32, int8 in zip(best['fp32'], best['int8']))
+        speedup = (results[f"ocr_fp32/{name}/{len(regions)}_regions"]['p50_ms'] /
+                   max(results[f"ocr_int8/{name}/{len(regions)}_regions"]['p50_ms'], 1e-6))
+        print(f"  {name:<40} int8 x{speedup:.2f} lecturas iguales a fp32={matches}/{len(plate_variants)}")
+    return results
+
+
+def bench_throughput(cases, max_workers, sensitivity=0.5, ocr=False, rounds=2):
+    """Imágenes/segundo con 1..N procesos, usando los trabajadores de BatchDetect"""
+    work_dir = tempfile.mkdtemp(prefix='autolens_bench_')
+    try:
+        paths = []
+        for index, (name, img) in enumerate(cases):
+            path = os.path.join(work_dir, f"{index:03d}.png")
+            cv2.imwrite(path, img)
+            paths.append(path)
+        paths = paths * rounds
+
+        worker_counts = sorted({1, max_workers} | {n for n in (2, 4, 8, 16, 32) if n < max_workers})
+        results = {}
+        for workers in worker_counts:
+            with ProcessPoolExecutor(max_workers=workers, initializer=BatchDetect._init_worker,
+                                     initargs=(False, ocr)) as executor:
+                # Calentar todos los procesos antes de medir
+                list(executor.map(BatchDetect._detect_one, paths[:workers],
+                                  [sensitivity] * workers, [False] * workers, [ocr] * workers))
+                start = time.perf_counter()
+                list(executor.map(BatchDetect._detect_one, paths, [sensitivity] * len(paths),
+                                  [False] * len(paths), [ocr] * len(paths)))
+                elapsed = time.perf_counter() - start
+            results[f"throughput/{workers}_workers"] = {
+                'images': len(paths),
+                'images_per_s': round(len(paths) / elapsed, 3),
+            }
+            print(f"  {workers:>2} procesos: {len(paths) / elapsed:.2f} imágenes/s")
+        return results
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+# Proceso nuevo que crea el lector y escribe los segundos de importación y de creación
+COLD_START_SCRIPT = """
+import time
+start = time.perf_counter()
+from ReaderSnapshot import load_reader
+imported = time.perf_counter()
+load_reader(['en'], gpu=False, snapshot={snapshot}, snapshot_dir={snapshot_dir!r})
+print(imported - start, time.perf_counter() - imported)
+"""
+
+
+def run_cold_start(snapshot, snapshot_dir):
+    """Segundos que tarda un proceso nuevo en crear el lector (sin contar la importación)"""
+    script = COLD_START_SCRIPT.format(snapshot=snapshot, snapshot_dir=snapshot_dir)
+    output = subprocess.run([sys.executable, '-c', script], cwd=BASE_DIR, check=True,
+                            capture_output=True, text=True).stdout
+    return float(output.split()[-1])
+
+
+def bench_cold_start(repeat):
+    """Arranque en frío del lector por proceso: construcción normal frente a instantánea"""
+    if not EASYOCR_AVAILABLE:
+        print("EasyOCR no disponible: se omite el arranque en frío del lector")
+        return {}
+    snapshot_dir = tempfile.mkdtemp(prefix='autolens_snapshot_')
+    try:
+        results = {}
+        for mode, snapshot in (('reader', False), ('snapshot', True)):
+            if snapshot:
+                run_cold_start(True, snapshot_dir)  # Crear la instantánea
+            samples = [run_cold_start(snapshot, snapshot_dir) for _ in range(repeat)]
+            results[f"cold_start/{mode}"] = latency_stats(samples)
+        speedup = (results['cold_start/reader']['p50_ms'] /
+                   max(results['cold_start/snapshot']['p50_ms'], 1e-6))
+        print(f"  lector: {results['cold_start/reader']['p50_ms']:.0f}ms, "
+              f"instantánea: {results['cold_start/snapshot']['p50_ms']:.0f}ms (x{speedup:.2f})")
+        return results
+    finally:
+        shutil.rmtree(snapshot_dir, ignore_errors=True)
+
+
+# ========== LÍNEA BASE ==========
+
+def compare_with_baseline(current, baseline, tolerance=0.2, min_delta_ms=1.0):
+    """
+    Compara los resultados con una línea base
+
+    Las diferencias de latencia menores que `min_delta_ms` se consideran ruido.
+
+    Returns:
+        list: Regresiones (caso, valor base, valor actual) más lentas que la tolerancia
+    """
+    regressions = []
+    for case, stats in current['results'].items():
+        base = baseline.get('results', {}).get(case)
+        if not base:
+            continue
+        if 'p50_ms' in stats and 'p50_ms' in base:
+            if (stats['p50_ms'] > base['p50_ms'] * (1 + tolerance)
+                    and stats['p50_ms'] - base['p50_ms'] >= min_delta_ms):
+                regressions.append((case, f"{base['p50_ms']:.2f}ms", f"{stats['p50_ms']:.2f}ms"))
+        elif 'images_per_s' in stats and 'images_per_s' in base:
+            if stats['images_per_s'] < base['images_per_s'] * (1 - tolerance):
+                regressions.append((case, f"{base['images_per_s']:.2f} img/s",
+                                    f"{stats['images_per_s']:.2f} img/s"))
+    return regressions
+
+
+def run_benchmarks(repeat=3, workers=None, sensitivities=DEFAULT_SENSITIVITIES,
+                   synthetic=True, ocr=False, cascade_workers=1, roi=False, coarse=False,
+                   cold_start=False, ocr_precision=False, tiled=False):
+    """Ejecuta todo el benchmark y devuelve un informe serializable en JSON"""
+    workers = workers or os.cpu_count() or 1
+    cases = build_cases(synthetic=synthetic)
+    print(f"Casos: {len(cases)} imágenes x {len(sensitivities)} sensibilidades")
+
+    results = {}
+    OCR_PATH_STATS.reset()
+    print("Carga de cascadas...")
+    results.update(bench_cascade_loading(repeat))
+    print("NMS...")
+    results.update(bench_nms(repeat))
+    print("Detección...")
+    results.update(bench_detection(cases, sensitivities, repeat, ocr, cascade_workers))
+    if roi:
+        print("Prefiltro de regiones (ROI)...")
+        results.update(bench_roi_proposals(cases, sensitivities, repeat))
+    if coarse:
+        print("Grueso a fino...")
+        results.update(bench_coarse_to_fine(cases, sensitivities, repeat))
+    if tiled:
+        print("Teselas frente a escaneo completo...")
+        results.update(bench_tiled(cases, sensitivities, repeat))
+    if ocr:
+        print("OCR...")
+        results.update(bench_ocr(cases, repeat))
+    if ocr_precision:
+        print("OCR int8 frente a fp32...")
+        results.update(bench_ocr_precision(cases, repeat))
+    if cold_start:
+        print("Arranque en frío del lector...")
+        results.update(bench_cold_start(repeat))
+    print("Rendimiento con varios procesos...")
+    results.update(bench_throughput(cases, workers, ocr=ocr))
+
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'opencv': cv2.__version__,
+            'numpy': np.__version__,
+            'cpu_count': os.cpu_count(),
+            'machine': platform.machine(),
+            'repeat': repeat,
+            'ocr': ocr,
+            'cascade_workers': cascade_workers,
+            'roi': roi,
+            'coarse': coarse,
+            'tiled': tiled,
+            'cold_start': cold_start,
+            'ocr_precision': ocr_precision,
+            'max_rss_mb': max_rss_mb(),
+            # Matrículas que ganó cada ruta de OCR en las detecciones de este proceso
+            'ocr_paths': OCR_PATH_STATS.wins(),
+        },
+        'results': results,
+    }
+
+
+def max_rss_mb():
+    """Memoria residente máxima del proceso (None si el sistema no lo permite)"""
+    if resource is None:
+        return None
+    # ru_maxrss está en KB en Linux y en bytes en macOS
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(max_rss / (2**20 if sys.platform == 'darwin' else 2**10), 1)
+
+
+def print_report(report):
+    for case, stats in report['results'].items():
+        if 'p50_ms' in stats:
+            print(f"  {case:<80} p50={stats['p50_ms']:9.2f}ms p95={stats['p95_ms']:9.2f}ms "
+                  f"mem={stats['peak_mem_mb']:7.2f}MB")
+        else:
+            print(f"  {case:<80} {stats['images_per_s']:9.2f} imágenes/s")
+    print(f"Memoria máxima del proceso: {report['meta']['max_rss_mb']} MB")
+    ocr_paths = report['meta'].get('ocr_paths')
+    if ocr_paths:
+        print(f"Matrículas leídas por plantillas: {ocr_paths.get('plantillas', 0)}, "
+              f"por EasyOCR: {ocr_paths.get('easyocr', 0)}")
+
+
+def main(argv=None):
+    """Punto de entrada por línea de comandos"""
+    parser = argparse.ArgumentParser(description="Benchmark de detección y OCR")
+    parser.add_argument('--repeat', type=int, default=3, help="Repeticiones por caso")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Máximo de procesos para el rendimiento (por defecto, núcleos)")
+    parser.add_argument('--sensitivity', type=float, action='append', default=None,
+                        help="Sensibilidad a medir (repetible)")
+    parser.add_argument('--no-synthetic', action='store_true',
+                        help="Solo las imágenes originales, sin variantes sintéticas")
+    parser.add_argument('--ocr', action='store_true',
+                        help="Incluir OCR (requiere EasyOCR y sus modelos descargados)")
+    parser.add_argument('--cascade-workers', type=int, default=1,
+                        help="Comparar también las cascadas con N hilos frente a secuencial")
+    parser.add_argument('--roi', action='store_true',
+                        help="Medir el prefiltro de regiones frente al escaneo completo")
+    parser.add_argument('--coarse', action='store_true',
+                        help="Medir la detección de grueso a fino frente al flujo normal")
+    parser.add_argument('--tiled', action='store_true',
+                        help="Comparar las teselas con el escaneo completo en fotos ampliadas")
+    parser.add_argument('--ocr-precision', action='store_true',
+                        help="Comparar el reconocedor int8 con el fp32 (velocidad y lecturas)")
+    parser.add_argument('--cold-start', action='store_true',
+                        help="Medir la creación del lector EasyOCR con y sin instantánea")
+    parser.add_argument('-o', '--output', default=None, help="Guardar el informe en JSON")
+    parser.add_argument('--save-baseline', default=None, help="Guardar el informe como línea base")
+    parser.add_argument('--compare', default=None, help="Comparar con una línea base JSON")
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help="Empeoramiento admitido frente a la línea base (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(args.repeat, args.workers,
+                            tuple(args.sensitivity or DEFAULT_SENSITIVITIES),
+                            not args.no_synthetic, args.ocr, args.cascade_workers, args.roi,
+                            args.coarse, args.cold_start, args.ocr_precision, args.tiled)
+    print_report(report)
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+            print(f"Informe guardado en {path}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_with_baseline(report, baseline, args.tolerance)
+        if regressions:
+            print(f"\nRegresiones respecto a {args.compare}:")
+            for case, before, after in regressions:
+                print(f"  {case}: {before} -> {after}")
+            return 1
+        print(f"\nSin regresiones respecto a {args.compare}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
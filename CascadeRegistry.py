@@ -0,0 +1,183 @@
+"""
+REGISTRO DE MODELOS HAAR CASCADE
+================================
+
+Carga los modelos XML de `platedetc/` y reparte juegos de clasificadores
+(uno por modelo) entre los hilos que detectan, en lugar de volver a
+parsearlos en cada llamada.
+
+CARACTERÍSTICAS:
+• Rutas absolutas: los modelos se resuelven respecto a este archivo, no al CWD
+• Versionado: cada modelo se identifica por (ruta absoluta, mtime)
+• Precarga: `preload()` valida y carga un juego al arrancar
+• Recarga en caliente: si un XML cambia en disco se vuelve a cargar
+• Préstamo: `cv2.CascadeClassifier` no es seguro entre hilos, así que cada
+  hilo toma prestado un juego (`with registry.classifiers() as classifiers:`)
+  y lo devuelve al terminar; el siguiente hilo, sea cual sea, lo reutiliza
+
+MEMORIA:
+Cargar un juego cuesta poco (~1.5 ms y ~1 MB), pero tras un detectMultiScale
+cada clasificador conserva los búferes de la pirámide de la imagen más grande
+que ha recorrido: ~475 MB por juego tras una imagen de 1920x1080 y ~1.6 GB
+tras una de 4520x2500. Por eso solo se guardan MAX_IDLE_SETS juegos libres;
+los demás se descartan al devolverse (y se vuelven a cargar si hacen falta).
+La memoria de trabajo de las cascadas es, como mucho, la de los juegos
+prestados a la vez (uno por hilo que detecta) más los libres.
+"""
+
+import collections
+import contextlib
+import os
+import threading
+
+import cv2  # OpenCV - Clasificadores Haar Cascade
+
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Modelos usados por la detección de matrículas (relativos a BASE_DIR)
+DEFAULT_MODEL_PATHS = (
+    'platedetc/cascade.xml',
+    'platedetc/haarcascade_licence_plate_rus_16stages.xml',
+    'platedetc/haarcascade_russian_plate_number.xml',
+)
+
+# Juegos de clasificadores libres que se conservan entre detecciones
+MAX_IDLE_SETS = 1
+
+
+class ClassifierSet(list):
+    """[OpenCV] Pares (nombre de fichero, clasificador) cargados juntos, con su versión"""
+
+    def __init__(self, classifiers, model_paths, versions):
+        super().__init__(classifiers)
+        self.model_paths = model_paths
+        self.versions = versions
+
+
+class CascadeRegistry:
+    """[OpenCV] Registro de clasificadores Haar Cascade por ruta y versión"""
+
+    def __init__(self, model_paths=DEFAULT_MODEL_PATHS, base_dir=BASE_DIR,
+                 max_idle_sets=MAX_IDLE_SETS):
+        self.model_paths = tuple(model_paths)
+        self.base_dir = base_dir
+        self.max_idle_sets = max_idle_sets
+        self._lock = threading.Lock()
+        # Juegos libres, del más antiguo al más reciente
+        self._idle = collections.deque()
+        # Versión conocida de cada modelo: ruta absoluta -> mtime
+        self._versions = {}
+
+    def resolve(self, model_path):
+        """Convierte una ruta de modelo en ruta absoluta"""
+        if os.path.isabs(model_path):
+            return model_path
+        return os.path.normpath(os.path.join(self.base_dir, model_path))
+
+    def model_version(self, model_path):
+        """Devuelve (ruta absoluta, mtime) o None si el modelo no existe"""
+        abs_path = self.resolve(model_path)
+        try:
+            return abs_path, os.stat(abs_path).st_mtime_ns
+        except OSError:
+            return None
+
+    def versions(self, model_paths=None):
+        """Versiones actuales de los modelos (útil como clave de caché)"""
+        result = []
+        for model_path in model_paths or self.model_paths:
+            version = self.model_version(model_path)
+            if version is not None:
+                result.append(version)
+        return tuple(result)
+
+    def _load(self, abs_path, mtime):
+        classifier = cv2.CascadeClassifier(abs_path)
+        if classifier.empty():
+            return None
+
+        with self._lock:
+            previous = self._versions.get(abs_path)
+            self._versions[abs_path] = mtime
+        if previous is not None and previous != mtime:
+            print(f"Modelo actualizado, recargado: {os.path.basename(abs_path)}")
+        return classifier
+
+    def _load_set(self, model_paths):
+        """[OpenCV] Juego nuevo con los modelos válidos de `model_paths`"""
+        classifiers = []
+        versions = []
+        for model_path in model_paths:
+            version = self.model_version(model_path)
+            if version is None:
+                continue
+            classifier = self._load(*version)
+            if classifier is not None:
+                classifiers.append((os.path.basename(model_path), classifier))
+                versions.append(version)
+        return ClassifierSet(classifiers, model_paths, tuple(versions))
+
+    def checkout(self, model_paths=None):
+        """
+        [OpenCV] Toma prestado un juego de clasificadores (libre o recién cargado)
+
+        Los juegos libres cuyos modelos han cambiado en disco se descartan.
+        """
+        model_paths = tuple(model_paths or self.model_paths)
+        versions = self.versions(model_paths)
+        with self._lock:
+            for classifier_set in reversed(self._idle):
+                if classifier_set.model_paths == model_paths:
+                    self._idle.remove(classifier_set)
+                    if classifier_set.versions == versions:
+                        return classifier_set
+                    break
+        return self._load_set(model_paths)
+
+    def checkin(self, classifier_set):
+        """Devuelve un juego prestado; si ya hay MAX_IDLE_SETS libres, se descarta el más antiguo"""
+        with self._lock:
+            self._idle.append(classifier_set)
+            while len(self._idle) > self.max_idle_sets:
+                self._idle.popleft()
+
+    @contextlib.contextmanager
+    def classifiers(self, model_paths=None):
+        """[OpenCV] Pares (nombre de fichero, clasificador) prestados durante el bloque `with`"""
+        classifier_set = self.checkout(model_paths)
+        try:
+            yield classifier_set
+        finally:
+            self.checkin(classifier_set)
+
+    def preload(self, model_paths=None):
+        """[OpenCV] Carga un juego por adelantado y lo deja libre; devuelve cuántos modelos hay listos"""
+        with self.classifiers(model_paths) as classifiers:
+            count = len(classifiers)
+        print(f"Modelos Haar Cascade precargados: {count}")
+        return count
+
+    def clear(self):
+        """Descarta los juegos libres y fuerza su recarga"""
+        with self._lock:
+            self._idle.clear()
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_cascade_registry():
+    """[OpenCV] Registro de modelos compartido por todo el proceso (singleton)"""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = CascadeRegistry()
+    return _registry
+
+
+def preload_cascades(model_paths=None):
+    """[OpenCV] Precarga los modelos del registro compartido"""
+    return get_cascade_registry().preload(model_paths)
@@ -22,9 +22,23 @@ ESTRUCTURA DEL CÓDIGO:
 """
 
 import cv2  # OpenCV - Procesamiento de imágenes y detección
+import collections
+import itertools
 import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 import numpy as np
 
+from CascadeRegistry import get_cascade_registry, preload_cascades
+from DetectionCache import content_hash, get_detection_cache, make_cache_key
+from DetectionResult import OCRRead, PlateDetection, DetectionResult
+from FastPlateOCR import get_glyph_set, read_plate_fast
+from Instrumentation import get_tracer
+from PlateVerifier import PLATE_SCORE_THRESHOLD, verify_plate_boxes
+from ReaderPool import MEMORY_FRACTION, ReaderPool, ReaderPoolCache, available_memory_bytes, language_key
+from ReaderSnapshot import load_reader
+
 # ========== MÓDULO OCR (EasyOCR) ==========
 # Intentar importar EasyOCR para reconocimiento de texto
 try:
@@ -35,6 +49,22 @@ except ImportError:
     EASYOCR_AVAILABLE = False
     print("EasyOCR no disponible. Instalar con: pip install easyocr")
 
+# Pillow (opcional): lee el tamaño de la imagen sin decodificarla
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+# Funciones internas de EasyOCR para reconocer varias regiones en un solo lote
+try:
+    from easyocr.config import imgH as EASYOCR_MODEL_HEIGHT
+    from easyocr.recognition import get_text as easyocr_get_text
+    from easyocr.utils import get_image_list as easyocr_get_image_list
+    EASYOCR_BATCH_AVAILABLE = True
+except ImportError:
+    EASYOCR_BATCH_AVAILABLE = False
+
 
 
 
@@ -42,54 +72,284 @@ except ImportError:
 
 
 # ========== FUNCIONES OCR ==========
-def get_easyocr_reader():
-    """[OCR] Inicializa EasyOCR reader (singleton)"""
-    if not hasattr(get_easyocr_reader, '_easyocr_reader'):
-        if EASYOCR_AVAILABLE:
-            print("Inicializando EasyOCR...")
-            get_easyocr_reader._easyocr_reader = easyocr.Reader(['en'], gpu=False)
-            print("EasyOCR listo")
-        else:
-            get_easyocr_reader._easyocr_reader = None
-    return get_easyocr_reader._easyocr_reader
+# Cargar el lector desde una instantánea en disco (`ReaderSnapshot`) en lugar
+# de construirlo desde los pesos, para acortar el arranque en frío de cada
+# proceso (medirlo con `Benchmark.py --cold-start`; si la instantánea falla,
+# se construye el lector normal)
+OCR_SNAPSHOT = False
+
+# Precisión del reconocedor en CPU: 'fp32' conserva los pesos originales e
+# 'int8' aplica cuantización dinámica a sus capas Linear y LSTM (es lo que hace
+# EasyOCR por defecto). int8 es opcional hasta que `Benchmark.py --ocr-precision`
+# muestre, en un equipo con torch, que es más rápido sin cambiar las lecturas
+OCR_PRECISIONS = ('int8', 'fp32')
+OCR_PRECISION = 'fp32'
+
+# Lectores en el pool del proceso (None = los que quepan en memoria, sin pasar
+# del número de núcleos; ver `ReaderPool.default_pool_size`)
+OCR_POOL_SIZE = None
+
+# Hilos intra-op de torch por lector (None = núcleos repartidos entre los
+# lectores si se fija OCR_POOL_SIZE; si no, el valor por defecto de torch).
+# Con varios procesos en la misma máquina conviene repartir los núcleos
+# entre ellos para no sobresuscribirlos
+OCR_TORCH_THREADS = None
+
+# Idiomas del lector por defecto; se pueden pedir otros conjuntos por llamada
+# (`ocr_languages`) y cada uno tiene su propio pool de lectores
+OCR_LANGUAGES = ('en',)
+
+# Memoria para los lectores de todos los idiomas (None = MEMORY_FRACTION de la
+# disponible). Al pedir un conjunto de idiomas nuevo sin sitio, se descartan
+# los pools usados hace más tiempo (ver `ReaderPool.ReaderPoolCache`)
+OCR_MEMORY_BUDGET = None
+
+_reader_pools = None
+_reader_pool_precision = None
+_reader_pool_lock = threading.Lock()
+
+
+def set_torch_threads(threads):
+    """
+    [OCR] Fija los hilos intra-op de torch (None = no tocar)
+    
+    torch solo admite un valor por proceso: se aplica a todos los lectores
+    del proceso, así que cada proceso trabajador fija el suyo.
+    """
+    if threads is None or not EASYOCR_AVAILABLE:
+        return
+    import torch
+    torch.set_num_threads(max(1, int(threads)))
+
+
+def get_reader_pools(snapshot=None, precision=None, threads=None, size=None, memory_budget=None):
+    """
+    [OCR] Pools de lectores EasyOCR del proceso, uno por conjunto de idiomas
+    (None si EasyOCR no está disponible)
+    
+    Los lectores se toman prestados con
+    `with get_reader_pools().reader(languages) as reader:` y se crean bajo
+    demanda dentro de OCR_MEMORY_BUDGET. Mientras haya una precarga en segundo
+    plano en marcha (`start_model_warmup`), espera a que termine en lugar de
+    cargar otro lector.
+    
+    Args (solo cuentan en la primera llamada, y valen para todos los idiomas):
+        snapshot (bool): Usar la instantánea del lector (None = OCR_SNAPSHOT)
+        precision (str): 'int8' o 'fp32' (None = OCR_PRECISION)
+        threads (int): Hilos de torch por lector (None = OCR_TORCH_THREADS)
+        size (int): Máximo de lectores por idioma (None = OCR_POOL_SIZE)
+        memory_budget (int): Bytes para los lectores de todos los idiomas
+            (None = OCR_MEMORY_BUDGET)
+    """
+    global _reader_pools, _reader_pool_precision
+    if not EASYOCR_AVAILABLE:
+        return None
+    # Mientras la precarga crea el primer lector, el pool ya existe pero está
+    # vacío: esperar a ese lector en lugar de cargar otro en este hilo
+    warmup = _warmup_future
+    if (warmup is not None and not warmup.done() and
+            threading.current_thread().name != WARMUP_THREAD_NAME):
+        wait_for_models()
+    if _reader_pools is None:
+        with _reader_pool_lock:
+            if _reader_pools is None:
+                precision = precision or OCR_PRECISION
+                if precision not in OCR_PRECISIONS:
+                    raise ValueError(f"Precisión de OCR no válida: {precision}")
+                snapshot = OCR_SNAPSHOT if snapshot is None else snapshot
+                threads = OCR_TORCH_THREADS if threads is None else threads
+                size = size or OCR_POOL_SIZE
+                
+                def create_pool(language_key):
+                    def create_reader():
+                        print(f"Inicializando EasyOCR {'+'.join(language_key)} ({precision})...")
+                        reader = load_reader(list(language_key), gpu=False,
+                                             quantize=precision == 'int8', snapshot=snapshot)
+                        print("EasyOCR listo")
+                        return reader
+                    return ReaderPool(create_reader, size, threads, set_torch_threads)
+                
+                _reader_pools = ReaderPoolCache(create_pool, memory_budget or OCR_MEMORY_BUDGET)
+                _reader_pool_precision = precision
+    return _reader_pools
+
+
+def get_reader_pool(languages=None, **pool_options):
+    """
+    [OCR] Pool de lectores de un conjunto de idiomas (None = OCR_LANGUAGES)
+    
+    Para leer, mejor `get_reader_pools().reader(languages)`: este pool puede
+    descartarse mientras se usa si otro conjunto de idiomas necesita la memoria.
+    """
+    pools = get_reader_pools(**pool_options)
+    if pools is None:
+        return None
+    return pools.get(languages or OCR_LANGUAGES)
+
+
+def preload_easyocr_reader(languages=None, **pool_options):
+    """[OCR] Crea el pool y su primer lector por adelantado (False si EasyOCR no está disponible)"""
+    pools = get_reader_pools(**pool_options)
+    if pools is None:
+        return False
+    pools.preload(languages or OCR_LANGUAGES)
+    return True
+
+
+
+
+
+# Caracteres válidos en una matrícula con alfabeto latino (limita el decodificador
+# del reconocedor). Con otros idiomas se usa `plate_allowlist(reader)`
+PLATE_ALLOWLIST = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+
+
+def plate_allowlist(reader):
+    """
+    [OCR] Caracteres válidos en una matrícula para los idiomas de un lector
+    
+    Cifras y letras de sus idiomas (`reader.lang_char`) sin las minúsculas:
+    con ('en',) es PLATE_ALLOWLIST y con ('ru',) incluye el cirílico.
+    """
+    return ''.join(sorted(c for c in set(reader.lang_char) if c.isalnum() and not c.islower()))
+
+
+def recognize_plate_text(reader, image_region, allowlist=None):
+    """
+    [OCR] Reconocimiento directo de una región que ya es una matrícula
+    
+    Omite la red de detección de texto (CRAFT) de `readtext()`: la caja de
+    texto es la región completa, así que se envía directamente al
+    reconocedor con decodificación voraz y un alfabeto de matrícula
+    (None = `plate_allowlist(reader)`).
+    """
+    if image_region.ndim == 3:
+        image_region = cv2.cvtColor(image_region, cv2.COLOR_BGR2GRAY)
+    
+    height, width = image_region.shape[:2]
+    return reader.recognize(
+        image_region,
+        horizontal_list=[[0, width, 0, height]],
+        free_list=[],
+        decoder='greedy',
+        allowlist=allowlist or plate_allowlist(reader)
+    )
+
 
+def recognize_plate_batch(reader, image_regions, allowlist=None):
+    """
+    [OCR] Reconoce varias regiones de matrícula en una sola pasada del reconocedor
+    
+    `Reader.recognize` procesa las cajas de una en una cuando se ejecuta en
+    CPU, así que aquí se preparan todas las regiones y se envían juntas a
+    `get_text` de EasyOCR, aprovechando la dimensión de lote de torch.
+    
+    Returns:
+        list: Para cada región, lista de resultados (bbox, texto, confianza)
+    """
+    if not EASYOCR_BATCH_AVAILABLE:
+        return [recognize_plate_text(reader, region, allowlist) for region in image_regions]
+    
+    image_list = []
+    owners = []
+    max_width = 0
+    for index, region in enumerate(image_regions):
+        if region.ndim == 3:
+            region = cv2.cvtColor(region, cv2.COLOR_BGR2GRAY)
+        height, width = region.shape[:2]
+        crops, crop_max_width = easyocr_get_image_list(
+            [[0, width, 0, height]], [], region, model_height=EASYOCR_MODEL_HEIGHT
+        )
+        # Las regiones demasiado estrechas no generan recorte válido
+        for crop in crops:
+            image_list.append(crop)
+            owners.append(index)
+            max_width = max(max_width, crop_max_width)
+    
+    batch_results = [[] for _ in image_regions]
+    if not image_list:
+        return batch_results
+    
+    ignore_char = ''.join(set(reader.character) - set(allowlist or plate_allowlist(reader)))
+    results = easyocr_get_text(
+        reader.character, EASYOCR_MODEL_HEIGHT, int(max_width),
+        reader.recognizer, reader.converter, image_list,
+        ignore_char, 'greedy', 5, len(image_list),
+        device=reader.device, workers=0
+    )
+    for owner, result in zip(owners, results):
+        batch_results[owner].append(result)
+    return batch_results
 
 
+def best_ocr_read(results):
+    """[OCR] Elige el resultado de EasyOCR con mayor confianza y limpia su texto"""
+    best_text = ""
+    best_confidence = 0.0
+    
+    for (bbox, text, confidence) in results:
+        clean_text = ''.join(c for c in text if c.isalnum() or c.isspace()).strip()
+        if clean_text and confidence > best_confidence:
+            best_text = clean_text
+            best_confidence = float(confidence)
+    
+    if best_text:
+        return OCRRead(best_text, best_confidence, "")
+    return OCRRead.empty()
 
 
-def extract_text_from_region(image_region):
-    """[OCR] Extrae texto de una región usando EasyOCR"""
+def read_plate_region(image_region, detect_text=False, languages=None):
+    """
+    [OCR] Lee una región con EasyOCR y devuelve un OCRRead
+    
+    Args:
+        image_region (np.ndarray): Región recortada de la matrícula
+        detect_text (bool): Ejecutar también el detector de texto de EasyOCR
+            (`readtext`). Por defecto solo se usa el reconocedor.
+        languages (tuple): Idiomas del lector (None = OCR_LANGUAGES)
+    """
     if not EASYOCR_AVAILABLE:
-        return "EasyOCR no disponible"
+        return OCRRead.empty("EasyOCR no disponible")
     
     try:
-        reader = get_easyocr_reader()
-        if reader is None:
-            return "Error inicializando EasyOCR"
-        
-        # [OCR] Ejecutar reconocimiento de texto
-        results = reader.readtext(image_region)
+        pools = get_reader_pools()
+        if pools is None:
+            return OCRRead.empty("Error inicializando EasyOCR")
         
-        if not results:
-            return "Sin texto detectado"
-        
-        # [OCR] Encontrar el mejor resultado por confianza
-        best_text = ""
-        best_confidence = 0
+        # [OCR] Ejecutar reconocimiento de texto con un lector prestado del pool
+        with pools.reader(languages or OCR_LANGUAGES) as reader:
+            if detect_text:
+                results = reader.readtext(image_region)
+            else:
+                results = recognize_plate_text(reader, image_region)
         
-        for (bbox, text, confidence) in results:
-            clean_text = ''.join(c for c in text if c.isalnum() or c.isspace()).strip()
-            if clean_text and confidence > best_confidence:
-                best_text = clean_text
-                best_confidence = confidence
+        return best_ocr_read(results)
+            
+    except Exception as e:
+        return OCRRead.empty(f"Error OCR: {str(e)}")
+
+
+def read_plate_regions(image_regions, languages=None):
+    """[OCR] Versión por lotes de read_plate_region (una llamada para todas las regiones)"""
+    if not EASYOCR_AVAILABLE:
+        return [OCRRead.empty("EasyOCR no disponible") for _ in image_regions]
+    
+    try:
+        pools = get_reader_pools()
+        if pools is None:
+            return [OCRRead.empty("Error inicializando EasyOCR") for _ in image_regions]
         
-        if best_text:
-            return f"{best_text} (conf: {best_confidence:.2f})"
-        else:
-            return "Sin texto detectado"
+        with pools.reader(languages or OCR_LANGUAGES) as reader:
+            batch_results = recognize_plate_batch(reader, image_regions)
+        return [best_ocr_read(results) for results in batch_results]
             
     except Exception as e:
-        return f"Error OCR: {str(e)}"
+        return [OCRRead.empty(f"Error OCR: {str(e)}") for _ in image_regions]
+
+
+def extract_text_from_region(image_region, detect_text=False, languages=None):
+    """[OCR] Extrae texto de una región como 'TEXTO (conf: 0.00)' (ver read_plate_region)"""
+    return str(read_plate_region(image_region, detect_text, languages))
 
 # ======================================
 
@@ -98,7 +358,295 @@ def extract_text_from_region(image_region):
 
 # ========== FUNCIONES OpenCV ==========
 
-def detect_plates_simple(image_path, sensitivity=0.5):
+# Relación de aspecto (ancho / alto) admitida para una matrícula
+PLATE_MIN_ASPECT = 2.0
+PLATE_MAX_ASPECT = 6.0
+
+# Umbrales de fusión de detecciones duplicadas (NMS)
+NMS_IOU_THRESHOLD = 0.3        # IoU a partir del cual dos cajas son la misma matrícula
+NMS_CONTAINMENT_THRESHOLD = 0.8  # Fracción de una caja contenida dentro de otra ya aceptada
+
+
+def filter_plate_boxes(boxes, min_area, min_size_w, min_size_h):
+    """
+    [NumPy] Filtra cajas (x, y, w, h) por relación de aspecto, área y tamaño mínimo
+    
+    Returns:
+        np.ndarray: Cajas que cumplen los filtros, forma (N, 4)
+    """
+    boxes = np.asarray(boxes, dtype=np.int32).reshape(-1, 4)
+    w = boxes[:, 2]
+    h = boxes[:, 3]
+    aspect_ratio = w / np.maximum(h, 1)
+    area = w * h
+    
+    # Filtros básicos para matrículas (forma rectangular)
+    keep = ((aspect_ratio >= PLATE_MIN_ASPECT) & (aspect_ratio <= PLATE_MAX_ASPECT) &
+            (area >= min_area) & (w >= min_size_w) & (h >= min_size_h))
+    return boxes[keep]
+
+
+def non_max_suppression(boxes, iou_threshold=NMS_IOU_THRESHOLD,
+                        containment_threshold=NMS_CONTAINMENT_THRESHOLD, scores=None):
+    """
+    [NumPy] Supresión de no máximos por IoU sobre cajas (x, y, w, h)
+    
+    Las cajas se recorren de mayor a menor puntuación (por defecto, el área)
+    y se descartan las que solapan con una ya aceptada, ya sea por IoU o por
+    quedar casi contenidas en ella.
+    
+    Returns:
+        np.ndarray: Cajas conservadas, ordenadas por puntuación descendente
+    """
+    boxes = np.asarray(boxes, dtype=np.int32).reshape(-1, 4)
+    if len(boxes) == 0:
+        return boxes
+    
+    x1 = boxes[:, 0].astype(np.float64)
+    y1 = boxes[:, 1].astype(np.float64)
+    x2 = x1 + boxes[:, 2]
+    y2 = y1 + boxes[:, 3]
+    areas = (x2 - x1) * (y2 - y1)
+    if scores is None:
+        scores = areas
+    
+    order = np.argsort(-np.asarray(scores, dtype=np.float64), kind='stable')
+    keep = []
+    while order.size:
+        i = order[0]
+        keep.append(i)
+        rest = order[1:]
+        
+        inter_w = np.clip(np.minimum(x2[i], x2[rest]) - np.maximum(x1[i], x1[rest]), 0, None)
+        inter_h = np.clip(np.minimum(y2[i], y2[rest]) - np.maximum(y1[i], y1[rest]), 0, None)
+        inter = inter_w * inter_h
+        iou = inter / (areas[i] + areas[rest] - inter)
+        contained = inter / np.minimum(areas[i], areas[rest])
+        
+        order = rest[(iou <= iou_threshold) & (contained <= containment_threshold)]
+    
+    return boxes[keep]
+
+
+# Confianza a partir de la cual no se prueban más variantes de una matrícula
+EARLY_EXIT_CONFIDENCE = 0.9
+
+
+class VariantStats:
+    """[OCR] Historial de qué variante de preprocesado (o ruta de OCR) gana más a menudo"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._wins = collections.Counter()
+    
+    def record_win(self, step_name):
+        """Anota que `step_name` dio el mejor resultado de una matrícula"""
+        with self._lock:
+            self._wins[step_name] += 1
+    
+    def wins(self):
+        """Copia del número de victorias por variante"""
+        with self._lock:
+            return dict(self._wins)
+    
+    def order(self, variants):
+        """Ordena las variantes de más a menos victorias (estable ante empates)"""
+        wins = self.wins()
+        return sorted(variants, key=lambda variant: -wins.get(variant[0], 0))
+    
+    def reset(self):
+        with self._lock:
+            self._wins.clear()
+
+
+# Historial compartido por todas las detecciones del proceso
+VARIANT_STATS = VariantStats()
+
+# Paso con el que se anotan las lecturas del OCR rápido por plantillas (`FastPlateOCR`)
+FAST_OCR_STEP = "Plantillas"
+
+# Idiomas con alfabeto latino (`easyocr.config.latin_lang_list`): el OCR rápido
+# solo tiene plantillas de 0-9 y A-Z, así que con cualquier otro idioma en el
+# conjunto todas las matrículas se leen con EasyOCR
+FAST_OCR_LANGUAGES = frozenset((
+    'af', 'az', 'bs', 'cs', 'cy', 'da', 'de', 'en', 'es', 'et', 'fr', 'ga', 'hr', 'hu',
+    'id', 'is', 'it', 'ku', 'la', 'lt', 'lv', 'mi', 'ms', 'mt', 'nl', 'no', 'oc', 'pi',
+    'pl', 'pt', 'ro', 'rs_latin', 'sk', 'sl', 'sq', 'sv', 'sw', 'tl', 'tr', 'uz', 'vi',
+))
+
+
+def fast_ocr_supported(languages=None):
+    """[OCR] El OCR por plantillas sirve para este conjunto de idiomas (None = OCR_LANGUAGES)"""
+    return set(languages or OCR_LANGUAGES) <= FAST_OCR_LANGUAGES
+
+
+# Confianza del OCR rápido a partir de la cual la matrícula no pasa por EasyOCR.
+# Medido en source/Aparte y source/wallpaperCoche.jpg (sensibilidades 0-0.7, con
+# y sin ROI): las lecturas correctas dan 0.72-0.99 y las erróneas hasta 0.58
+# (recortes que cortan la matrícula, logotipos y caracteres de ~15 px de altura)
+FAST_OCR_MIN_CONFIDENCE = 0.7
+
+# Veces que gana cada ruta de OCR ('plantillas' o 'easyocr'): indica con qué
+# frecuencia basta el OCR rápido. BatchDetect y Benchmark la muestran al terminar
+OCR_PATH_STATS = VariantStats()
+
+
+def record_ocr_win(best_step, best_read):
+    """
+    [OCR] Anota la ruta y la variante que ganaron en una matrícula
+    
+    Returns:
+        bool: True si la lectura es del OCR rápido por plantillas
+    """
+    if best_read.confidence <= 0:
+        return False
+    if best_step == FAST_OCR_STEP:
+        OCR_PATH_STATS.record_win('plantillas')
+        return True
+    OCR_PATH_STATS.record_win('easyocr')
+    VARIANT_STATS.record_win(best_step)
+    return False
+
+
+def build_plate_variants(plate_region):
+    """
+    [OpenCV] Genera las variantes preprocesadas de una matrícula para el OCR
+    
+    Returns:
+        list: Pares (nombre_paso, imagen) en el orden PASO 1 a PASO 4
+    """
+    # [OpenCV] PASO 1: Región original (escala de grises)
+    variants = [("Original", plate_region)]
+    
+    # [OpenCV] PASO 2: Redimensionar si es muy pequeña
+    step2_region = plate_region
+    if step2_region.shape[1] < 150:
+        resize_factor = 150 / step2_region.shape[1]
+        new_width = int(step2_region.shape[1] * resize_factor)
+        new_height = int(step2_region.shape[0] * resize_factor)
+        step2_region = cv2.resize(step2_region, (new_width, new_height), interpolation=cv2.INTER_CUBIC)
+        variants.append(("Redimensionado", step2_region))
+    
+    # [OpenCV] PASO 3: Mejorar contraste con CLAHE
+    clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8,8))
+    step3_region = clahe.apply(step2_region)
+    variants.append(("CLAHE", step3_region))
+    
+    # [OpenCV] PASO 4: Umbralización adaptativa (binarización)
+    step4_region = cv2.adaptiveThreshold(
+        step3_region, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, 
+        cv2.THRESH_BINARY, 11, 2
+    )
+    variants.append(("Umbralización", step4_region))
+    return variants
+
+
+# Tamaño máximo de la imagen procesada; las mayores se reducen
+MAX_IMAGE_WIDTH = 1920
+MAX_IMAGE_HEIGHT = 1080
+
+# Decodificación JPEG directamente a 1/2, 1/4 o 1/8 de resolución: (factor, gris) -> flag
+REDUCED_DECODE_FLAGS = {
+    (2, False): cv2.IMREAD_REDUCED_COLOR_2, (2, True): cv2.IMREAD_REDUCED_GRAYSCALE_2,
+    (4, False): cv2.IMREAD_REDUCED_COLOR_4, (4, True): cv2.IMREAD_REDUCED_GRAYSCALE_4,
+    (8, False): cv2.IMREAD_REDUCED_COLOR_8, (8, True): cv2.IMREAD_REDUCED_GRAYSCALE_8,
+}
+
+
+def target_image_size(width, height, max_size=(MAX_IMAGE_WIDTH, MAX_IMAGE_HEIGHT)):
+    """Tamaño (ancho, alto) con el que se procesa una imagen de width x height"""
+    max_width, max_height = max_size
+    if width <= max_width and height <= max_height:
+        return width, height
+    scale = min(max_width/width, max_height/height)
+    return int(width * scale), int(height * scale)
+
+
+def read_image_header(image_path):
+    """Formato y tamaño (formato, ancho, alto) leyendo solo la cabecera (None si no se puede)"""
+    if not PIL_AVAILABLE:
+        return None
+    try:
+        with Image.open(image_path) as header:
+            return header.format, header.size[0], header.size[1]
+    except Exception:
+        return None
+
+
+def choose_decode_reduction(width, height, max_size=(MAX_IMAGE_WIDTH, MAX_IMAGE_HEIGHT)):
+    """
+    Mayor factor (1, 2, 4 u 8) con el que la imagen decodificada sigue siendo
+    al menos tan grande como el tamaño de proceso, en ambas orientaciones
+    (la orientación EXIF puede girar la imagen al decodificarla)
+    """
+    for reduction in (8, 4, 2):
+        fits = True
+        for w, h in ((width, height), (height, width)):
+            target_w, target_h = target_image_size(w, h, max_size)
+            if w // reduction < target_w or h // reduction < target_h:
+                fits = False
+        if fits:
+            return reduction
+    return 1
+
+
+def load_image(image_path, grayscale=False, max_size=None, data=None):
+    """
+    [OpenCV] Carga una imagen desde disco (None si no se puede leer)
+    
+    Args:
+        grayscale (bool): Decodificar directamente en escala de grises
+        max_size (tuple): Tamaño de proceso (ancho, alto); los JPEG mayores se
+            decodifican ya reducidos a 1/2, 1/4 o 1/8 (sin pasar por la resolución completa)
+        data (np.ndarray): Contenido del fichero, si ya se leyó
+        
+    Returns:
+        np.ndarray: Imagen BGR (o en grises si `grayscale`)
+    """
+    flags = cv2.IMREAD_GRAYSCALE if grayscale else cv2.IMREAD_COLOR
+    if max_size is not None:
+        header = read_image_header(image_path)
+        if header is not None and header[0] == 'JPEG':
+            reduction = choose_decode_reduction(header[1], header[2], max_size)
+            if reduction > 1:
+                flags = REDUCED_DECODE_FLAGS[(reduction, grayscale)]
+    
+    if data is None:
+        img = cv2.imread(image_path, flags)
+        if img is not None:
+            return img
+        # Método alternativo para caracteres especiales (sin copia intermedia en bytes)
+        data = np.fromfile(image_path, dtype=np.uint8)
+    return cv2.imdecode(data, flags)
+
+
+def limit_image_size(img, tracer=None, timings=None):
+    """[OpenCV] Reduce la imagen si supera MAX_IMAGE_WIDTH x MAX_IMAGE_HEIGHT"""
+    height, width = img.shape[:2]
+    new_width, new_height = target_image_size(width, height)
+    if (new_width, new_height) == (width, height):
+        return img
+    
+    tracer = tracer or get_tracer()
+    with tracer.stage('resize', width=new_width, height=new_height) as span:
+        img = cv2.resize(img, (new_width, new_height), interpolation=cv2.INTER_AREA)
+    if timings is not None:
+        timings['resize'] = span.duration
+    return img
+
+
+def draw_detections(img, detections):
+    """[OpenCV] Dibuja el rectángulo verde y la etiqueta '#N' de cada matrícula"""
+    for index, detection in enumerate(detections, start=1):
+        x, y, w, h = detection.box
+        cv2.rectangle(img, (x, y), (x + w, y + h), (0, 255, 0), 2)
+        cv2.putText(img, f"#{index}", 
+                   (x, y-10), cv2.FONT_HERSHEY_SIMPLEX, 
+                   0.7, (0, 255, 0), 2)
+    return img
+
+
+def detect_plates_simple(image_path, sensitivity=0.5, **options):
     """
     [OpenCV + OCR] Versión simplificada de detección de matrículas
     
@@ -111,211 +659,1157 @@ def detect_plates_simple(image_path, sensitivity=0.5):
     
     Args:
         image_path (str): Ruta a la imagen a procesar
+        sensitivity (float): 0.0 = muy sensible, 1.0 = poco sensible
+        **options: Opciones adicionales de `detect_plates_file` (por defecto
+            se usa la caché de detecciones compartida)
         
     Returns:
         tuple: (imagen_procesada, lista_textos_detectados, success)
     """
+    options.setdefault('cache', True)
+    result = detect_plates_file(image_path, sensitivity, **options)
+    return result.image, result.texts(), result.success
+
+
+def detect_plates_in_image(img, sensitivity=0.5, **options):
+    """
+    [OpenCV + OCR] Igual que detect_plates_simple, pero sobre una imagen en memoria
+    
+    Returns:
+        tuple: (imagen_procesada, lista_textos_detectados, success)
+    """
+    result = detect_plates(img, sensitivity, **options)
+    return result.image, result.texts(), result.success
+
+
+def detect_plates_file(image_path, sensitivity=0.5, tracer=None, cache=False,
+                       reduced_decode=True, **options):
+    """
+    [OpenCV + OCR] Carga una imagen de disco y detecta sus matrículas
+    
+    Args:
+        cache (DetectionCache | bool): Caché persistente de detecciones
+            (True = caché compartida, False = desactivada). Si la imagen ya se
+            procesó con los mismos modelos y parámetros, se devuelven las
+            detecciones guardadas y solo se vuelve a dibujar la imagen.
+        reduced_decode (bool): Decodificar los JPEG grandes directamente a
+            escala reducida. Con `annotate=False` se decodifica además en
+            escala de grises y no se guarda ninguna copia en color.
+    
+    Returns:
+        DetectionResult: Resultado estructurado (ver `detect_plates`)
+    """
+    tracer = tracer or get_tracer()
+    if cache is True:
+        cache = get_detection_cache()
+    annotate = options.get('annotate', True)
+    # Los modos por teselas y de grueso a fino trabajan a resolución nativa
+    native = options.get('tiled', False) or options.get('coarse_to_fine', False)
+    
+    data = None
+    cache_key = None
+    entry = None
     try:
-        # [OpenCV] Configurar rutas de modelos Haar Cascade
-        model_paths = [
-            'platedetc/cascade.xml',
-            'platedetc/haarcascade_licence_plate_rus_16stages.xml',
-            'platedetc/haarcascade_russian_plate_number.xml'
-        ]
-        
-        # [OpenCV] Cargar clasificadores Haar Cascade disponibles
-        classifiers = []
-        for model_path in model_paths:
-            if os.path.exists(model_path):
-                classifier = cv2.CascadeClassifier(model_path)
-                if not classifier.empty():
-                    classifiers.append(classifier)
+        # Buscar en la caché antes de decodificar
+        if cache:
+            with tracer.stage('cache_lookup', path=image_path) as lookup_span:
+                data = np.fromfile(image_path, dtype=np.uint8)
+                cache_key = detection_cache_key(content_hash(data), sensitivity,
+                                                reduced_decode=reduced_decode, **options)
+                entry = cache.get(cache_key)
+            if entry is not None and not annotate:
+                print(f"Detecciones recuperadas de la caché: {len(entry[1])}")
+                return DetectionResult(None, entry[1], True, None, {
+                    'cache_lookup': lookup_span.duration, 'total': lookup_span.duration})
+        
+        # [OpenCV] Cargar imagen
+        max_size = None if native or not reduced_decode else (MAX_IMAGE_WIDTH, MAX_IMAGE_HEIGHT)
+        with tracer.stage('decode', path=image_path) as decode_span:
+            img = load_image(image_path, grayscale=reduced_decode and not annotate,
+                             max_size=max_size, data=data)
+        if img is None:
+            return DetectionResult.failure(f"Error: No se pudo cargar la imagen: {image_path}")
+    except Exception as e:
+        return DetectionResult.failure(f"Error al cargar imagen: {str(e)}")
+    
+    result = None
+    if entry is not None:
+        result = cached_detection(img, entry, tracer, native)
+    if result is None:
+        result = detect_plates(img, sensitivity, tracer=tracer, **options)
+        if cache_key is not None and is_cacheable(result):
+            height, width = img.shape[:2]
+            cache.put(cache_key, (width, height) if native else target_image_size(width, height),
+                      result.detections)
+    
+    result.timings['decode'] = decode_span.duration
+    if cache_key is not None:
+        result.timings['cache_lookup'] = lookup_span.duration
+    if 'total' in result.timings:
+        result.timings['total'] += result.timings['decode'] + result.timings.get('cache_lookup', 0.0)
+    return result
+
+
+def detection_cache_key(image_hash, sensitivity, early_exit_conf=EARLY_EXIT_CONFIDENCE,
+                        reorder_variants=True, ocr=True, tiled=False, annotate=True,
+                        reduced_decode=True, roi_proposals=False, coarse_to_fine=False,
+                        plate_threshold=PLATE_SCORE_THRESHOLD, fast_ocr=True,
+                        ocr_languages=None, **execution_options):
+    """
+    Clave de caché: contenido de la imagen, versiones de los modelos y parámetros
+    
+    Las opciones de ejecución que no cambian el resultado (p. ej. número de
+    hilos) no forman parte de la clave.
+    """
+    native = tiled or coarse_to_fine
+    params = dict(
+        compute_detection_params(sensitivity),
+        max_size=None if native else [MAX_IMAGE_WIDTH, MAX_IMAGE_HEIGHT],
+        tiles=[TILE_SIZE, TILE_OVERLAP] if tiled and not coarse_to_fine else None,
+        # La decodificación reducida o en grises cambia ligeramente los píxeles
+        decode=[reduced_decode and not native, reduced_decode and not annotate],
+        roi=([ROI_SCALE, ROI_MAX_REGIONS, ROI_PADDING, ROI_MIN_PADDING, ROI_COLOR_MASKS]
+             if roi_proposals and not coarse_to_fine else None),
+        coarse=([COARSE_TARGET_WIDTH, COARSE_MIN_FACTOR, COARSE_MAX_FACTOR,
+                 COARSE_NEIGHBORS_RELAX, COARSE_PADDING, COARSE_SIZE_MARGIN]
+                if coarse_to_fine else None),
+        plate_threshold=plate_threshold,
+        ocr=ocr,
+        early_exit_conf=early_exit_conf if ocr else None,
+        reorder_variants=reorder_variants if ocr else None,
+        allowlist=PLATE_ALLOWLIST if ocr else None,
+        # Precisión del lector ya creado (o la que tendrá al crearse)
+        ocr_precision=(_reader_pool_precision or OCR_PRECISION) if ocr else None,
+        ocr_languages=list(language_key(ocr_languages or OCR_LANGUAGES)) if ocr else None,
+        fast_ocr=([FAST_OCR_MIN_CONFIDENCE, len(get_glyph_set().labels)]
+                  if ocr and fast_ocr and fast_ocr_supported(ocr_languages) else None),
+    )
+    return make_cache_key(image_hash, get_cascade_registry().versions(), params)
+
+
+def is_cacheable(result):
+    """Solo se guardan resultados completos (sin errores de carga ni de OCR)"""
+    if not result.success:
+        return False
+    return not any(detection.message.startswith("Error") or
+                   detection.message == "EasyOCR no disponible" or
+                   # Lectura rápida dudosa que EasyOCR no pudo revisar
+                   (not EASYOCR_AVAILABLE and detection.variant == FAST_OCR_STEP and
+                    detection.confidence < FAST_OCR_MIN_CONFIDENCE)
+                   for detection in result.detections)
+
+
+def cached_detection(img, entry, tracer=None, native_resolution=False):
+    """
+    [OpenCV] Resultado desde una entrada de la caché, con la imagen anotada de nuevo
+    
+    Returns:
+        DetectionResult: Resultado reconstruido, o None si la entrada no encaja con la imagen
+    """
+    tracer = tracer or get_tracer()
+    start = time.perf_counter()
+    timings = {}
+    image_size, detections = entry
+    if not native_resolution:
+        img = limit_image_size(img, tracer, timings)
+    if tuple(img.shape[1::-1]) != image_size:
+        return None
+    if img.ndim == 2:
+        img = cv2.cvtColor(img, cv2.COLOR_GRAY2BGR)
+    
+    with tracer.stage('draw') as span:
+        draw_detections(img, detections)
+    timings['draw'] = span.duration
+    timings['total'] = time.perf_counter() - start
+    print(f"Detecciones recuperadas de la caché: {len(detections)}")
+    return DetectionResult(img, detections, True, None, timings)
+
+
+def compute_detection_params(sensitivity):
+    """
+    [OpenCV] Parámetros de las cascadas derivados de la sensibilidad
+    
+    (0.0 = muy sensible, 1.0 = poco sensible)
+    """
+    return {
+        'scale_factor': 1.03 + (sensitivity * 0.07),  # 1.03 a 1.1
+        'min_neighbors': int(2 + (sensitivity * 3)),   # 2 a 5
+        'min_size_w': int(20 + (sensitivity * 60)),    # 20 a 80
+        'min_size_h': int(5 + (sensitivity * 15)),     # 5 a 20
+        'min_area': int(100 + (sensitivity * 1500)),   # 100 a 1600
+    }
+
+
+# Hilos para ejecutar las cascadas a la vez (1 = una detrás de otra)
+CASCADE_WORKERS = 1
+
+_cascade_executors = {}
+_cascade_executors_lock = threading.Lock()
+
+
+def get_cascade_executor(workers):
+    """Pool de hilos compartido para las cascadas (uno por número de hilos)"""
+    with _cascade_executors_lock:
+        executor = _cascade_executors.get(workers)
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='cascade')
+            _cascade_executors[workers] = executor
+        return executor
+
+
+def scan_cascade(classifier, cascade_name, gray, params, tracer):
+    """[OpenCV] detectMultiScale de una cascada; devuelve (cajas, segundos)"""
+    with tracer.stage('detectMultiScale', cascade=cascade_name) as span:
+        plates = classifier.detectMultiScale(
+            gray, 
+            scaleFactor=params['scale_factor'],
+            minNeighbors=params['min_neighbors'],
+            minSize=(params['min_size_w'], params['min_size_h']),
+            maxSize=params.get('max_size', MAX_WINDOW_SIZE)
+        )
+    return plates, span.duration
+
+
+def scan_cascade_in_worker(cascade_name, gray, params, tracer):
+    """[OpenCV] Igual que scan_cascade, con un clasificador prestado al hilo del pool"""
+    with get_cascade_registry().classifiers() as classifiers:
+        classifier = dict(classifiers)[cascade_name]
+        return scan_cascade(classifier, cascade_name, gray, params, tracer)
+
+
+# Tamaño máximo de ventana de las cascadas
+MAX_WINDOW_SIZE = (400, 150)
+
+# Tolerancia de agrupación de detectMultiScale (GROUP_EPS en OpenCV)
+GROUP_EPS = 0.2
+
+
+def pyramid_window_sizes(window_size, scale_factor, count):
+    """[OpenCV] Tamaños de ventana de los `count` primeros niveles de la pirámide"""
+    width, height = window_size
+    sizes = []
+    factor = 1.0
+    for _ in range(count):
+        sizes.append((int(round(width * factor)), int(round(height * factor))))
+        factor *= scale_factor
+    return sizes
+
+
+def split_pyramid(window_size, image_size, params, parts):
+    """
+    [OpenCV] Reparte los niveles de la pirámide en `parts` rangos de coste parecido
+    
+    El coste de un nivel es proporcional al área de la imagen reescalada
+    (1 / factor²), así que los niveles finos se reparten entre más rangos.
+    Los cortes solo se hacen donde el ancho de ventana crece, para que
+    ningún nivel quede en dos rangos.
+    
+    Returns:
+        list: Pares (minSize, maxSize) para `detectMultiScale`
+    """
+    image_w, image_h = image_size
+    min_w, min_h = params['min_size_w'], params['min_size_h']
+    max_w, max_h = min(MAX_WINDOW_SIZE[0], image_w), min(MAX_WINDOW_SIZE[1], image_h)
+    
+    levels = []
+    factor = 1.0
+    while True:
+        width = int(round(window_size[0] * factor))
+        height = int(round(window_size[1] * factor))
+        if width > max_w or height > max_h:
+            break
+        if width >= min_w and height >= min_h:
+            levels.append(((width, height), 1.0 / (factor * factor)))
+        factor *= params['scale_factor']
+    if not levels:
+        return []
+    
+    total = sum(cost for _, cost in levels)
+    ranges = []
+    start = 0
+    accumulated = 0.0
+    for index, ((width, _), cost) in enumerate(levels):
+        accumulated += cost
+        is_last = index == len(levels) - 1
+        can_cut = not is_last and levels[index + 1][0][0] > width
+        if is_last or (can_cut and len(ranges) < parts - 1 and
+                       accumulated >= total * (len(ranges) + 1) / parts):
+            ranges.append((levels[start][0], levels[index][0]))
+            start = index + 1
+    return ranges
+
+
+def scan_pyramid_range(cascade_name, gray, params, min_size, max_size, tracer):
+    """[OpenCV] Ventanas sin agrupar de un rango de la pirámide (clasificador prestado)"""
+    with get_cascade_registry().classifiers() as classifiers:
+        classifier = dict(classifiers)[cascade_name]
+        with tracer.stage('detectMultiScale', cascade=cascade_name, min_size=list(min_size)) as span:
+            windows = classifier.detectMultiScale(
+                gray,
+                scaleFactor=params['scale_factor'],
+                minNeighbors=0,
+                minSize=min_size,
+                maxSize=max_size
+            )
+    return windows, span.duration
+
+
+def run_cascades_split(gray, classifiers, params, workers, tracer):
+    """
+    [OpenCV] Cascadas con la pirámide de escalas repartida entre hilos
+    
+    Cada hilo recorre un rango de escalas sin agrupar (minNeighbors=0); las
+    ventanas de todos los rangos de una cascada se agrupan después con
+    `groupRectangles(minNeighbors)`, igual que hace `detectMultiScale`, así
+    que el resultado coincide con el recorrido completo.
+    
+    Returns:
+        list: Para cada cascada, (cajas agrupadas, segundos sumados de sus rangos)
+    """
+    executor = get_cascade_executor(workers)
+    image_size = gray.shape[1::-1]
+    jobs = []
+    for cascade_name, classifier in classifiers:
+        window_size = tuple(classifier.getOriginalWindowSize())
+        for min_size, max_size in split_pyramid(window_size, image_size, params, workers):
+            jobs.append((cascade_name, executor.submit(
+                scan_pyramid_range, cascade_name, gray, params, min_size, max_size, tracer)))
+    
+    scans = []
+    for cascade_name, _ in classifiers:
+        windows = []
+        duration = 0.0
+        for job_name, future in jobs:
+            if job_name == cascade_name:
+                found, seconds = future.result()
+                duration += seconds
+                if len(found):
+                    windows.extend(np.asarray(found, dtype=np.int32).reshape(-1, 4).tolist())
+        plates = ()
+        if windows:
+            plates, _ = cv2.groupRectangles(windows, params['min_neighbors'], GROUP_EPS)
+        scans.append((plates, duration))
+    return scans
+
+
+# Modo por teselas: tamaño de tesela y solape (el solape cubre la ventana
+# máxima, así que toda matrícula cabe entera en al menos una tesela).
+#
+# Memoria: cada hilo toma prestado un juego de cascadas que retiene los
+# búferes de una tesela. En seat.jpg ampliada a 4520x2500 el pico es de
+# ~490 MB con 1 hilo, ~870 MB con 2 y ~1240 MB con 3 (~375 MB por hilo),
+# frente a ~2.5 GB del escaneo completo. El límite real es, por tanto,
+# TILE_SET_BYTES por hilo más la imagen, no el tamaño de la imagen.
+#
+# Resultados: no son idénticos a los del escaneo completo. OpenCV redondea
+# el tamaño de cada nivel de la pirámide por imagen, así que una tesela
+# muestrea posiciones y escalas ligeramente distintas y las cascadas Haar
+# aceptan otras ventanas (p. ej. seat.jpg a 4520x2500 y sensibilidad 0.5:
+# 1 caja completa frente a 4 por teselas). `Benchmark.py --tiled` mide
+# cuántas cajas comparten ambos modos.
+TILE_SIZE = (1920, 1080)
+TILE_OVERLAP = MAX_WINDOW_SIZE
+
+# Memoria de trabajo de un hilo de teselas y máximo de hilos por defecto
+TILE_SET_BYTES = 450 * 2**20
+TILE_MAX_WORKERS = 2
+
+# Hilos para las teselas (None = `default_tile_workers()`)
+TILE_WORKERS = None
+
+
+def default_tile_workers(set_bytes=TILE_SET_BYTES, memory_fraction=MEMORY_FRACTION):
+    """Hilos de teselas que caben en la memoria disponible, entre 1 y TILE_MAX_WORKERS"""
+    cpus = os.cpu_count() or 1
+    available = available_memory_bytes()
+    if available is None:
+        return 1
+    return max(1, min(cpus, TILE_MAX_WORKERS, int(available * memory_fraction // set_bytes)))
+
+
+def iter_tiles(width, height, tile_size=TILE_SIZE, overlap=TILE_OVERLAP):
+    """Rectángulos (x0, y0, x1, y1) de teselas solapadas que cubren la imagen"""
+    def spans(length, tile, overlap):
+        # Mínimo número de teselas de como mucho `tile` píxeles con `overlap`
+        # de solape, reducidas y repartidas para cubrir justo la longitud
+        if length <= tile:
+            return [(0, length)]
+        count = -(-(length - overlap) // max(1, tile - overlap))
+        size = -(-(length + (count - 1) * overlap) // count)
+        step = (length - size) / (count - 1)
+        return [(int(round(i * step)), size) for i in range(count)]
+    
+    for y0, tile_h in spans(height, tile_size[1], overlap[1]):
+        for x0, tile_w in spans(width, tile_size[0], overlap[0]):
+            yield x0, y0, x0 + tile_w, y0 + tile_h
+
+
+def scan_tile(tile, gray, params, tracer):
+    """[OpenCV] Todas las cascadas sobre una tesela, con cajas en coordenadas globales"""
+    x0, y0, x1, y1 = tile
+    tile_gray = gray[y0:y1, x0:x1]
+    scans = []
+    with get_cascade_registry().classifiers() as classifiers:
+        for cascade_name, classifier in classifiers:
+            plates, duration = scan_cascade(classifier, cascade_name, tile_gray, params, tracer)
+            plates = np.asarray(plates, dtype=np.int32).reshape(-1, 4)
+            plates[:, 0] += x0
+            plates[:, 1] += y0
+            scans.append((cascade_name, plates, duration))
+    return scans
+
+
+def run_cascades_in_regions(gray, classifiers, params, workers, tracer, regions):
+    """
+    [OpenCV] Cascadas sobre regiones (x0, y0, x1, y1) de la imagen: teselas o ROI
+    
+    Las regiones son vistas de la imagen (sin copias) y como mucho hay
+    `2 * workers` encoladas; solo `workers` se escanean a la vez, cada una
+    con un juego de cascadas prestado, así que la memoria de trabajo de las
+    cascadas es `workers` juegos del tamaño de región, no de la imagen. Las cajas repetidas
+    en los solapes se fusionan después con el NMS de `run_cascades`.
+    
+    `params` puede ser un único diccionario para todas las regiones o una
+    lista con uno por región (p. ej. rangos de tamaño distintos).
+    
+    Returns:
+        list: Para cada cascada, (cajas en coordenadas globales, segundos sumados)
+    """
+    executor = get_cascade_executor(workers)
+    found = {cascade_name: [] for cascade_name, _ in classifiers}
+    durations = {cascade_name: 0.0 for cascade_name, _ in classifiers}
+    
+    def collect(future):
+        for cascade_name, plates, duration in future.result():
+            if cascade_name in found:
+                durations[cascade_name] += duration
+                if len(plates):
+                    found[cascade_name].append(plates)
+    
+    if isinstance(params, dict):
+        params = itertools.repeat(params)
+    pending = collections.deque()
+    for region, region_params in zip(regions, params):
+        if len(pending) >= 2 * workers:
+            collect(pending.popleft())
+        pending.append(executor.submit(scan_tile, region, gray, region_params, tracer))
+    while pending:
+        collect(pending.popleft())
+    
+    return [
+        (np.concatenate(found[cascade_name]) if found[cascade_name] else (), durations[cascade_name])
+        for cascade_name, _ in classifiers
+    ]
+
+
+# ========== PROPUESTA DE REGIONES (ROI) ==========
+# Prefiltro barato antes de las cascadas: busca zonas con muchos bordes
+# verticales de caracteres oscuros sobre fondo claro (blackhat + Sobel) y
+# solo escanea esas zonas con margen. En source/Aparte (sensibilidades 0.2,
+# 0.5 y 0.8) es ~1.5x más rápido que el escaneo completo y conserva ~90% de
+# sus cajas (las perdidas son sobre todo falsos positivos). Con menos margen
+# se gana más velocidad a costa de perder matrículas (ver `Benchmark.py --roi`);
+# las máscaras de color reducen aún más el área pero pierden bastantes más
+# matrículas, por eso están desactivadas por defecto.
+
+# La propuesta se calcula a esta escala, sin superar esta anchura de trabajo
+ROI_SCALE = 0.5
+ROI_MAX_WORK_WIDTH = 960
+
+ROI_BLACKHAT_KERNEL = (13, 5)
+ROI_MIN_SIZE = (10, 3)          # Componente mínima (a la escala de trabajo)
+ROI_MIN_ASPECT = 1.2
+ROI_MAX_ASPECT = 10.0
+ROI_MAX_REGIONS = 30            # Componentes con más energía de bordes que se conservan
+
+# Margen alrededor de cada componente: (ancho, alto) en múltiplos de su
+# tamaño y mínimo en píxeles de la imagen original. Las cascadas necesitan
+# contexto alrededor de la matrícula para reunir suficientes vecinos.
+ROI_PADDING = (1.5, 3.0)
+ROI_MIN_PADDING = 64
+
+# Exigir además fondo blanco o amarillo (HSV) cuando la imagen es en color
+ROI_COLOR_MASKS = False
+ROI_WHITE_RANGE = ((0, 0, 120), (180, 70, 255))
+ROI_YELLOW_RANGE = ((15, 80, 100), (40, 255, 255))
+
+
+def merge_regions(regions):
+    """
+    Fusiona pares de regiones (x0, y0, x1, y1) mientras sale más barato escanearlas juntas
+    
+    Dos regiones se fusionan si el rectángulo que las engloba no tiene más
+    área que ambas por separado; así las regiones solapadas no se escanean dos
+    veces pero tampoco se encadenan hasta cubrir la imagen entera.
+    """
+    def area(region):
+        return (region[2] - region[0]) * (region[3] - region[1])
+    
+    regions = [tuple(region) for region in regions]
+    merged = True
+    while merged:
+        merged = False
+        for i, j in itertools.combinations(range(len(regions)), 2):
+            a, b = regions[i], regions[j]
+            union = (min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3]))
+            if area(union) <= area(a) + area(b):
+                regions[i] = union
+                del regions[j]
+                merged = True
+                break
+    return regions
+
+
+def propose_plate_regions(gray, img_bgr=None, color_masks=None):
+    """
+    [OpenCV] Regiones candidatas a contener matrículas, para acotar las cascadas
+    
+    1. Reducir la imagen a la escala de trabajo
+    2. Blackhat: caracteres oscuros sobre fondo claro
+    3. Sobel horizontal: bordes verticales de los caracteres
+    4. Suavizado, cierre y umbral de Otsu
+    5. (Opcional) Fondo blanco o amarillo en HSV
+    6. Componentes conexas con forma y tamaño de matrícula (las ROI_MAX_REGIONS
+       con más bordes), con margen y fusionadas
+    
+    Args:
+        gray (np.ndarray): Imagen en escala de grises
+        img_bgr (np.ndarray): Imagen en color (solo para las máscaras de color)
+        color_masks (bool): Usar las máscaras de color (por defecto ROI_COLOR_MASKS)
+        
+    Returns:
+        list: Regiones (x0, y0, x1, y1) en coordenadas de `gray` (vacía si no hay candidatas)
+    """
+    height, width = gray.shape[:2]
+    scale = min(ROI_SCALE, ROI_MAX_WORK_WIDTH / width)
+    small_size = (max(1, int(width * scale)), max(1, int(height * scale)))
+    small = cv2.resize(gray, small_size, interpolation=cv2.INTER_AREA)
+    
+    kernel = cv2.getStructuringElement(cv2.MORPH_RECT, ROI_BLACKHAT_KERNEL)
+    blackhat = cv2.morphologyEx(small, cv2.MORPH_BLACKHAT, kernel)
+    edges = np.abs(cv2.Sobel(blackhat, cv2.CV_32F, 1, 0, ksize=-1))
+    edges = cv2.normalize(edges, None, 0, 255, cv2.NORM_MINMAX).astype(np.uint8)
+    edges = cv2.GaussianBlur(edges, (5, 5), 0)
+    edges = cv2.morphologyEx(edges, cv2.MORPH_CLOSE, kernel)
+    _, mask = cv2.threshold(edges, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
+    
+    if color_masks is None:
+        color_masks = ROI_COLOR_MASKS
+    if color_masks and img_bgr is not None and img_bgr.ndim == 3:
+        hsv = cv2.cvtColor(cv2.resize(img_bgr, small_size, interpolation=cv2.INTER_AREA),
+                           cv2.COLOR_BGR2HSV)
+        background = cv2.bitwise_or(cv2.inRange(hsv, *ROI_WHITE_RANGE),
+                                    cv2.inRange(hsv, *ROI_YELLOW_RANGE))
+        background = cv2.dilate(background, cv2.getStructuringElement(cv2.MORPH_RECT, (9, 5)))
+        mask = cv2.bitwise_and(mask, background)
+    
+    mask = cv2.erode(mask, None, iterations=1)
+    mask = cv2.dilate(mask, None, iterations=2)
+    count, labels, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=8)
+    energy = np.bincount(labels.ravel(), weights=edges.ravel(), minlength=count)
+    
+    # Componentes con forma y tamaño de matrícula, de más a menos energía de bordes
+    max_w, max_h = MAX_WINDOW_SIZE[0] * scale, MAX_WINDOW_SIZE[1] * scale
+    components = []
+    for label in range(1, count):
+        x, y, w, h, _ = stats[label]
+        if not (ROI_MIN_SIZE[0] <= w <= max_w and ROI_MIN_SIZE[1] <= h <= max_h):
+            continue
+        if not ROI_MIN_ASPECT <= w / h <= ROI_MAX_ASPECT:
+            continue
+        components.append((energy[label], x, y, w, h))
+    components.sort(reverse=True)
+    
+    regions = []
+    for _, x, y, w, h in components[:ROI_MAX_REGIONS]:
+        x, y, w, h = x / scale, y / scale, w / scale, h / scale
+        pad_x = max(ROI_MIN_PADDING, ROI_PADDING[0] * w)
+        pad_y = max(ROI_MIN_PADDING, ROI_PADDING[1] * h)
+        regions.append((max(0, int(x - pad_x)), max(0, int(y - pad_y)),
+                        min(width, int(x + w + pad_x)), min(height, int(y + h + pad_y))))
+    return merge_regions(regions)
+
+
+def run_cascades(gray, classifiers, params, tracer=None, timings=None, workers=None,
+                 split_scales=False, tile_size=None, regions=None):
+    """
+    [OpenCV + NumPy] Ejecuta las cascadas, filtra por forma y fusiona con NMS
+    
+    Args:
+        gray (np.ndarray): Imagen en escala de grises
+        classifiers (list): Pares (nombre, clasificador) del registro
+        params (dict): Resultado de `compute_detection_params`
+        workers (int): Hilos para ejecutar las cascadas a la vez (por defecto
+            CASCADE_WORKERS). `detectMultiScale` libera el GIL; cada hilo toma
+            prestado su propio juego de clasificadores. El resultado es idéntico
+            al secuencial.
+        split_scales (bool): Repartir también la pirámide de escalas de cada
+            cascada entre los hilos (latencia de una sola imagen muy grande)
+        tile_size (tuple): Si se indica, procesar la imagen por teselas
+            solapadas de ese tamaño, repartidas entre los hilos
+        regions (list): Si se indica, escanear solo estas regiones
+            (x0, y0, x1, y1), p. ej. las de `propose_plate_regions`
+        
+    Returns:
+        np.ndarray: Cajas (x, y, w, h) finales, forma (N, 4)
+    """
+    tracer = tracer or get_tracer()
+    timings = timings if timings is not None else {}
+    workers = CASCADE_WORKERS if workers is None else workers
+    
+    # [OpenCV] Detectar regiones de matrículas con Haar Cascades
+    if regions is not None:
+        with tracer.stage('cascades', workers=workers, regions=len(regions)) as span:
+            scans = run_cascades_in_regions(gray, classifiers, params, max(workers, 1), tracer,
+                                            regions)
+        timings['cascades'] = span.duration
+    elif tile_size is not None:
+        height, width = gray.shape[:2]
+        with tracer.stage('cascades', workers=workers, tiled=True) as span:
+            scans = run_cascades_in_regions(gray, classifiers, params, max(workers, 1), tracer,
+                                            iter_tiles(width, height, tile_size))
+        timings['cascades'] = span.duration
+    elif workers > 1 and split_scales:
+        with tracer.stage('cascades', workers=workers, split_scales=True) as span:
+            scans = run_cascades_split(gray, classifiers, params, workers, tracer)
+        timings['cascades'] = span.duration
+    elif workers > 1 and len(classifiers) > 1:
+        with tracer.stage('cascades', workers=workers) as span:
+            executor = get_cascade_executor(workers)
+            futures = [executor.submit(scan_cascade_in_worker, cascade_name, gray, params, tracer)
+                       for cascade_name, _ in classifiers]
+            # Mismo orden que el recorrido secuencial
+            scans = [future.result() for future in futures]
+        timings['cascades'] = span.duration
+    else:
+        scans = [scan_cascade(classifier, cascade_name, gray, params, tracer)
+                 for cascade_name, classifier in classifiers]
+        timings['cascades'] = sum(duration for _, duration in scans)
+    
+    return merge_cascade_scans(classifiers, scans, params, tracer, timings)
+
+
+def merge_cascade_scans(classifiers, scans, params, tracer, timings):
+    """[NumPy] Junta las cajas de todas las cascadas, filtra por forma y aplica NMS"""
+    all_detections = []
+    for (cascade_name, _), (plates, duration) in zip(classifiers, scans):
+        timings[f'cascade:{cascade_name}'] = duration
+        if len(plates):
+            all_detections.append(plates)
+    
+    # [NumPy] Filtrar por forma y tamaño, y fusionar solapamientos con NMS por IoU
+    with tracer.stage('nms') as span:
+        all_detections = np.concatenate(all_detections) if all_detections else np.empty((0, 4), np.int32)
+        all_detections = filter_plate_boxes(all_detections, params['min_area'],
+                                            params['min_size_w'], params['min_size_h'])
+        boxes = non_max_suppression(all_detections)
+    timings['nms'] = span.duration
+    return boxes
+
+
+
+# ========== DETECCIÓN DE GRUESO A FINO ==========
+# Primera pasada rápida sobre la imagen reducida 2x con parámetros
+# permisivos; segunda pasada a resolución nativa solo en ventanas alrededor
+# de cada acierto y con un rango de tamaños próximo al suyo, para ajustar la
+# caja. El OCR lee el recorte a resolución nativa.
+#
+# La segunda pasada no sirve para descartar: al recortar la ventana, OpenCV
+# redondea otra pirámide y las cascadas pueden no repetir un acierto que el
+# escaneo completo sí da. Los aciertos gruesos que no se confirman se
+# conservan (reescalados) y los descarta, si procede, el verificador rápido.
+#
+# Compromiso recall / velocidad: las matrículas que en la imagen reducida
+# quedan por debajo de la ventana mínima de las cascadas (unos 64x16) no se
+# detectan, es decir, las de menos de ~64 * factor píxeles de ancho. Con
+# factor 4 eso eran ~256 px y en fotos ampliadas a 4K se perdían la mayoría
+# (seat.jpg a 4520x2500, sensibilidad 0.3: 1 de 4 matrículas verificadas
+# del escaneo nativo). Con factor 2 y los aciertos sin confirmar, en las
+# fotos de source/Aparte ampliadas a ~4K se conservan ~72% de las cajas
+# verificadas del escaneo nativo (antes ~57%) y es ~3x más rápido que ese
+# escaneo (antes ~9x). `Benchmark.py --coarse` lo mide. Las imágenes que no
+# llegan a reducirse COARSE_MIN_FACTOR veces se procesan en una sola pasada.
+
+COARSE_TARGET_WIDTH = 1280      # Anchura aproximada de la imagen reducida
+COARSE_MIN_FACTOR = 2
+COARSE_MAX_FACTOR = 2
+COARSE_NEIGHBORS_RELAX = 2      # Vecinos de menos exigidos en la primera pasada
+
+# Margen de la ventana de verificación, en múltiplos del tamaño de la caja
+COARSE_PADDING = (0.5, 1.0)
+# Rango de tamaños verificado: de caja / margen a caja * margen
+COARSE_SIZE_MARGIN = 1.5
+
+
+def coarse_factor(width):
+    """
+    Factor de reducción entero de la primera pasada para una imagen de `width` píxeles
+    
+    Devuelve 1 si la imagen es demasiado pequeña para reducirla COARSE_MIN_FACTOR veces.
+    """
+    factor = min(COARSE_MAX_FACTOR, int(round(width / COARSE_TARGET_WIDTH)))
+    return factor if factor >= COARSE_MIN_FACTOR else 1
+
+
+def coarse_params(params, factor):
+    """[OpenCV] Parámetros permisivos para la imagen reducida `factor` veces"""
+    return dict(
+        params,
+        min_neighbors=max(1, params['min_neighbors'] - COARSE_NEIGHBORS_RELAX),
+        min_size_w=max(1, int(params['min_size_w'] / factor)),
+        min_size_h=max(1, int(params['min_size_h'] / factor)),
+        min_area=int(params['min_area'] / factor ** 2),
+    )
+
+
+def verification_windows(coarse_boxes, factor, params, image_size):
+    """
+    [NumPy] Ventana a resolución nativa y parámetros de verificación de cada acierto grueso
+    
+    Returns:
+        tuple: (lista de ventanas (x0, y0, x1, y1), lista de parámetros por ventana)
+    """
+    width, height = image_size
+    windows = []
+    window_params = []
+    for x, y, w, h in coarse_boxes:
+        x, y, w, h = x * factor, y * factor, w * factor, h * factor
+        min_w = max(params['min_size_w'], int(w / COARSE_SIZE_MARGIN))
+        min_h = max(params['min_size_h'], int(h / COARSE_SIZE_MARGIN))
+        max_w, max_h = int(w * COARSE_SIZE_MARGIN), int(h * COARSE_SIZE_MARGIN)
+        if min_w > max_w or min_h > max_h:
+            continue
+        pad_x, pad_y = int(w * COARSE_PADDING[0]), int(h * COARSE_PADDING[1])
+        windows.append((max(0, x - pad_x), max(0, y - pad_y),
+                        min(width, x + w + pad_x), min(height, y + h + pad_y)))
+        window_params.append(dict(params, min_size_w=min_w, min_size_h=min_h,
+                                  max_size=(max_w, max_h)))
+    return windows, window_params
+
+
+def run_cascades_coarse_to_fine(gray, classifiers, params, tracer=None, timings=None,
+                                workers=None):
+    """
+    [OpenCV + NumPy] Cascadas en dos pasadas: imagen reducida y verificación a resolución nativa
+    
+    Args:
+        gray (np.ndarray): Imagen en escala de grises a resolución nativa
+        classifiers (list): Pares (nombre, clasificador) del registro
+        params (dict): Resultado de `compute_detection_params` (segunda pasada)
+        workers (int): Hilos para las ventanas de verificación (por defecto CASCADE_WORKERS)
+        
+    Returns:
+        np.ndarray: Cajas (x, y, w, h) finales en coordenadas nativas, forma (N, 4)
+    """
+    tracer = tracer or get_tracer()
+    timings = timings if timings is not None else {}
+    workers = CASCADE_WORKERS if workers is None else workers
+    height, width = gray.shape[:2]
+    factor = coarse_factor(width)
+    if factor == 1:
+        return run_cascades(gray, classifiers, params, tracer, timings, workers)
+    
+    # [OpenCV] Primera pasada: imagen reducida y parámetros permisivos
+    with tracer.stage('coarse', factor=factor) as span:
+        coarse_gray = cv2.resize(gray, (width // factor, height // factor),
+                                 interpolation=cv2.INTER_AREA)
+        coarse_boxes = run_cascades(coarse_gray, classifiers, coarse_params(params, factor),
+                                    tracer, {}, workers)
+    timings['coarse'] = span.duration
+    print(f"Pasada gruesa (1/{factor}): {len(coarse_boxes)} candidatas")
+    
+    # [OpenCV] Segunda pasada: ajustar cada candidata a resolución nativa
+    windows, window_params = verification_windows(coarse_boxes, factor, params, (width, height))
+    with tracer.stage('cascades', workers=workers, windows=len(windows)) as span:
+        scans = run_cascades_in_regions(gray, classifiers, window_params, max(workers, 1),
+                                        tracer, windows)
+    timings['cascades'] = span.duration
+    fine_boxes = merge_cascade_scans(classifiers, scans, params, tracer, timings)
+    
+    # [NumPy] Conservar los aciertos gruesos sin confirmar que no solapan con uno fino
+    coarse_boxes = np.asarray(coarse_boxes, dtype=np.int32).reshape(-1, 4) * factor
+    boxes = np.concatenate([fine_boxes, coarse_boxes])
+    scores = np.concatenate([np.ones(len(fine_boxes)), np.zeros(len(coarse_boxes))])
+    return non_max_suppression(boxes, scores=scores)
+
+def recognize_plate_variants(plate_variants, early_exit_conf=EARLY_EXIT_CONFIDENCE,
+                             reorder_variants=True, tracer=None, plate_timings=None,
+                             languages=None):
+    """
+    [OCR] Lee las variantes de varias matrículas por lotes
+    
+    Sin salida anticipada se envían todas en un único lote; con ella, se
+    procesa una variante por matrícula en cada ronda y solo siguen las
+    matrículas que no alcanzan `early_exit_conf`.
+    
+    Args:
+        plate_variants (list): Para cada matrícula, su lista de (paso, imagen)
+        languages (tuple): Idiomas del lector de EasyOCR (None = OCR_LANGUAGES)
+        
+    Returns:
+        tuple: (lista de dicts paso -> OCRRead por matrícula, llamadas OCR)
+    """
+    tracer = tracer or get_tracer()
+    ordered_variants = [
+        VARIANT_STATS.order(variants) if reorder_variants else variants
+        for variants in plate_variants
+    ]
+    ocr_results = [{} for _ in plate_variants]
+    ocr_calls = 0
+    
+    if early_exit_conf is None:
+        rounds = [[(i, variant) for i, variants in enumerate(ordered_variants) for variant in variants]]
+    else:
+        rounds = None
+    
+    pending = list(range(len(plate_variants)))
+    round_index = 0
+    while pending:
+        if rounds is not None:
+            if round_index >= len(rounds):
+                break
+            jobs = rounds[round_index]
+        else:
+            jobs = [(i, ordered_variants[i][round_index]) for i in pending
+                    if round_index < len(ordered_variants[i])]
+        if not jobs:
+            break
+        
+        with tracer.stage('ocr', regions=len(jobs), round=round_index) as span:
+            reads = read_plate_regions([region for _, (_, region) in jobs], languages)
+        ocr_calls += len(jobs)
+        # El tiempo del lote se reparte entre las regiones que lo forman
+        share = span.duration / len(jobs)
+        
+        still_pending = []
+        for (i, (step_name, _)), read in zip(jobs, reads):
+            ocr_results[i][step_name] = read
+            if plate_timings is not None:
+                plate_timings[i]['ocr'] += share
+            if early_exit_conf is not None and read.confidence < early_exit_conf:
+                still_pending.append(i)
+        pending = still_pending
+        round_index += 1
+    
+    return ocr_results, ocr_calls
+
+
+def recognize_plates(plate_variants, early_exit_conf=EARLY_EXIT_CONFIDENCE,
+                     reorder_variants=True, tracer=None, plate_timings=None, fast_ocr=True,
+                     languages=None):
+    """
+    [OCR] Lee varias matrículas: primero por plantillas y, si no basta, con EasyOCR
+    
+    La lectura rápida (`read_plate_fast` sobre la variante binarizada) se
+    guarda como el paso FAST_OCR_STEP; solo las matrículas con confianza por
+    debajo de FAST_OCR_MIN_CONFIDENCE pasan a `recognize_plate_variants`.
+    Con idiomas de otro alfabeto (ver FAST_OCR_LANGUAGES) se omite.
+    
+    Returns:
+        tuple: (lista de dicts paso -> OCRRead por matrícula, llamadas a EasyOCR)
+    """
+    tracer = tracer or get_tracer()
+    ocr_results = [{} for _ in plate_variants]
+    slow = list(range(len(plate_variants)))
+    if fast_ocr and fast_ocr_supported(languages):
+        slow = []
+        for i, variants in enumerate(plate_variants):
+            with tracer.stage('fast_ocr') as span:
+                read = read_plate_fast(dict(variants).get("Umbralización"))
+            if plate_timings is not None:
+                plate_timings[i]['fast_ocr'] = span.duration
+            ocr_results[i][FAST_OCR_STEP] = read
+            if read.confidence < FAST_OCR_MIN_CONFIDENCE:
+                slow.append(i)
+    
+    slow_results, ocr_calls = recognize_plate_variants(
+        [plate_variants[i] for i in slow], early_exit_conf, reorder_variants, tracer,
+        [plate_timings[i] for i in slow] if plate_timings is not None else None, languages
+    )
+    for i, results in zip(slow, slow_results):
+        ocr_results[i].update(results)
+    return ocr_results, ocr_calls
+
+
+def detect_plates(img, sensitivity=0.5, early_exit_conf=EARLY_EXIT_CONFIDENCE,
+                  reorder_variants=True, tracer=None, ocr=True, cascade_workers=None,
+                  split_scales=False, tiled=False, annotate=True, roi_proposals=False,
+                  coarse_to_fine=False, plate_threshold=PLATE_SCORE_THRESHOLD, fast_ocr=True,
+                  ocr_languages=None):
+    """
+    [OpenCV + OCR] Detección de matrículas sobre una imagen ya cargada en memoria
+    
+    Permite reutilizar el mismo flujo con fotogramas de vídeo u otras fuentes
+    que no son ficheros. La imagen recibida puede quedar anotada con los resultados.
+    
+    Args:
+        img (np.ndarray): Imagen BGR o ya en escala de grises
+        sensitivity (float): 0.0 = muy sensible, 1.0 = poco sensible
+        early_exit_conf (float): Confianza a partir de la cual se dejan de probar
+            variantes de una matrícula (None = probar siempre todas)
+        reorder_variants (bool): Probar primero las variantes que más veces han ganado
+        tracer (Tracer): Instrumentación por etapas (por defecto, `get_tracer()`)
+        ocr (bool): Leer el texto de las matrículas (False = solo localizarlas)
+        cascade_workers (int): Hilos para las cascadas (ver `run_cascades`)
+        split_scales (bool): Repartir la pirámide de escalas entre esos hilos
+        tiled (bool): Procesar a resolución completa por teselas solapadas en
+            paralelo (por defecto `default_tile_workers()` hilos, ~375 MB cada
+            uno) en lugar de reducir las
+            imágenes mayores de MAX_IMAGE_WIDTH x MAX_IMAGE_HEIGHT
+        annotate (bool): Devolver la imagen anotada (False = `image` es None)
+        roi_proposals (bool): Escanear solo las regiones de `propose_plate_regions`
+            (más rápido, pero puede perder alguna matrícula)
+        coarse_to_fine (bool): Buscar en la imagen reducida y verificar a
+            resolución nativa (ver `run_cascades_coarse_to_fine`); como en el
+            modo por teselas, la imagen no se reduce a MAX_IMAGE_WIDTH x MAX_IMAGE_HEIGHT
+        plate_threshold (float): Puntuación mínima del verificador rápido
+            (`PlateVerifier`) para pasar al OCR; las regiones por debajo se
+            descartan (0 = no verificar)
+        fast_ocr (bool): Leer primero por plantillas (`FastPlateOCR`) y usar
+            EasyOCR solo si la confianza no llega a FAST_OCR_MIN_CONFIDENCE
+            (solo con idiomas de alfabeto latino, FAST_OCR_LANGUAGES)
+        ocr_languages (tuple): Idiomas del lector de EasyOCR (None = OCR_LANGUAGES);
+            cada conjunto usa su propio pool de lectores
+        
+    Returns:
+        DetectionResult: Imagen anotada, lista de PlateDetection y tiempos por etapa
+    """
+    tracer = tracer or get_tracer()
+    try:
+        start = time.perf_counter()
+        timings = {}
+        
+        # [OpenCV] Tomar prestado un juego de clasificadores Haar Cascade del registro
+        registry = get_cascade_registry()
+        with tracer.stage('load_cascades'):
+            classifiers = registry.checkout()
         
         if not classifiers:
-            return None, ["Error: No se encontraron modelos de detección"], False
+            return DetectionResult.failure("Error: No se encontraron modelos de detección")
         
         print("Iniciando detección simple de matrículas...")
         
         # Calcular parámetros basados en sensibilidad (0.0 = muy sensible, 1.0 = poco sensible)
-        scale_factor = 1.03 + (sensitivity * 0.07)  # 1.03 a 1.1
-        min_neighbors = int(2 + (sensitivity * 3))   # 2 a 5
-        min_size_w = int(20 + (sensitivity * 60))    # 20 a 80
-        min_size_h = int(5 + (sensitivity * 15))     # 5 a 20
-        min_area = int(100 + (sensitivity * 1500))   # 100 a 1600
+        params = compute_detection_params(sensitivity)
         
-        print(f"Sensibilidad: {sensitivity:.2f} -> scaleFactor={scale_factor:.2f}, minNeighbors={min_neighbors}, minSize=({min_size_w},{min_size_h}), minArea={min_area}")
+        print(f"Sensibilidad: {sensitivity:.2f} -> scaleFactor={params['scale_factor']:.2f}, minNeighbors={params['min_neighbors']}, minSize=({params['min_size_w']},{params['min_size_h']}), minArea={params['min_area']}")
         
-        # [OpenCV] Cargar imagen
+        # [OpenCV] Redimensionar si es muy grande (salvo en los modos a resolución nativa)
+        tile_size = None
+        if tiled:
+            tile_size = TILE_SIZE
+            if cascade_workers is None:
+                cascade_workers = TILE_WORKERS or default_tile_workers()
+        elif not coarse_to_fine:
+            img = limit_image_size(img, tracer, timings)
+        
+        # [OpenCV] Convertir a escala de grises (si no se decodificó ya así)
+        if img.ndim == 2:
+            gray = img
+        else:
+            with tracer.stage('cvtColor') as span:
+                gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+            timings['cvtColor'] = span.duration
+        
+        # [OpenCV] Prefiltro de regiones candidatas (opcional)
+        regions = None
+        if roi_proposals and not coarse_to_fine:
+            with tracer.stage('roi_proposals') as span:
+                regions = propose_plate_regions(gray, img)
+            timings['roi_proposals'] = span.duration
+            print(f"Regiones propuestas: {len(regions)}")
+        
+        # [OpenCV + NumPy] Cascadas, filtrado y NMS (el juego se devuelve al terminar)
         try:
-            img = cv2.imread(image_path)
-            if img is None:
-                # Método alternativo para caracteres especiales
-                with open(image_path, 'rb') as f:
-                    file_bytes = f.read()
-                nparr = np.frombuffer(file_bytes, np.uint8)
-                img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-            
-            if img is None:
-                return None, [f"Error: No se pudo cargar la imagen: {image_path}"], False
-                             
-        except Exception as e:
-            return None, [f"Error al cargar imagen: {str(e)}"], False
-        
-        # [OpenCV] Redimensionar si es muy grande
-        height, width = img.shape[:2]
-        if width > 1920 or height > 1080:
-            scale = min(1920/width, 1080/height)
-            new_width = int(width * scale)
-            new_height = int(height * scale)
-            img = cv2.resize(img, (new_width, new_height), interpolation=cv2.INTER_AREA)
-        
-        # [OpenCV] Convertir a escala de grises
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-        
-        detected_texts = []
-        detection_count = 0
-        
-        # [OpenCV] Detectar regiones de matrículas con Haar Cascades
-        all_detections = []
-        
-        for classifier in classifiers:
-            plates = classifier.detectMultiScale(
-                gray, 
-                scaleFactor=scale_factor,
-                minNeighbors=min_neighbors,
-                minSize=(min_size_w, min_size_h),
-                maxSize=(400, 150)
-            )
-            
-            # [OpenCV] Filtrar por relación de aspecto (forma de matrícula)
-            for (x, y, w, h) in plates:
-                aspect_ratio = w / h
-                area = w * h
-                
-                # Filtros básicos para matrículas (forma rectangular)
-                if (2.0 <= aspect_ratio <= 6.0 and 
-                    area >= min_area and 
-                    w >= min_size_w and h >= min_size_h):
-                    all_detections.append((x, y, w, h, area))
-        
-        # [OpenCV] Eliminar duplicados simples
-        filtered_detections = []
-        all_detections.sort(key=lambda x: x[4], reverse=True)  # Ordenar por área
-        
-        for detection in all_detections:
-            x, y, w, h, area = detection
-            is_duplicate = False
-            
-            for accepted in filtered_detections:
-                ax, ay, aw, ah = accepted[:4]
-                
-                # Verificar superposición básica
-                if (abs(x - ax) < 50 and abs(y - ay) < 30):
-                    is_duplicate = True
-                    break
-            
-            if not is_duplicate:
-                filtered_detections.append(detection)
+            if coarse_to_fine:
+                filtered_detections = run_cascades_coarse_to_fine(gray, classifiers, params, tracer,
+                                                                  timings, cascade_workers)
+            else:
+                filtered_detections = run_cascades(gray, classifiers, params, tracer, timings,
+                                                   cascade_workers, split_scales, tile_size, regions)
+        finally:
+            registry.checkin(classifiers)
         
-        # Limitar a máximo 3 detecciones
-        # filtered_detections = filtered_detections[:3]
+        # [OpenCV + NumPy] Descartar las regiones que claramente no son matrículas antes del OCR
+        if plate_threshold > 0:
+            with tracer.stage('verify', boxes=len(filtered_detections)) as span:
+                filtered_detections = verify_plate_boxes(gray, filtered_detections, plate_threshold)
+            timings['verify'] = span.duration
         
-        # [OpenCV + OCR] Procesar cada matrícula detectada
+        # [OpenCV] Extraer cada matrícula y generar sus variantes de preprocesado
+        boxes = []
+        plate_variants = []
+        plate_timings = []
         for detection in filtered_detections:
-            x, y, w, h = detection[:4]
-            detection_count += 1
-            
-            # [OpenCV] Extraer región de la matrícula
-            plate_region = gray[y:y + h, x:x + w]
-            
-            print(f"\n=== PROCESANDO MATRÍCULA #{detection_count} ===")
-            
-            # [OCR] PASO 1: Región original (escala de grises)
-            print("PASO 1 - Región original (escala de grises):")
-            result_original = extract_text_from_region(plate_region)
-            print(f"  OCR: {result_original}")
-            
-            # [OpenCV] PASO 2: Redimensionar si es muy pequeña
-            step2_region = plate_region.copy()
-            if step2_region.shape[1] < 150:
-                scale_factor = 150 / step2_region.shape[1]
-                new_width = int(step2_region.shape[1] * scale_factor)
-                new_height = int(step2_region.shape[0] * scale_factor)
-                step2_region = cv2.resize(step2_region, (new_width, new_height), interpolation=cv2.INTER_CUBIC)
-                print("PASO 2 - Después de redimensionar:")
-                result_resize = extract_text_from_region(step2_region)
-                print(f"  OCR: {result_resize}")
+            x, y, w, h = (int(v) for v in detection[:4])
+            boxes.append((x, y, w, h))
+            if ocr:
+                with tracer.stage('preprocess', box=[x, y, w, h]) as span:
+                    plate_region = gray[y:y + h, x:x + w]
+                    plate_variants.append(build_plate_variants(plate_region))
+                plate_timings.append({'preprocess': span.duration, 'ocr': 0.0})
             else:
-                print("PASO 2 - Sin redimensionamiento necesario")
-            
-            # [OpenCV] PASO 3: Mejorar contraste con CLAHE
-            clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8,8))
-            step3_region = clahe.apply(step2_region)
-            print("PASO 3 - Después de CLAHE (mejora de contraste):")
-            result_clahe = extract_text_from_region(step3_region)
-            print(f"  OCR: {result_clahe}")
-            
-            # [OpenCV] PASO 4: Umbralización adaptativa (binarización)
-            step4_region = cv2.adaptiveThreshold(
-                step3_region, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, 
-                cv2.THRESH_BINARY, 11, 2
+                plate_variants.append([])
+                plate_timings.append({})
+        
+        # [OCR] Reconocer por plantillas y, las dudosas, por lotes con EasyOCR
+        stage_start = time.perf_counter()
+        if ocr:
+            ocr_results, ocr_calls = recognize_plates(
+                plate_variants, early_exit_conf, reorder_variants, tracer, plate_timings, fast_ocr,
+                ocr_languages
             )
-            print("PASO 4 - Después de umbralización (blanco y negro):")
-            result_final = extract_text_from_region(step4_region)
-            print(f"  OCR: {result_final}")
-            
-            # Seleccionar el mejor resultado basado en confianza
-            results = [
-                ("Original", result_original),
-                ("CLAHE", result_clahe),
-                ("Umbralización", result_final)
-            ]
-            
-            # Añadir resultado de redimensionamiento si se aplicó
-            if 'result_resize' in locals():
-                results.insert(1, ("Redimensionado", result_resize))
-            
-            # Encontrar el resultado con mayor confianza
-            best_result = result_original
-            best_step = "Original"
-            best_conf = 0.0
+        else:
+            ocr_results, ocr_calls = [{} for _ in boxes], 0
+        timings['ocr'] = time.perf_counter() - stage_start
+        
+        step_labels = {
+            "Original": "PASO 1 - Región original (escala de grises):",
+            "Redimensionado": "PASO 2 - Después de redimensionar:",
+            "CLAHE": "PASO 3 - Después de CLAHE (mejora de contraste):",
+            "Umbralización": "PASO 4 - Después de umbralización (blanco y negro):",
+        }
+        fast_reads = 0
+        
+        detections = []
+        for (x, y, w, h), variants, plate_results, plate_timing in zip(boxes, plate_variants, ocr_results, plate_timings):
+            print(f"\n=== PROCESANDO MATRÍCULA #{len(detections) + 1} ===")
             
-            for step_name, result in results:
-                if "conf:" in result:
-                    try:
-                        conf = float(result.split("conf: ")[1].split(")")[0])
-                        if conf > best_conf:
-                            best_conf = conf
-                            best_result = result
-                            best_step = step_name
-                    except:
-                        pass
+            resized = any(step_name == "Redimensionado" for step_name, _ in variants)
+            best_step = ""
+            best_read = OCRRead.empty("OCR desactivado")
+            fast_read = plate_results.get(FAST_OCR_STEP)
+            if fast_read is not None:
+                print(f"OCR rápido por plantillas (sobre el PASO 4): {fast_read}")
+                if fast_read.confidence > 0:
+                    best_step, best_read = FAST_OCR_STEP, fast_read
+            for step_name, _ in variants:
+                print(step_labels[step_name])
+                read = plate_results.get(step_name)
+                if read is None:
+                    print("  OCR: omitido (confianza suficiente en otra variante)")
+                else:
+                    print(f"  OCR: {read}")
+                    # Quedarse con el resultado de mayor confianza
+                    if not best_step or read.confidence > best_read.confidence:
+                        best_step, best_read = step_name, read
+                if step_name == "Original" and not resized:
+                    print("PASO 2 - Sin redimensionamiento necesario")
             
-            print(f"RESULTADO FINAL: {best_step} - {best_result}")
-            detected_texts.append(f"Matrícula {detection_count}: {best_result}")
+            if record_ocr_win(best_step, best_read):
+                fast_reads += 1
             
-            # [OpenCV] Dibujar rectángulo verde y etiqueta
-            cv2.rectangle(img, (x, y), (x + w, y + h), (0, 255, 0), 2)
-            cv2.putText(img, f"#{detection_count}", 
-                       (x, y-10), cv2.FONT_HERSHEY_SIMPLEX, 
-                       0.7, (0, 255, 0), 2)
+            print(f"RESULTADO FINAL: {best_step} - {best_read}")
+            detections.append(PlateDetection(
+                (x, y, w, h), best_read.text, best_read.confidence,
+                best_step, best_read.message, plate_timing
+            ))
         
-        if detection_count == 0:
-            detected_texts.append("No se detectaron matrículas en la imagen")
+        # [OpenCV] Dibujar rectángulos verdes y etiquetas
+        if not annotate:
+            img = None
+        else:
+            if img.ndim == 2:
+                img = cv2.cvtColor(img, cv2.COLOR_GRAY2BGR)
+            draw_detections(img, detections)
         
-        print(f"Detección completada. Regiones encontradas: {detection_count}")
+        timings['total'] = time.perf_counter() - start
+        print(f"Detección completada. Regiones encontradas: {len(detections)}, llamadas OCR: {ocr_calls}, "
+              f"leídas por plantillas: {fast_reads}")
         
-        return img, detected_texts, True
+        return DetectionResult(img, detections, True, None, timings)
         
     except Exception as e:
-        return None, [f"Error durante la detección: {str(e)}"], False
+        return DetectionResult.failure(f"Error durante la detección: {str(e)}")
+
 
 
 
 
+# ========== PRECARGA DE MODELOS ==========
+# Cargar el lector de EasyOCR tarda varios segundos (importa y construye los
+# modelos de torch). La aplicación lo precarga en un hilo de fondo mientras
+# se reproduce el vídeo de inicio; la primera detección espera a esa carga.
+WARMUP_THREAD_NAME = 'autolens-warmup'
+
+_warmup_lock = threading.Lock()
+_warmup_future = None
+
+
+def warm_up_models(ocr=True):
+    """
+    [OpenCV + OCR] Carga las cascadas, el juego de glifos y el lector de EasyOCR
+    
+    El juego de cascadas precargado queda libre en el registro y lo toma
+    prestado el primer hilo que detecte, sea cual sea (el de la interfaz o
+    uno del pool de cascadas); no se queda en el hilo de precarga.
+    
+    Returns:
+        float: Segundos empleados
+    """
+    start = time.perf_counter()
+    preload_cascades()
+    get_glyph_set()
+    if ocr:
+        preload_easyocr_reader()
+    elapsed = time.perf_counter() - start
+    print(f"Modelos precargados en {elapsed:.2f}s")
+    return elapsed
+
+
+def start_model_warmup(ocr=True):
+    """
+    Lanza `warm_up_models` en un hilo de fondo (una sola vez por proceso)
+    
+    El hilo es de tipo daemon: cerrar la aplicación no espera a que termine.
+    
+    Returns:
+        Future: Se completa con los segundos empleados cuando los modelos están listos
+    """
+    global _warmup_future
+    with _warmup_lock:
+        if _warmup_future is None:
+            future = Future()
+            
+            def run():
+                future.set_running_or_notify_cancel()
+                try:
+                    future.set_result(warm_up_models(ocr))
+                except Exception as e:
+                    future.set_exception(e)
+            
+            threading.Thread(target=run, name=WARMUP_THREAD_NAME, daemon=True).start()
+            _warmup_future = future
+        return _warmup_future
+
+
+def wait_for_models(timeout=None):
+    """
+    Espera a la precarga en segundo plano, si se lanzó
+    
+    Returns:
+        bool: True si los modelos quedaron precargados; False si no había
+            precarga, falló o no terminó a tiempo (se cargarán al usarlos)
+    """
+    future = _warmup_future
+    if future is None:
+        return False
+    try:
+        future.result(timeout)
+        return True
+    except Exception as e:
+        print(f"Precarga de modelos no disponible: {str(e) or type(e).__name__}")
+        return False
+
 
 # ========== FUNCIÓN DE INTERFAZ ==========
-def detect_plates_for_interface(image_path, sensitivity=0.5):
+# En la interfaz se procesa una sola imagen cada vez: repartir sus escalas
+# entre todos los núcleos reduce la latencia
+INTERFACE_CASCADE_WORKERS = os.cpu_count() or 1
+
+
+def detect_plates_for_interface(image_path, sensitivity=0.5, plate_threshold=PLATE_SCORE_THRESHOLD):
     """[INTERFAZ] Función de compatibilidad con InterfazStudio.py"""
-    return detect_plates_simple(image_path, sensitivity)
+    return detect_plates_simple(image_path, sensitivity, plate_threshold=plate_threshold,
+                                cascade_workers=INTERFACE_CASCADE_WORKERS, split_scales=True)
 
@@ -0,0 +1,154 @@
+"""
+CACHÉ PERSISTENTE DE DETECCIONES
+================================
+
+Guarda en disco (SQLite) las matrículas detectadas en cada imagen para no
+repetir cascadas y OCR al volver a abrir la misma foto o relanzar un lote.
+
+CLAVE DE CACHÉ:
+• Hash del contenido de la imagen (no de su ruta)
+• Versiones de los modelos Haar Cascade (ruta + mtime)
+• Parámetros derivados de la sensibilidad y opciones del OCR
+
+La caché tiene un tamaño máximo en bytes; al superarlo se eliminan las
+entradas usadas hace más tiempo (LRU).
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from DetectionResult import PlateDetection
+
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'autolens', 'detections.sqlite')
+DEFAULT_MAX_BYTES = 64 * 2**20  # 64 MB
+
+# Versión del formato de las entradas; cambiarla invalida la caché existente
+CACHE_FORMAT_VERSION = 1
+
+
+def content_hash(data):
+    """Hash del contenido de un fichero (bytes)"""
+    return hashlib.blake2b(data, digest_size=20).hexdigest()
+
+
+def make_cache_key(image_hash, model_versions, params):
+    """
+    Construye la clave de una entrada
+
+    Args:
+        image_hash (str): Hash del contenido de la imagen
+        model_versions (tuple): Versiones de los modelos (ver CascadeRegistry.versions)
+        params (dict): Parámetros que afectan al resultado
+    """
+    models = [[os.path.basename(path), mtime] for path, mtime in model_versions]
+    description = json.dumps([CACHE_FORMAT_VERSION, image_hash, models, params], sort_keys=True)
+    return hashlib.blake2b(description.encode('utf-8'), digest_size=20).hexdigest()
+
+
+class DetectionCache:
+    """Caché LRU de detecciones en SQLite, acotada por tamaño"""
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=10)
+        with self._lock, self._conn:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS detections ('
+                ' key TEXT PRIMARY KEY,'
+                ' payload TEXT NOT NULL,'
+                ' size INTEGER NOT NULL,'
+                ' last_used REAL NOT NULL)'
+            )
+            self._conn.execute(
+                'CREATE INDEX IF NOT EXISTS detections_last_used ON detections(last_used)')
+
+    def get(self, key):
+        """
+        Busca una entrada y la marca como usada
+
+        Returns:
+            tuple: (tamaño de imagen procesada (w, h), lista de PlateDetection) o None
+        """
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                'SELECT payload FROM detections WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                'UPDATE detections SET last_used = ? WHERE key = ?', (time.time(), key))
+
+        payload = json.loads(row[0])
+        detections = [PlateDetection.from_dict(item) for item in payload['plates']]
+        return tuple(payload['image_size']), detections
+
+    def put(self, key, image_size, detections):
+        """Guarda las detecciones de una imagen y aplica el límite de tamaño"""
+        payload = json.dumps({
+            'image_size': list(image_size),
+            'plates': [detection.to_dict() for detection in detections],
+        }, ensure_ascii=False)
+        size = len(payload.encode('utf-8'))
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO detections (key, payload, size, last_used) '
+                'VALUES (?, ?, ?, ?)', (key, payload, size, time.time()))
+            self._evict()
+
+    def _evict(self):
+        """Elimina las entradas menos usadas hasta quedar por debajo de max_bytes"""
+        total = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM detections').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        excess = total - self.max_bytes
+        freed = 0
+        doomed = []
+        for key, size in self._conn.execute(
+                'SELECT key, size FROM detections ORDER BY last_used ASC'):
+            doomed.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        self._conn.executemany('DELETE FROM detections WHERE key = ?', doomed)
+
+    def stats(self):
+        """Número de entradas y bytes ocupados"""
+        with self._lock:
+            count, total = self._conn.execute(
+                'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM detections').fetchone()
+        return {'entries': count, 'bytes': total, 'max_bytes': self.max_bytes}
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM detections')
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_detection_cache():
+    """Caché compartida por el proceso (None si no se puede abrir)"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                try:
+                    _cache = DetectionCache()
+                except (OSError, sqlite3.Error) as e:
+                    print(f"Caché de detecciones no disponible: {e}")
+                    _cache = False
+    return _cache or None
@@ -0,0 +1,134 @@
+"""
+TIPOS DE RESULTADO DE LA DETECCIÓN
+==================================
+
+Resultados estructurados del flujo de `DetectLicenseSimple`, para que el
+código que los consume no tenga que volver a parsear cadenas de texto.
+
+• OCRRead: lectura de una variante (texto + confianza numérica)
+• PlateDetection: una matrícula (caja, texto, confianza, variante ganadora, tiempos)
+• DetectionResult: resultado completo de una imagen
+• detections_to_array: array estructurado de NumPy para consumo masivo
+
+Las clases usan `__slots__` para que millones de resultados ocupen poca memoria.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+
+# Variantes de preprocesado, en el orden de PASO 1 a PASO 4, y la lectura del
+# OCR rápido por plantillas (`FAST_OCR_STEP` de DetectLicenseSimple)
+VARIANT_NAMES = ("Original", "Redimensionado", "CLAHE", "Umbralización", "Plantillas")
+
+# Longitud máxima del texto en el array estructurado
+ARRAY_TEXT_LENGTH = 16
+
+DETECTION_DTYPE = np.dtype([
+    ('x', np.int32),
+    ('y', np.int32),
+    ('w', np.int32),
+    ('h', np.int32),
+    ('confidence', np.float32),
+    ('variant', np.int8),         # Índice en VARIANT_NAMES (-1 = desconocida)
+    ('text', f'U{ARRAY_TEXT_LENGTH}'),
+])
+
+
+@dataclass
+class OCRRead:
+    """[OCR] Lectura de una región: texto limpio, confianza y mensaje de estado"""
+    __slots__ = ('text', 'confidence', 'message')
+    text: str
+    confidence: float
+    message: str
+
+    @classmethod
+    def empty(cls, message="Sin texto detectado"):
+        """Lectura sin texto (sin resultados o con error)"""
+        return cls("", 0.0, message)
+
+    def __str__(self):
+        if self.text:
+            return f"{self.text} (conf: {self.confidence:.2f})"
+        return self.message
+
+
+@dataclass
+class PlateDetection:
+    """[OpenCV + OCR] Matrícula detectada con su mejor lectura"""
+    __slots__ = ('box', 'text', 'confidence', 'variant', 'message', 'timings')
+    box: tuple          # (x, y, w, h) en coordenadas de la imagen procesada
+    text: str
+    confidence: float
+    variant: str        # Variante de preprocesado que dio la mejor lectura
+    message: str        # Texto a mostrar cuando no hay lectura
+    timings: dict       # Segundos por etapa (preprocesado, ocr)
+
+    @property
+    def read(self):
+        """Lectura ganadora como OCRRead"""
+        return OCRRead(self.text, self.confidence, self.message)
+
+    def to_dict(self):
+        """Representación compacta y serializable en JSON"""
+        return {
+            'box': list(self.box),
+            'text': self.text,
+            'confidence': round(self.confidence, 4),
+            'variant': self.variant,
+            'message': self.message,
+            'timings': {stage: round(seconds, 6) for stage, seconds in self.timings.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Reconstruye una detección a partir de `to_dict`"""
+        return cls(tuple(data['box']), data['text'], data['confidence'],
+                   data['variant'], data.get('message', ""), dict(data.get('timings', {})))
+
+
+@dataclass
+class DetectionResult:
+    """[OpenCV + OCR] Resultado de procesar una imagen"""
+    __slots__ = ('image', 'detections', 'success', 'error', 'timings')
+    image: object       # np.ndarray anotada (o None si hubo error)
+    detections: list    # Lista de PlateDetection
+    success: bool
+    error: str          # Mensaje de error (None si success)
+    timings: dict       # Segundos por etapa de la imagen
+
+    @classmethod
+    def failure(cls, error):
+        return cls(None, [], False, error, {})
+
+    def texts(self):
+        """Líneas legibles para la interfaz ('Matrícula N: ...')"""
+        if not self.success:
+            return [self.error]
+        if not self.detections:
+            return ["No se detectaron matrículas en la imagen"]
+        return [f"Matrícula {index}: {detection.read}"
+                for index, detection in enumerate(self.detections, start=1)]
+
+    def to_array(self):
+        """Cajas y lecturas como array estructurado de NumPy"""
+        return detections_to_array(self.detections)
+
+
+def detections_to_array(detections):
+    """
+    [NumPy] Convierte una lista de PlateDetection en un array estructurado
+
+    Returns:
+        np.ndarray: Array con dtype DETECTION_DTYPE (una fila por matrícula)
+    """
+    array = np.empty(len(detections), dtype=DETECTION_DTYPE)
+    for row, detection in enumerate(detections):
+        x, y, w, h = detection.box
+        variant = (VARIANT_NAMES.index(detection.variant)
+                   if detection.variant in VARIANT_NAMES else -1)
+        array[row] = (x, y, w, h, detection.confidence, variant,
+                      detection.text[:ARRAY_TEXT_LENGTH])
+    return array
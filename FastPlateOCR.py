@@ -0,0 +1,357 @@
+"""
+OCR RÁPIDO POR PLANTILLAS
+=========================
+
+Lee una matrícula sin EasyOCR a partir de su variante binarizada (PASO 4 de
+`build_plate_variants`). Solo usa OpenCV y NumPy, así que tarda milisegundos
+en CPU; cuando su confianza es baja, `detect_plates` recurre a EasyOCR.
+
+1. [OpenCV] Componentes conexas de la imagen binarizada (se prueban las dos
+   polaridades: texto oscuro sobre fondo claro y al revés)
+2. [NumPy] Quedarse con las que tienen forma de carácter y la altura y la
+   línea base dominantes, ordenadas de izquierda a derecha
+3. [OpenCV] Descriptor HOG de cada carácter normalizado a GLYPH_SIZE
+4. [NumPy] Plantilla más parecida (similitud coseno) del juego de glifos
+
+JUEGO DE GLIFOS:
+Se genera al importar el módulo dibujando 0-9 y A-Z con las fuentes Hershey
+de OpenCV en varios grosores (no hace falta ningún fichero). Si existe
+`platedetc/glyphs/`, sus imágenes se añaden como plantillas extra: el primer
+carácter del nombre del fichero es la etiqueta (p. ej. `B_recorte3.png`) y el
+glifo debe ser oscuro sobre fondo claro.
+
+Uso:
+    read = read_plate_fast(dict(build_plate_variants(region))["Umbralización"])
+    # OCRRead(text, confidence, message)
+"""
+
+import os
+
+import cv2  # OpenCV - Componentes conexas y HOG
+import numpy as np
+
+from DetectionResult import OCRRead
+
+
+GLYPH_ALPHABET = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+GLYPH_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "platedetc", "glyphs")
+
+# Tamaño (ancho, alto) al que se normaliza cada carácter antes del HOG
+GLYPH_SIZE = (20, 40)
+GLYPH_MARGIN = 2
+
+# Relación alto / ancho a partir de la cual un glifo es estrecho (1, I) y no se
+# estira a lo ancho; los demás ocupan todo el lienzo, así las fuentes
+# condensadas de las matrículas se comparan bien con las plantillas
+NARROW_GLYPH_ASPECT = 3.0
+
+# Fuentes y grosores con los que se generan las plantillas
+GLYPH_FONTS = (cv2.FONT_HERSHEY_SIMPLEX, cv2.FONT_HERSHEY_DUPLEX, cv2.FONT_HERSHEY_COMPLEX)
+GLYPH_THICKNESSES = (2, 3, 4, 6)
+
+# Forma de un carácter, relativa a la imagen binarizada
+CHAR_MIN_HEIGHT = 0.3           # Fracción de la altura de la imagen
+CHAR_MAX_HEIGHT = 0.95
+CHAR_MIN_ASPECT = 1.0           # alto / ancho
+CHAR_MAX_ASPECT = 8.0
+CHAR_MIN_FILL = 0.15            # Píxeles de tinta / área de la caja
+CHAR_MAX_FILL = 0.9
+
+# Caracteres pegados en una sola componente que se intentan separar
+MAX_MERGED_CHARS = 3
+
+# Tolerancia respecto a la altura y el centro vertical medianos de los caracteres
+CHAR_HEIGHT_TOLERANCE = 0.25
+CHAR_CENTER_TOLERANCE = 0.25
+
+# Número de caracteres de una lectura válida
+MIN_CHARS = 4
+MAX_CHARS = 10
+
+# Hueco entre caracteres (en anchuras medianas) que se lee como un espacio
+SPACE_GAP = 0.9
+
+# Similitud coseno que da confianza 0 y 1 al carácter menos parecido
+SIMILARITY_RANGE = (0.5, 0.85)
+
+# Margen medio (mejor clase - segunda) por debajo del cual la confianza se reduce:
+# con imágenes borrosas varias plantillas se parecen casi por igual
+FULL_MARGIN = 0.05
+
+# Comprobaciones de que la fila leída es una matrícula completa:
+# • Los caracteres de matrícula son más altos que anchos (alto / ancho mediano);
+#   logotipos y rótulos dan glifos casi cuadrados
+# • Entre la fila y los bordes izquierdo y derecho del recorte queda al menos
+#   este hueco (en anchuras medianas); si no, la caja corta la matrícula y
+#   probablemente falta algún carácter
+PLATE_MIN_CHAR_ASPECT = 1.3
+PLATE_EDGE_CLEARANCE = 0.5
+
+# Factor de la confianza de una lectura que no pasa esas comprobaciones
+IMPLAUSIBLE_PENALTY = 0.5
+
+
+def create_hog():
+    """[OpenCV] Descriptor HOG para glifos de GLYPH_SIZE"""
+    return cv2.HOGDescriptor(GLYPH_SIZE, (10, 10), (5, 5), (5, 5), 9)
+
+
+def normalize_glyph(mask):
+    """
+    [OpenCV] Ajusta un carácter (tinta = 255) a un lienzo de GLYPH_SIZE
+
+    Los glifos estrechos conservan su relación de aspecto y se centran.
+    """
+    width, height = GLYPH_SIZE
+    glyph_h, glyph_w = mask.shape[:2]
+    new_h = height - 2 * GLYPH_MARGIN
+    new_w = width - 2 * GLYPH_MARGIN
+    if glyph_h / glyph_w > NARROW_GLYPH_ASPECT:
+        new_w = max(1, min(new_w, int(round(glyph_w * new_h / glyph_h))))
+    resized = cv2.resize(mask, (new_w, new_h), interpolation=cv2.INTER_AREA)
+    canvas = np.zeros((height, width), dtype=np.uint8)
+    x = (width - new_w) // 2
+    y = (height - new_h) // 2
+    canvas[y:y + new_h, x:x + new_w] = resized
+    return canvas
+
+
+def crop_ink(mask):
+    """[NumPy] Recorte ajustado a la tinta (None si no hay)"""
+    ys, xs = np.nonzero(mask)
+    if len(xs) == 0:
+        return None
+    return mask[ys.min():ys.max() + 1, xs.min():xs.max() + 1]
+
+
+def render_glyph(char, font, thickness):
+    """[OpenCV] Carácter dibujado con una fuente Hershey (tinta = 255)"""
+    canvas = np.zeros((80, 80), dtype=np.uint8)
+    cv2.putText(canvas, char, (10, 65), font, 2.0, 255, thickness, cv2.LINE_AA)
+    return crop_ink(canvas)
+
+
+def describe(hog, glyph):
+    """[OpenCV + NumPy] Descriptor HOG normalizado (norma 1) de un glifo"""
+    descriptor = hog.compute(normalize_glyph(glyph)).ravel()
+    return descriptor / max(float(np.linalg.norm(descriptor)), 1e-6)
+
+
+class GlyphSet:
+    """[OpenCV + NumPy] Plantillas de caracteres y su clasificación por HOG"""
+
+    def __init__(self, glyph_dir=GLYPH_DIR):
+        self.hog = create_hog()
+        labels = []
+        descriptors = []
+        for char in GLYPH_ALPHABET:
+            for font in GLYPH_FONTS:
+                for thickness in GLYPH_THICKNESSES:
+                    labels.append(char)
+                    descriptors.append(describe(self.hog, render_glyph(char, font, thickness)))
+
+        for label, glyph in self._load_extra_glyphs(glyph_dir):
+            labels.append(label)
+            descriptors.append(describe(self.hog, glyph))
+
+        self.labels = np.array(labels)
+        self.descriptors = np.array(descriptors, dtype=np.float32)
+        # Índice de las plantillas de cada carácter, para la mejor similitud por clase
+        self.classes = sorted(set(labels))
+        self.class_index = np.array([self.classes.index(label) for label in labels])
+
+    @staticmethod
+    def _load_extra_glyphs(glyph_dir):
+        """[OpenCV] Glifos adicionales de `glyph_dir` (oscuros sobre fondo claro)"""
+        if not os.path.isdir(glyph_dir):
+            return []
+        glyphs = []
+        for filename in sorted(os.listdir(glyph_dir)):
+            label = filename[:1].upper()
+            if label not in GLYPH_ALPHABET:
+                continue
+            img = cv2.imread(os.path.join(glyph_dir, filename), cv2.IMREAD_GRAYSCALE)
+            if img is None:
+                continue
+            _, mask = cv2.threshold(img, 0, 255, cv2.THRESH_BINARY_INV | cv2.THRESH_OTSU)
+            glyph = crop_ink(mask)
+            if glyph is not None:
+                glyphs.append((label, glyph))
+        return glyphs
+
+    def classify(self, glyphs):
+        """
+        [NumPy] Carácter más parecido a cada glifo
+
+        Returns:
+            list: Tuplas (carácter, similitud coseno, margen sobre la segunda clase)
+        """
+        if not glyphs:
+            return []
+        queries = np.array([describe(self.hog, glyph) for glyph in glyphs], dtype=np.float32)
+        similarities = queries @ self.descriptors.T
+        # Mejor similitud de cada clase (máximo sobre sus plantillas)
+        per_class = np.full((len(glyphs), len(self.classes)), -1.0, dtype=np.float32)
+        np.maximum.at(per_class.T, self.class_index, similarities.T)
+        top2 = np.sort(per_class, axis=1)[:, -2:]
+        best = per_class.argmax(axis=1)
+        return [(self.classes[k], float(top2[i, 1]), float(top2[i, 1] - top2[i, 0]))
+                for i, k in enumerate(best)]
+
+
+_GLYPH_SET = None
+
+
+def get_glyph_set():
+    """Juego de glifos compartido (se construye la primera vez, ~50 ms)"""
+    global _GLYPH_SET
+    if _GLYPH_SET is None:
+        _GLYPH_SET = GlyphSet()
+    return _GLYPH_SET
+
+
+def split_glyph(glyph, parts):
+    """
+    [NumPy] Separa un glifo de varios caracteres pegados (p. ej. "11")
+
+    Corta por la columna con menos tinta cerca de cada división a partes iguales.
+
+    Returns:
+        list: Pares (desplazamiento x, glifo) de izquierda a derecha
+    """
+    width = glyph.shape[1]
+    profile = np.count_nonzero(glyph, axis=0)
+    window = max(1, width // (3 * parts))
+    cuts = [0]
+    for k in range(1, parts):
+        center = k * width // parts
+        low, high = max(cuts[-1] + 1, center - window), min(width - 1, center + window)
+        cuts.append(low + int(np.argmin(profile[low:high + 1])) if low <= high else center)
+    cuts.append(width)
+    return [(a, glyph[:, a:b]) for a, b in zip(cuts, cuts[1:]) if b > a]
+
+
+def segment_characters(mask):
+    """
+    [OpenCV + NumPy] Componentes con forma de carácter de una máscara (tinta = 255)
+
+    Returns:
+        tuple: (cajas (x, y, w, h), glifos con solo los píxeles de su componente),
+            de izquierda a derecha, de la fila con la altura y la línea dominantes
+    """
+    height, width = mask.shape[:2]
+    _, labels, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=8)
+    chars = []
+    wide = []
+    for label, (x, y, w, h, area) in enumerate(stats[1:], start=1):
+        if not CHAR_MIN_HEIGHT * height <= h <= CHAR_MAX_HEIGHT * height:
+            continue
+        # Los caracteres no tocan el borde izquierdo ni el derecho del recorte
+        if x == 0 or x + w == width:
+            continue
+        # Los glifos estrechos (1, I) pueden ser una barra maciza
+        max_fill = 1.0 if h / w > NARROW_GLYPH_ASPECT else CHAR_MAX_FILL
+        if not CHAR_MIN_FILL <= area / (w * h) <= max_fill:
+            continue
+        box = (label, int(x), int(y), int(w), int(h))
+        if CHAR_MIN_ASPECT <= h / w <= CHAR_MAX_ASPECT:
+            chars.append(box)
+        elif h / w >= CHAR_MIN_ASPECT / MAX_MERGED_CHARS:
+            wide.append(box)
+    if not chars:
+        return [], []
+
+    # [NumPy] Fila dominante: altura y centro vertical parecidos a la mediana
+    median_h = float(np.median([h for _, _, _, _, h in chars]))
+    median_c = float(np.median([y + h / 2 for _, _, y, _, h in chars]))
+
+    def in_row(box):
+        _, _, y, _, h = box
+        return (abs(h - median_h) <= CHAR_HEIGHT_TOLERANCE * median_h and
+                abs(y + h / 2 - median_c) <= CHAR_CENTER_TOLERANCE * median_h)
+
+    chars = [box for box in chars if in_row(box)]
+    if not chars:
+        return [], []
+    median_w = float(np.median([w for _, _, _, w, _ in chars]))
+
+    # [NumPy] Cada glifo sin las motas de otras componentes que caen en su caja
+    pieces = []
+    for label, x, y, w, h in chars:
+        pieces.append(((x, y, w, h), np.where(labels[y:y + h, x:x + w] == label, 255, 0)))
+    for box in filter(in_row, wide):
+        label, x, y, w, h = box
+        glyph = np.where(labels[y:y + h, x:x + w] == label, 255, 0)
+        parts = min(MAX_MERGED_CHARS, max(2, int(round(w / median_w))))
+        for offset, part in split_glyph(glyph, parts):
+            pieces.append(((x + offset, y, part.shape[1], h), part))
+
+    pieces.sort(key=lambda piece: piece[0][0])
+    return ([box for box, _ in pieces],
+            [crop_ink(glyph.astype(np.uint8)) for _, glyph in pieces])
+
+
+def plausible_layout(boxes, width):
+    """[NumPy] La fila de caracteres tiene forma de matrícula y no está cortada por el recorte"""
+    median_w = float(np.median([w for _, _, w, _ in boxes]))
+    median_h = float(np.median([h for _, _, _, h in boxes]))
+    if median_h / median_w < PLATE_MIN_CHAR_ASPECT:
+        return False
+    left = boxes[0][0]
+    right = width - (boxes[-1][0] + boxes[-1][2])
+    return min(left, right) >= PLATE_EDGE_CLEARANCE * median_w
+
+
+def read_characters(mask, glyph_set):
+    """
+    [OpenCV + NumPy] Lee una polaridad de la imagen binarizada
+
+    La confianza es la del carácter menos parecido a su plantilla, reducida
+    si los caracteres apenas se distinguen de la segunda clase más parecida
+    y si la fila no parece una matrícula completa (`plausible_layout`).
+
+    Returns:
+        OCRRead: Texto (con espacios en los huecos anchos) y confianza 0-1
+    """
+    boxes, glyphs = segment_characters(mask)
+    if not MIN_CHARS <= len(boxes) <= MAX_CHARS or any(glyph is None for glyph in glyphs):
+        return OCRRead.empty("OCR rápido: caracteres no segmentados")
+
+    matches = glyph_set.classify(glyphs)
+    low, high = SIMILARITY_RANGE
+    similarity = min(similarity for _, similarity, _ in matches)
+    margin = float(np.mean([margin for _, _, margin in matches]))
+    confidence = (min(1.0, max(0.0, (similarity - low) / (high - low))) *
+                  min(1.0, margin / FULL_MARGIN))
+    if not plausible_layout(boxes, mask.shape[1]):
+        confidence *= IMPLAUSIBLE_PENALTY
+
+    median_w = float(np.median([w for _, _, w, _ in boxes]))
+    text = matches[0][0]
+    for (prev_x, _, prev_w, _), (x, _, _, _), (char, _, _) in zip(boxes, boxes[1:], matches[1:]):
+        if x - (prev_x + prev_w) > SPACE_GAP * median_w:
+            text += " "
+        text += char
+    return OCRRead(text, confidence, "")
+
+
+def read_plate_fast(binary_region):
+    """
+    [OpenCV + NumPy] OCR por plantillas de la variante binarizada de una matrícula
+
+    Args:
+        binary_region (np.ndarray): Imagen binarizada (PASO 4, 0/255)
+
+    Returns:
+        OCRRead: Mejor lectura de las dos polaridades (confianza 0 si no se segmenta)
+    """
+    if binary_region is None or binary_region.size == 0:
+        return OCRRead.empty("OCR rápido: región vacía")
+
+    glyph_set = get_glyph_set()
+    best = None
+    for mask in (cv2.bitwise_not(binary_region), binary_region):
+        read = read_characters(mask, glyph_set)
+        if best is None or read.confidence > best.confidence:
+            best = read
+    return best
@@ -0,0 +1,155 @@
+"""
+INSTRUMENTACIÓN DEL FLUJO DE DETECCIÓN
+======================================
+
+Mide con reloj monotónico cuánto tarda cada etapa de la detección
+(decodificación, redimensionado, cvtColor, cada `detectMultiScale`, NMS,
+preprocesado y cada llamada al OCR).
+
+• NullTracer: implementación por defecto, no guarda nada
+• Tracer: guarda cada etapa y permite exportar a JSON o a formato
+  Chrome trace (chrome://tracing, Perfetto) y obtener histogramas de latencia
+
+Uso:
+    tracer = Tracer()
+    detect_plates_file(ruta, tracer=tracer)
+    tracer.write_chrome_trace('traza.json')
+    print(tracer.summary())
+"""
+
+import json
+import os
+import threading
+import time
+
+
+class Span:
+    """Etapa en curso; `duration` queda disponible (en segundos) al salir"""
+    __slots__ = ('tracer', 'name', 'args', 'start_ns', 'duration')
+
+    def __init__(self, tracer, name, args):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+        self.start_ns = 0
+        self.duration = 0.0
+
+    def __enter__(self):
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration_ns = time.perf_counter_ns() - self.start_ns
+        self.duration = duration_ns / 1e9
+        if self.tracer is not None:
+            self.tracer.record(self.name, self.start_ns, duration_ns, self.args)
+        return False
+
+
+class NullTracer:
+    """Trazador que no registra nada (coste mínimo por etapa)"""
+    enabled = False
+
+    def stage(self, name, **args):
+        """Contexto que mide una etapa; aquí solo calcula `duration`"""
+        return Span(None, name, args)
+
+    def record(self, name, start_ns, duration_ns, args=None):
+        pass
+
+
+class Tracer(NullTracer):
+    """Trazador que guarda cada etapa con su inicio, duración, proceso e hilo"""
+    enabled = True
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # (nombre, inicio_ns, duración_ns, pid, tid, args)
+        self.events = []
+
+    def stage(self, name, **args):
+        return Span(self, name, args)
+
+    def record(self, name, start_ns, duration_ns, args=None):
+        event = (name, start_ns, duration_ns, os.getpid(), threading.get_ident(), args or {})
+        with self._lock:
+            self.events.append(event)
+
+    def extend(self, events):
+        """Añade eventos recogidos en otro proceso o trazador"""
+        with self._lock:
+            self.events.extend(tuple(event) for event in events)
+
+    def durations(self):
+        """Duraciones en segundos agrupadas por etapa (y por cascada en detectMultiScale)"""
+        by_stage = {}
+        with self._lock:
+            events = list(self.events)
+        for name, _, duration_ns, _, _, args in events:
+            if 'cascade' in args:
+                name = f"{name}[{args['cascade']}]"
+            by_stage.setdefault(name, []).append(duration_ns / 1e9)
+        return by_stage
+
+    def summary(self):
+        """Estadísticas por etapa: número, total, media, p50, p95 y máximo (segundos)"""
+        result = {}
+        for name, values in self.durations().items():
+            values.sort()
+            count = len(values)
+            result[name] = {
+                'count': count,
+                'total_s': sum(values),
+                'mean_s': sum(values) / count,
+                'p50_s': values[int(0.50 * (count - 1))],
+                'p95_s': values[int(0.95 * (count - 1))],
+                'max_s': values[-1],
+            }
+        return result
+
+    def to_chrome_trace(self):
+        """Eventos en formato Chrome trace (tiempos en microsegundos)"""
+        with self._lock:
+            events = list(self.events)
+        return {
+            'traceEvents': [
+                {
+                    'name': name,
+                    'ph': 'X',
+                    'ts': start_ns / 1000,
+                    'dur': duration_ns / 1000,
+                    'pid': pid,
+                    'tid': tid,
+                    'args': args,
+                }
+                for name, start_ns, duration_ns, pid, tid, args in events
+            ],
+            'displayTimeUnit': 'ms',
+        }
+
+    def write_chrome_trace(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_chrome_trace(), f)
+
+    def write_json(self, path):
+        """Guarda eventos y resumen por etapa en JSON"""
+        with self._lock:
+            events = [list(event) for event in self.events]
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'events': events, 'summary': self.summary()}, f)
+
+
+NULL_TRACER = NullTracer()
+
+_default_tracer = NULL_TRACER
+
+
+def get_tracer():
+    """Trazador usado cuando la detección no recibe uno explícito"""
+    return _default_tracer
+
+
+def set_tracer(tracer):
+    """Instala un trazador por defecto para todo el proceso (None = desactivar)"""
+    global _default_tracer
+    _default_tracer = tracer if tracer is not None else NULL_TRACER
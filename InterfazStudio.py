@@ -2,6 +2,11 @@ import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 from PIL import Image, ImageTk
 import os
+from concurrent.futures import ThreadPoolExecutor
+
+# Espera tras el último movimiento del control antes de recalcular la vista previa
+PREVIEW_DEBOUNCE_MS = 250
+PREVIEW_POLL_MS = 50
 
 class StudioInterface:
     def __init__(self, image_path=None):
@@ -25,6 +30,19 @@ class StudioInterface:
         
         # Sensitivity setting for license plate detection (0.0 = very sensitive, 1.0 = less sensitive)
         self.detection_sensitivity = 0.5
+        # Puntuación mínima del verificador rápido antes del OCR (0.0 = no descartar nada)
+        self.plate_threshold = 0.5
+        
+        # Vista previa en vivo: candidatas de la imagen actual (se calculan una vez
+        # en segundo plano) y se refiltran al mover el control de sensibilidad.
+        # El refiltrado es aproximado; cuando el control se detiene se muestra
+        # el resultado exacto (las cascadas se vuelven a ejecutar)
+        self.live_preview_enabled = False
+        self.plate_candidates = None
+        self.candidates_path = None
+        self.preview_job = None
+        self.preview_generation = 0
+        self.preview_executor = ThreadPoolExecutor(max_workers=1)
         
         # Add rounded rectangle method to Canvas
         self.add_rounded_rect_to_canvas()
@@ -202,6 +220,52 @@ class StudioInterface:
         )
         self.sensitivity_display.pack(pady=(5, 0))
         
+        # Verificador rápido: umbral para descartar regiones antes del OCR
+        threshold_title = tk.Label(
+            sensitivity_frame,
+            text="Filtro de Falsos Positivos",
+            font=("Arial", 12, "bold"),
+            fg="white",
+            bg=self.vs_code_dark
+        )
+        threshold_title.pack(anchor=tk.W, pady=(20, 10))
+        
+        self.threshold_scale = tk.Scale(
+            sensitivity_frame,
+            from_=0.0,
+            to=1.0,
+            resolution=0.05,
+            orient=tk.HORIZONTAL,
+            length=280,
+            bg=self.vs_code_dark,
+            fg="white",
+            highlightthickness=0,
+            troughcolor="#404040",
+            activebackground="#0e639c",
+            command=self.on_threshold_change
+        )
+        self.threshold_scale.set(self.plate_threshold)
+        self.threshold_scale.pack(fill=tk.X, pady=(0, 5))
+        
+        threshold_labels = tk.Frame(sensitivity_frame, bg=self.vs_code_dark)
+        threshold_labels.pack(fill=tk.X)
+        
+        tk.Label(
+            threshold_labels,
+            text="Sin filtro",
+            font=("Arial", 8),
+            fg="#cccccc",
+            bg=self.vs_code_dark
+        ).pack(side=tk.LEFT)
+        
+        tk.Label(
+            threshold_labels,
+            text="Estricto",
+            font=("Arial", 8),
+            fg="#cccccc",
+            bg=self.vs_code_dark
+        ).pack(side=tk.RIGHT)
+        
         # Image info section
         info_frame = tk.Frame(parent, bg=self.vs_code_dark)
         info_frame.pack(side=tk.BOTTOM, fill=tk.X, padx=20, pady=20)
@@ -316,6 +380,79 @@ class StudioInterface:
         self.sensitivity_tooltip_id = self.root.after(2000, 
             lambda: self.sensitivity_display.config(text=original_text, fg="#0e639c"))
         
+        self.schedule_live_preview()
+    
+    def on_threshold_change(self, value):
+        """Umbral del verificador rápido: regiones con menor puntuación no pasan al OCR"""
+        self.plate_threshold = float(value)
+        self.schedule_live_preview()
+    
+    def schedule_live_preview(self):
+        """Programa la vista previa cuando el control deja de moverse (debounce)"""
+        if not self.live_preview_enabled or not self.current_image_path:
+            return
+        if self.preview_job is not None:
+            self.root.after_cancel(self.preview_job)
+        self.preview_job = self.root.after(PREVIEW_DEBOUNCE_MS, self.run_live_preview)
+    
+    def run_live_preview(self):
+        """
+        Lanza en segundo plano la vista previa para la sensibilidad actual
+        
+        Primero el refiltrado aproximado de candidatas (inmediato) y, detrás en
+        el mismo hilo, la detección exacta, que sustituye a la aproximada.
+        """
+        self.preview_job = None
+        self.preview_generation += 1
+        generation = self.preview_generation
+        image_path = self.current_image_path
+        for exact in (False, True):
+            future = self.preview_executor.submit(
+                self.compute_live_preview, image_path, self.detection_sensitivity,
+                self.plate_threshold, generation, exact)
+            self.root.after(PREVIEW_POLL_MS, self.poll_live_preview, future, generation,
+                            image_path, exact)
+    
+    def compute_live_preview(self, image_path, sensitivity, plate_threshold, generation, exact):
+        """[Hilo de vista previa] Candidatas de la imagen (una vez) y detección aproximada o exacta"""
+        from PlateCandidates import PlateCandidates
+        
+        # El control ya se ha movido otra vez: no merece la pena el escaneo exacto
+        if exact and generation != self.preview_generation:
+            return None
+        if self.candidates_path != image_path:
+            self.plate_candidates = PlateCandidates.from_file(image_path)
+            self.candidates_path = image_path
+        if self.plate_candidates is None:
+            return None
+        return self.plate_candidates.detect(sensitivity, plate_threshold=plate_threshold,
+                                            exact=exact)
+    
+    def poll_live_preview(self, future, generation, image_path, exact):
+        """Muestra la vista previa cuando está lista, salvo que ya haya otra más reciente"""
+        if not future.done():
+            self.root.after(PREVIEW_POLL_MS, self.poll_live_preview, future, generation,
+                            image_path, exact)
+            return
+        if generation != self.preview_generation or image_path != self.current_image_path:
+            return
+        try:
+            result = future.result()
+        except Exception as e:
+            print(f"Error en la vista previa: {str(e)}")
+            return
+        if result is None or not result.success:
+            return
+        
+        self.display_processed_image(result.image)
+        filename = os.path.basename(image_path)
+        if exact:
+            self.root.title(f"Autolens Studio - {filename} [Sensibilidad {self.detection_sensitivity:.1f}: "
+                            f"{len(result.detections)} matrículas]")
+        else:
+            self.root.title(f"Autolens Studio - {filename} [Vista previa aproximada: "
+                            f"{len(result.detections)} matrículas, calculando la exacta...]")
+        
     def setup_right_panel(self, parent):
         # Default placeholder
         self.placeholder_label = tk.Label(
@@ -433,7 +570,9 @@ class StudioInterface:
             # Ejecutar detección con sensibilidad configurada
             print(f"Ruta de imagen en InterfazStudio: {self.current_image_path}")
             print(f"Sensibilidad configurada: {self.detection_sensitivity}")
-            processed_img, detected_texts, success = detect_plates_for_interface(self.current_image_path, self.detection_sensitivity)
+            print(f"Umbral del verificador: {self.plate_threshold}")
+            processed_img, detected_texts, success = detect_plates_for_interface(
+                self.current_image_path, self.detection_sensitivity, self.plate_threshold)
             
             # Cerrar ventana de progreso
             progress_window.destroy()
@@ -442,6 +581,8 @@ class StudioInterface:
                 # Mostrar imagen procesada si hay detecciones
                 if processed_img is not None:
                     self.display_processed_image(processed_img)
+                # A partir de aquí, mover la sensibilidad actualiza la imagen en vivo
+                self.live_preview_enabled = True
                 
                 # Mostrar resultados
                 result_message = "🚗 DETECCIÓN COMPLETADA\n\n"
@@ -560,6 +701,7 @@ INSTRUCCIONES:
             if success and cropped_path:
                 # Cargar automáticamente la imagen recortada en el visor
                 self.current_image_path = cropped_path
+                self.live_preview_enabled = False
                 self.display_image(cropped_path)
                 
                 # Actualizar título de ventana
@@ -594,10 +736,12 @@ INSTRUCCIONES:
         
         if file_path:
             self.current_image_path = file_path
+            self.live_preview_enabled = False
             self.display_image(file_path)
     
     def return_to_main(self):
         """Volver a la interfaz principal"""
+        self.preview_executor.shutdown(wait=False)
         self.root.destroy()
         # Importar y abrir la interfaz principal
         from Interfaz import PhotoInterface
@@ -0,0 +1,283 @@
+"""
+CANDIDATAS DE MATRÍCULA REUTILIZABLES
+=====================================
+
+Ejecuta las cascadas UNA sola vez por imagen con los parámetros más
+permisivos y guarda todas las ventanas aceptadas (sin agrupar), con el peso
+de la última etapa de cada una (`detectMultiScale3`). Cambiar la
+sensibilidad pasa a ser un filtrado de esas candidatas:
+
+1. [NumPy] Quedarse con las ventanas de tamaño >= minSize
+2. [NumPy] Quedarse con los niveles de la pirámide más próximos a los que
+   recorrería `scaleFactor` (la pirámide base es la más fina)
+3. [OpenCV] Agrupar con `groupRectangles(minNeighbors)`, igual que hace
+   `detectMultiScale` internamente
+4. [NumPy] Filtro de forma y NMS, como en `run_cascades`
+5. [OpenCV] Verificador rápido (`PlateVerifier`), como en `detect_plates`
+
+Las lecturas OCR se memorizan por caja, así que mover el control de
+sensibilidad solo lee las matrículas que no se habían leído antes.
+
+El filtrado es una APROXIMACIÓN pensada para la vista previa mientras se
+mueve el control: las cascadas Haar son sensibles a pequeños cambios de
+escala y puede perder matrículas que `detect_plates` sí encuentra (p. ej.
+wallpaperCoche.jpg a sensibilidad 0.5: 0 frente a 1) o añadir otras. Con `exact=True` se vuelven a
+ejecutar las cascadas (`run_cascades`) para esa sensibilidad y las cajas
+coinciden con las de `detect_plates`; es lo que debe mostrarse como
+resultado final.
+
+Uso:
+    candidates = PlateCandidates.from_file(ruta)
+    preview = candidates.detect(0.7)              # aproximado, inmediato
+    result = candidates.detect(0.7, exact=True)   # mismo resultado que detect_plates
+"""
+
+import math
+import threading
+import time
+
+import cv2  # OpenCV - Cascadas y agrupación de ventanas
+import numpy as np
+
+from CascadeRegistry import get_cascade_registry
+from DetectionResult import OCRRead, PlateDetection, DetectionResult
+from DetectLicenseSimple import (
+    EARLY_EXIT_CONFIDENCE, FAST_OCR_STEP, GROUP_EPS, INTERFACE_CASCADE_WORKERS, MAX_IMAGE_HEIGHT,
+    MAX_IMAGE_WIDTH, MAX_WINDOW_SIZE, PLATE_MAX_ASPECT, PLATE_MIN_ASPECT,
+    build_plate_variants, compute_detection_params, draw_detections, filter_plate_boxes,
+    limit_image_size, load_image, non_max_suppression, pyramid_window_sizes,
+    recognize_plates, record_ocr_win, run_cascades,
+)
+from Instrumentation import get_tracer
+from PlateVerifier import PLATE_SCORE_THRESHOLD, verify_plate_boxes
+
+
+# Sensibilidad con la que se calcula el superconjunto (la más permisiva)
+BASE_SENSITIVITY = 0.0
+
+# Margen sobre la relación de aspecto de la ventana de una cascada
+ASPECT_MARGIN = 1.25
+
+
+def can_produce_plates(window_size):
+    """
+    Indica si una cascada puede dar cajas con forma de matrícula
+
+    Todas sus ventanas (y la media de cada grupo) tienen la relación de
+    aspecto de la ventana original; si queda fuera del rango de matrícula,
+    el filtro de forma descartaría siempre sus detecciones.
+    """
+    width, height = window_size
+    aspect_ratio = width / max(height, 1)
+    return (aspect_ratio * ASPECT_MARGIN >= PLATE_MIN_ASPECT and
+            aspect_ratio / ASPECT_MARGIN <= PLATE_MAX_ASPECT)
+
+
+class CascadeCandidates:
+    """Ventanas sin agrupar de una cascada, con su tamaño de ventana original"""
+    __slots__ = ('name', 'window_size', 'boxes', 'level_weights')
+
+    def __init__(self, name, window_size, boxes, level_weights):
+        self.name = name
+        self.window_size = window_size
+        self.boxes = boxes                  # (N, 4) int32
+        self.level_weights = level_weights  # (N,) float64
+
+
+class PlateCandidates:
+    """[OpenCV + OCR] Superconjunto de candidatas de una imagen y lecturas memorizadas"""
+
+    def __init__(self, img, tracer=None):
+        tracer = tracer or get_tracer()
+        self.timings = {}
+        self.image = limit_image_size(img, tracer, self.timings)
+        with tracer.stage('cvtColor') as span:
+            self.gray = cv2.cvtColor(self.image, cv2.COLOR_BGR2GRAY)
+        self.timings['cvtColor'] = span.duration
+
+        self.base_params = compute_detection_params(BASE_SENSITIVITY)
+        self.cascades = []
+        self._ocr_memo = {}
+        self._exact_boxes = {}
+        self._lock = threading.Lock()
+
+        # [OpenCV] Ventanas aceptadas por cada cascada, sin agrupar (minNeighbors=0)
+        self.timings['cascades'] = 0.0
+        with get_cascade_registry().classifiers() as classifiers:
+            for name, classifier in classifiers:
+                window_size = tuple(classifier.getOriginalWindowSize())
+                if not can_produce_plates(window_size):
+                    continue
+                with tracer.stage('detectMultiScale3', cascade=name) as span:
+                    boxes, _, level_weights = classifier.detectMultiScale3(
+                        self.gray,
+                        scaleFactor=self.base_params['scale_factor'],
+                        minNeighbors=0,
+                        minSize=(self.base_params['min_size_w'], self.base_params['min_size_h']),
+                        maxSize=MAX_WINDOW_SIZE,
+                        outputRejectLevels=True
+                    )
+                self.timings['cascades'] += span.duration
+                self.timings[f'cascade:{name}'] = span.duration
+                self.cascades.append(CascadeCandidates(
+                    name,
+                    window_size,
+                    np.asarray(boxes, dtype=np.int32).reshape(-1, 4),
+                    np.asarray(level_weights, dtype=np.float64).ravel(),
+                ))
+
+    @classmethod
+    def from_file(cls, image_path, tracer=None):
+        """[OpenCV] Crea las candidatas de una imagen en disco (None si no se puede leer)"""
+        img = load_image(image_path, max_size=(MAX_IMAGE_WIDTH, MAX_IMAGE_HEIGHT))
+        if img is None:
+            return None
+        return cls(img, tracer)
+
+    def _level_mask(self, candidates, scale_factor):
+        """
+        [NumPy] Ventanas de los niveles base más próximos a la pirámide de `scale_factor`
+
+        Con el mismo scaleFactor que la base se conservan todas. Con uno mayor,
+        cada nivel de la pirámide pedida se asocia al nivel base de escala más
+        parecida, para que el número de vecinos sea comparable.
+        """
+        base_factor = self.base_params['scale_factor']
+        if len(candidates.boxes) == 0 or math.isclose(scale_factor, base_factor):
+            return np.ones(len(candidates.boxes), dtype=bool)
+
+        window_w = candidates.window_size[0]
+        max_w = int(candidates.boxes[:, 2].max())
+        levels = int(math.log(max(max_w / window_w, 1.0)) / math.log(base_factor)) + 2
+        base_sizes = pyramid_window_sizes(candidates.window_size, base_factor, levels)
+
+        ratio = math.log(scale_factor) / math.log(base_factor)
+        kept_levels = {int(round(j * ratio)) for j in range(int(levels / ratio) + 2)}
+        kept_sizes = np.array([size for k, size in enumerate(base_sizes) if k in kept_levels],
+                              dtype=np.int32).reshape(-1, 2)
+
+        sizes = candidates.boxes[:, 2:4]
+        return (sizes[:, None, :] == kept_sizes[None, :, :]).all(axis=2).any(axis=1)
+
+    def boxes(self, sensitivity):
+        """
+        [OpenCV + NumPy] Cajas finales para una sensibilidad, sin volver a escanear
+
+        Returns:
+            np.ndarray: Cajas (x, y, w, h), forma (N, 4), como `run_cascades`
+        """
+        params = compute_detection_params(sensitivity)
+        grouped = []
+        for candidates in self.cascades:
+            boxes = candidates.boxes
+            keep = ((boxes[:, 2] >= params['min_size_w']) & (boxes[:, 3] >= params['min_size_h']) &
+                    self._level_mask(candidates, params['scale_factor']))
+            if not keep.any():
+                continue
+            plates, _ = cv2.groupRectangles(boxes[keep].tolist(), params['min_neighbors'], GROUP_EPS)
+            if len(plates):
+                grouped.append(np.asarray(plates, dtype=np.int32).reshape(-1, 4))
+
+        all_detections = np.concatenate(grouped) if grouped else np.empty((0, 4), np.int32)
+        all_detections = filter_plate_boxes(all_detections, params['min_area'],
+                                            params['min_size_w'], params['min_size_h'])
+        return non_max_suppression(all_detections)
+
+    def exact_boxes(self, sensitivity, tracer=None):
+        """
+        [OpenCV] Cajas de `run_cascades` para una sensibilidad (memorizadas)
+
+        Las mismas que calcula `detect_plates` sobre esta imagen: cuesta un
+        escaneo completo, por eso se reserva para cuando el control se detiene.
+        """
+        params = compute_detection_params(sensitivity)
+        key = tuple(sorted(params.items()))
+        with self._lock:
+            boxes = self._exact_boxes.get(key)
+        if boxes is None:
+            with get_cascade_registry().classifiers() as classifiers:
+                boxes = run_cascades(self.gray, classifiers, params, tracer,
+                                     workers=INTERFACE_CASCADE_WORKERS, split_scales=True)
+            with self._lock:
+                self._exact_boxes[key] = boxes
+        return boxes
+
+    def detect(self, sensitivity, ocr=True, early_exit_conf=EARLY_EXIT_CONFIDENCE,
+               reorder_variants=True, tracer=None, plate_threshold=PLATE_SCORE_THRESHOLD,
+               fast_ocr=True, exact=False):
+        """
+        [OpenCV + OCR] Detección para una sensibilidad reutilizando candidatas y lecturas
+
+        Args:
+            exact (bool): Volver a ejecutar las cascadas (`exact_boxes`) en lugar
+                de filtrar el superconjunto; False = aproximación para la vista previa
+
+        Returns:
+            DetectionResult: Copia anotada de la imagen y lista de PlateDetection
+        """
+        tracer = tracer or get_tracer()
+        try:
+            start = time.perf_counter()
+            timings = {}
+            with tracer.stage('filter_candidates', exact=exact) as span:
+                candidates = self.exact_boxes(sensitivity, tracer) if exact else self.boxes(sensitivity)
+                boxes = verify_plate_boxes(self.gray, candidates, plate_threshold)
+                boxes = [tuple(int(v) for v in box) for box in boxes]
+            timings['filter'] = span.duration
+
+            # [OCR] Leer solo las cajas que no se habían leído antes
+            with self._lock:
+                missing = [box for box in boxes if box not in self._ocr_memo] if ocr else []
+            if missing:
+                plate_variants = []
+                plate_timings = []
+                for x, y, w, h in missing:
+                    with tracer.stage('preprocess', box=[x, y, w, h]) as span:
+                        plate_variants.append(build_plate_variants(self.gray[y:y + h, x:x + w]))
+                    plate_timings.append({'preprocess': span.duration, 'ocr': 0.0})
+                stage_start = time.perf_counter()
+                ocr_results, _ = recognize_plates(
+                    plate_variants, early_exit_conf, reorder_variants, tracer, plate_timings,
+                    fast_ocr
+                )
+                timings['ocr'] = time.perf_counter() - stage_start
+                with self._lock:
+                    for box, variants, plate_results, plate_timing in zip(
+                            missing, plate_variants, ocr_results, plate_timings):
+                        best_step, best_read = best_variant_read(variants, plate_results)
+                        record_ocr_win(best_step, best_read)
+                        self._ocr_memo[box] = (best_step, best_read, plate_timing)
+
+            detections = []
+            for box in boxes:
+                with self._lock:
+                    memo = self._ocr_memo.get(box) if ocr else None
+                if memo is None:
+                    best_step, best_read, plate_timing = "", OCRRead.empty("OCR desactivado"), {}
+                else:
+                    best_step, best_read, plate_timing = memo
+                detections.append(PlateDetection(
+                    box, best_read.text, best_read.confidence,
+                    best_step, best_read.message, plate_timing
+                ))
+
+            img = draw_detections(self.image.copy(), detections)
+            timings['total'] = time.perf_counter() - start
+            return DetectionResult(img, detections, True, None, timings)
+
+        except Exception as e:
+            return DetectionResult.failure(f"Error durante la detección: {str(e)}")
+
+
+def best_variant_read(variants, plate_results):
+    """[OCR] Lectura con mayor confianza (ante un empate, la de plantillas o la primera variante)"""
+    best_step = ""
+    best_read = OCRRead.empty("OCR desactivado")
+    fast_read = plate_results.get(FAST_OCR_STEP)
+    if fast_read is not None and fast_read.confidence > 0:
+        best_step, best_read = FAST_OCR_STEP, fast_read
+    for step_name, _ in variants:
+        read = plate_results.get(step_name)
+        if read is not None and (not best_step or read.confidence > best_read.confidence):
+            best_step, best_read = step_name, read
+    return best_step, best_read
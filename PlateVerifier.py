@@ -0,0 +1,164 @@
+"""
+VERIFICADOR RÁPIDO DE MATRÍCULAS
+================================
+
+Puntúa cada región detectada por las cascadas (0 = no parece una matrícula,
+1 = sí lo parece) antes de gastar llamadas de EasyOCR en ella. Solo usa
+operaciones baratas de OpenCV y NumPy sobre el recorte en escala de grises:
+
+1. [OpenCV] Redimensionar a una altura fija
+2. [NumPy] Contraste (percentiles 5 y 95)
+3. [OpenCV] Umbral de Otsu y componentes conexas con forma de carácter
+4. [NumPy] Número de caracteres y uniformidad de sus alturas
+5. [OpenCV + NumPy] Periodicidad de los bordes: cuántas veces el perfil de
+   bordes verticales de la franja central cruza su media
+
+Se prueban las dos polaridades (texto oscuro sobre fondo claro y al revés)
+y se queda la mejor puntuación.
+
+Uso:
+    score = plate_score(gray[y:y + h, x:x + w])
+    boxes = verify_plate_boxes(gray, boxes, PLATE_SCORE_THRESHOLD)
+"""
+
+import cv2  # OpenCV - Umbralización y componentes conexas
+import numpy as np
+
+
+# Umbral por defecto: por debajo, la región se descarta antes del OCR (0 = no filtrar).
+# En source/Aparte con sensibilidad 0.0 conserva todas las matrículas bien
+# encuadradas (>= 0.84) y descarta 14 de las 20 regiones que no lo son.
+PLATE_SCORE_THRESHOLD = 0.5
+
+# Altura a la que se normaliza el recorte
+VERIFY_HEIGHT = 40
+
+# Forma de un carácter, relativa al recorte normalizado
+CHAR_MIN_HEIGHT = 0.2           # Fracción de la altura del recorte
+CHAR_MAX_HEIGHT = 0.95
+CHAR_MAX_WIDTH = 0.25           # Fracción de la anchura del recorte
+CHAR_MIN_ASPECT = 0.8           # alto / ancho
+CHAR_MAX_ASPECT = 8.0
+
+# Número de caracteres y de picos de bordes esperado en una matrícula
+CHAR_COUNT_RANGE = (3, 10)
+EDGE_PEAK_RANGE = (5, 16)
+
+# Contraste (p95 - p5) a partir del cual la puntuación empieza a subir y se satura
+CONTRAST_RANGE = (0.15, 0.5)
+
+# Variación relativa de las alturas de los caracteres que anula su puntuación
+MAX_HEIGHT_VARIATION = 0.4
+
+
+def range_score(value, low, high, falloff):
+    """1 dentro de [low, high] y decrece linealmente hasta 0 a `falloff` unidades del rango"""
+    if value < low:
+        return max(0.0, 1.0 - (low - value) / falloff)
+    if value > high:
+        return max(0.0, 1.0 - (value - high) / falloff)
+    return 1.0
+
+
+def character_features(binary):
+    """
+    [OpenCV + NumPy] Caracteres de una máscara binaria (texto = 255)
+
+    Returns:
+        tuple: (número de caracteres, variación relativa de sus alturas)
+    """
+    height, width = binary.shape[:2]
+    _, _, stats, _ = cv2.connectedComponentsWithStats(binary, connectivity=8)
+    char_heights = []
+    for _, _, w, h, _ in stats[1:]:
+        if not CHAR_MIN_HEIGHT * height <= h <= CHAR_MAX_HEIGHT * height:
+            continue
+        if w > CHAR_MAX_WIDTH * width or not CHAR_MIN_ASPECT <= h / w <= CHAR_MAX_ASPECT:
+            continue
+        char_heights.append(h)
+
+    # Con menos de tres caracteres la uniformidad de alturas no dice nada
+    if len(char_heights) >= CHAR_COUNT_RANGE[0]:
+        height_variation = float(np.std(char_heights) / np.mean(char_heights))
+    else:
+        height_variation = 1.0
+    return len(char_heights), height_variation
+
+
+def edge_peaks(img):
+    """
+    [OpenCV + NumPy] Picos del perfil de bordes verticales en la franja central
+
+    Los caracteres alternan bordes de subida y bajada a intervalos parecidos;
+    el perfil (media por columna de |Sobel x|) cruza su media unas dos veces
+    por carácter. Un fondo liso da pocos cruces y una textura fina, muchos.
+    """
+    height = img.shape[0]
+    band = img[int(height * 0.25):int(height * 0.75)]
+    profile = np.abs(cv2.Sobel(band, cv2.CV_32F, 1, 0, ksize=3)).mean(axis=0)
+    profile = cv2.blur(profile.reshape(1, -1), (3, 1)).ravel()
+    above = profile > profile.mean()
+    return int(np.count_nonzero(above[1:] & ~above[:-1]))
+
+
+def plate_features(region):
+    """
+    [OpenCV + NumPy] Características de un recorte en escala de grises
+
+    Returns:
+        dict: contraste, picos de bordes, caracteres y variación de alturas (mejor polaridad)
+    """
+    height, width = region.shape[:2]
+    if height < 4 or width < 8:
+        return {'contrast': 0.0, 'chars': 0, 'height_variation': 1.0, 'edge_peaks': 0}
+
+    scale = VERIFY_HEIGHT / height
+    img = cv2.resize(region, (max(1, int(round(width * scale))), VERIFY_HEIGHT),
+                     interpolation=cv2.INTER_AREA if scale < 1 else cv2.INTER_LINEAR)
+
+    low, high = np.percentile(img, (5, 95))
+    features = {'contrast': float(high - low) / 255.0, 'edge_peaks': edge_peaks(img)}
+
+    # [OpenCV] Otsu; se prueban texto oscuro (lo habitual) y texto claro
+    _, dark_text = cv2.threshold(img, 0, 255, cv2.THRESH_BINARY_INV | cv2.THRESH_OTSU)
+    best = None
+    for binary in (dark_text, cv2.bitwise_not(dark_text)):
+        chars, height_variation = character_features(binary)
+        candidate = dict(features, chars=chars, height_variation=height_variation)
+        if best is None or features_score(candidate) > features_score(best):
+            best = candidate
+    return best
+
+
+def features_score(features):
+    """Puntuación 0-1: media de las puntuaciones de cada característica"""
+    low, high = CONTRAST_RANGE
+    scores = (
+        min(1.0, max(0.0, (features['contrast'] - low) / (high - low))),
+        range_score(features['chars'], *CHAR_COUNT_RANGE, falloff=3),
+        max(0.0, 1.0 - features['height_variation'] / MAX_HEIGHT_VARIATION),
+        range_score(features['edge_peaks'], *EDGE_PEAK_RANGE, falloff=5),
+    )
+    return sum(scores) / len(scores)
+
+
+def plate_score(region):
+    """[OpenCV + NumPy] Puntuación 0-1 de que un recorte en escala de grises sea una matrícula"""
+    return features_score(plate_features(region))
+
+
+def verify_plate_boxes(gray, boxes, threshold=PLATE_SCORE_THRESHOLD):
+    """
+    [OpenCV + NumPy] Descarta las cajas (x, y, w, h) cuyo recorte no parece una matrícula
+
+    Returns:
+        np.ndarray: Cajas con puntuación >= threshold, en el mismo orden, forma (N, 4)
+    """
+    boxes = np.asarray(boxes, dtype=np.int32).reshape(-1, 4)
+    if threshold <= 0 or len(boxes) == 0:
+        return boxes
+    keep = [plate_score(gray[y:y + h, x:x + w]) >= threshold for x, y, w, h in boxes]
+    rejected = len(boxes) - sum(keep)
+    if rejected:
+        print(f"Verificador: {rejected} de {len(boxes)} regiones descartadas antes del OCR")
+    return boxes[np.asarray(keep, dtype=bool)]
@@ -0,0 +1,324 @@
+"""
+POOL DE LECTORES EASYOCR
+========================
+
+Un `easyocr.Reader` no debe usarse desde varios hilos a la vez (comparte el
+modelo de torch y su estado). El pool guarda un número acotado de lectores;
+cada hilo toma uno prestado, lee sus matrículas y lo devuelve. Si no queda
+ninguno libre y el pool está lleno, espera a que otro hilo devuelva el suyo.
+
+TAMAÑO:
+• Los lectores se crean bajo demanda, hasta `size`
+• Por defecto, los que caben en MEMORY_FRACTION de la memoria disponible
+  (READER_MEMORY_BYTES por lector) sin pasar del número de núcleos
+
+IDIOMAS:
+`ReaderPoolCache` guarda un pool por conjunto de idiomas en una caché LRU
+con un presupuesto de memoria para los lectores de todos ellos:
+• Ningún pool pasa de `memory_budget // reader_bytes` lectores
+• Antes de crear un lector que no cabe, se descartan los pools usados hace
+  más tiempo que no tienen préstamos en curso
+• Si no hay ninguno que descartar, el pool espera a uno de sus lectores (o,
+  si aún no tiene ninguno, a que otro pool quede libre)
+Para leer se usa `ReaderPoolCache.reader()`, que marca el pool como en uso
+mientras dura el préstamo y así nunca se descarta con lectores prestados.
+
+HILOS:
+torch fija los hilos intra-op para todo el proceso, no por modelo. Si se
+indica el tamaño del pool (o los hilos), el pool reparte los núcleos entre sus
+lectores (núcleos / tamaño) y lo aplica al crear el primero, para que varios
+lectores en paralelo no se quiten los núcleos entre sí. Sin ninguno de los
+dos, torch conserva su valor por defecto (un hilo por núcleo): con un solo
+lector ocupado cada vez, como en la interfaz, es lo más rápido.
+
+Uso:
+    pool = ReaderPool(lambda: load_reader(['en'], gpu=False), size=2)
+    with pool.reader() as reader:
+        reader.recognize(...)
+
+    pools = ReaderPoolCache(lambda languages: ReaderPool(...))
+    with pools.reader(('en', 'ru')) as reader:
+        ...
+"""
+
+import collections
+import contextlib
+import os
+import threading
+
+
+# Memoria aproximada de un lector (detector CRAFT + reconocedor + tensores de trabajo)
+READER_MEMORY_BYTES = 400 * 2**20
+
+# Fracción de la memoria disponible que pueden ocupar los lectores
+MEMORY_FRACTION = 0.5
+
+
+def available_memory_bytes():
+    """Memoria física libre en bytes (None si el sistema no lo permite)"""
+    try:
+        return os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def default_memory_budget(memory_fraction=MEMORY_FRACTION, reader_bytes=READER_MEMORY_BYTES):
+    """Memoria para lectores: una fracción de la disponible, y al menos un lector"""
+    available = available_memory_bytes()
+    if available is None:
+        return reader_bytes
+    return max(reader_bytes, int(available * memory_fraction))
+
+
+def default_pool_size(reader_bytes=READER_MEMORY_BYTES, memory_fraction=MEMORY_FRACTION):
+    """Lectores que caben en la memoria disponible, entre 1 y el número de núcleos"""
+    cpus = os.cpu_count() or 1
+    available = available_memory_bytes()
+    if available is None:
+        return 1
+    return max(1, min(cpus, int(available * memory_fraction // reader_bytes)))
+
+
+class ReaderPool:
+    """[OCR] Conjunto acotado de lectores con préstamo y devolución, seguro entre hilos"""
+
+    def __init__(self, factory, size=None, threads=None, configure_threads=None):
+        """
+        Args:
+            factory (callable): Crea un lector nuevo
+            size (int): Máximo de lectores (None = `default_pool_size()`)
+            threads (int): Hilos de torch por lector (None = núcleos / `size` si
+                se indica `size`; si no, no se cambian)
+            configure_threads (callable): Aplica ese número de hilos (p. ej.
+                `torch.set_num_threads`); se llama antes de crear el primer lector
+        """
+        self.factory = factory
+        self.size = max(1, size or default_pool_size())
+        if threads is None and size:
+            threads = max(1, (os.cpu_count() or 1) // self.size)
+        self.threads = threads
+        self._configure_threads = configure_threads
+        self._condition = threading.Condition()
+        self._idle = []
+        self._created = 0
+        self._threads_configured = False
+        self._reserve = None
+        self._release = None
+
+    def attach_budget(self, max_size, reserve, release):
+        """
+        Comparte un presupuesto de memoria con otros pools (lo usa `ReaderPoolCache`)
+
+        Args:
+            max_size (int): Máximo de lectores que caben en el presupuesto
+            reserve (callable): Reserva sitio para un lector más, esperando como
+                mucho `timeout` segundos (TimeoutError si se agotan); False si no
+                lo hay y hay que esperar a uno de los lectores ya creados
+            release (callable): Devuelve la reserva de un lector que no se creó
+        """
+        self.size = max(1, min(self.size, max_size))
+        self._reserve = reserve
+        self._release = release
+
+    def _create(self):
+        """Crea un lector; el hueco ya está reservado en `_created`"""
+        try:
+            with self._condition:
+                if (not self._threads_configured and self.threads is not None and
+                        self._configure_threads is not None):
+                    self._configure_threads(self.threads)
+                    self._threads_configured = True
+            return self.factory()
+        except Exception:
+            if self._release is not None:
+                self._release()
+            with self._condition:
+                self._created -= 1
+                self._condition.notify()
+            raise
+
+    def checkout(self, timeout=None):
+        """
+        Toma prestado un lector (crea uno si hay hueco; si no, espera)
+
+        Raises:
+            TimeoutError: Si no queda ninguno libre en `timeout` segundos
+        """
+        with self._condition:
+            while not self._idle and self._created >= self.size:
+                if not self._condition.wait(timeout):
+                    raise TimeoutError("No hay lectores de OCR libres")
+            if self._idle:
+                return self._idle.pop()
+            self._created += 1
+        try:
+            reserved = self._reserve is None or self._reserve(timeout)
+        except TimeoutError:
+            with self._condition:
+                self._created -= 1
+                self._condition.notify()
+            raise
+        if reserved:
+            return self._create()
+
+        # Sin memoria para otro lector: esperar a que se devuelva uno de los creados
+        with self._condition:
+            self._created -= 1
+            while not self._idle:
+                if not self._condition.wait(timeout):
+                    raise TimeoutError("No hay lectores de OCR libres")
+            return self._idle.pop()
+
+    def checkin(self, reader):
+        """Devuelve un lector prestado"""
+        with self._condition:
+            self._idle.append(reader)
+            self._condition.notify()
+
+    @contextlib.contextmanager
+    def reader(self, timeout=None):
+        """Lector prestado durante el bloque `with`"""
+        reader = self.checkout(timeout)
+        try:
+            yield reader
+        finally:
+            self.checkin(reader)
+
+    def preload(self, count=1):
+        """Crea por adelantado hasta `count` lectores libres; devuelve cuántos hay creados"""
+        readers = [self.checkout() for _ in range(min(count, self.size))]
+        for reader in readers:
+            self.checkin(reader)
+        return self.stats()['created']
+
+    def stats(self):
+        """Lectores creados, libres y prestados"""
+        with self._condition:
+            return {'size': self.size, 'created': self._created, 'idle': len(self._idle),
+                    'in_use': self._created - len(self._idle), 'threads': self.threads}
+
+
+def language_key(languages):
+    """Clave de un conjunto de idiomas: sin repetidos y en orden (('en', 'es') == ('es', 'en'))"""
+    return tuple(sorted(set(languages)))
+
+
+class ReaderPoolCache:
+    """[OCR] Un pool de lectores por conjunto de idiomas, en LRU acotado por memoria"""
+
+    def __init__(self, pool_factory, memory_budget=None, reader_bytes=READER_MEMORY_BYTES):
+        """
+        Args:
+            pool_factory (callable): Crea el ReaderPool de una tupla de idiomas
+            memory_budget (int): Bytes para lectores (None = `default_memory_budget()`)
+            reader_bytes (int): Memoria estimada de cada lector
+        """
+        self.pool_factory = pool_factory
+        self.memory_budget = memory_budget or default_memory_budget(reader_bytes=reader_bytes)
+        self.reader_bytes = reader_bytes
+        self.max_readers = max(1, self.memory_budget // reader_bytes)
+        self._pools = collections.OrderedDict()
+        self._readers = collections.Counter()   # Lectores creados (o en creación) por idiomas
+        self._leases = collections.Counter()    # Préstamos en curso por idiomas
+        self._condition = threading.Condition()
+
+    def _pool(self, key):
+        """Pool de `key`, creado si no existe y marcado como el más reciente (con el candado)"""
+        pool = self._pools.get(key)
+        if pool is None:
+            pool = self.pool_factory(key)
+            pool.attach_budget(self.max_readers,
+                               lambda timeout=None: self._reserve(key, timeout),
+                               lambda: self._release(key))
+            self._pools[key] = pool
+        self._pools.move_to_end(key)
+        return pool
+
+    def get(self, languages):
+        """
+        Pool de un conjunto de idiomas (lo crea si no existe y lo marca como el más reciente)
+
+        Para leer, mejor `reader()`: un pool obtenido así puede descartarse
+        mientras se usa si otro conjunto de idiomas necesita la memoria.
+        """
+        with self._condition:
+            return self._pool(language_key(languages))
+
+    @contextlib.contextmanager
+    def reader(self, languages, timeout=None):
+        """Lector de un conjunto de idiomas prestado durante el bloque `with`"""
+        key = language_key(languages)
+        with self._condition:
+            pool = self._pool(key)
+            self._leases[key] += 1
+        try:
+            with pool.reader(timeout) as reader:
+                yield reader
+        finally:
+            self._unpin(key)
+
+    def preload(self, languages, count=1):
+        """Crea por adelantado hasta `count` lectores de un conjunto de idiomas"""
+        key = language_key(languages)
+        with self._condition:
+            pool = self._pool(key)
+            self._leases[key] += 1
+        try:
+            return pool.preload(count)
+        finally:
+            self._unpin(key)
+
+    def _unpin(self, key):
+        """Termina un préstamo de `key`; otros pools pueden estar esperando a descartarlo"""
+        with self._condition:
+            self._leases[key] -= 1
+            self._condition.notify_all()
+
+    def _reserve(self, key, timeout=None):
+        """
+        Reserva memoria para un lector más de `key`, descartando pools sin uso si hace falta
+
+        Returns:
+            bool: False si no cabe y `key` ya tiene lectores (que espere a uno de ellos)
+
+        Raises:
+            TimeoutError: Si todos los pools están en uso durante `timeout` segundos
+        """
+        with self._condition:
+            while sum(self._readers.values()) >= self.max_readers:
+                victim = next((other for other in self._pools
+                               if other != key and not self._leases[other]), None)
+                if victim is not None:
+                    self._evict(victim)
+                elif self._readers[key]:
+                    return False
+                elif not self._condition.wait(timeout):
+                    raise TimeoutError("No hay lectores de OCR libres")
+            self._readers[key] += 1
+            return True
+
+    def _release(self, key):
+        """Devuelve la reserva de un lector que no se llegó a crear"""
+        with self._condition:
+            self._readers[key] -= 1
+            self._condition.notify_all()
+
+    def _evict(self, key):
+        """Descarta un pool sin préstamos; sus lectores libres se liberan con él"""
+        del self._pools[key]
+        readers = self._readers.pop(key, 0)
+        self._leases.pop(key, None)
+        print(f"Lectores OCR {'+'.join(key)} descartados ({readers}, LRU)")
+
+    def languages(self):
+        """Conjuntos de idiomas con pool, del menos al más reciente"""
+        with self._condition:
+            return list(self._pools)
+
+    def stats(self):
+        """Memoria estimada, presupuesto y estado de cada pool"""
+        with self._condition:
+            pools = dict(self._pools)
+            memory_bytes = sum(self._readers.values()) * self.reader_bytes
+        return {'memory_bytes': memory_bytes, 'memory_budget': self.memory_budget,
+                'pools': {'+'.join(key): pool.stats() for key, pool in pools.items()}}
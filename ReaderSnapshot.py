@@ -0,0 +1,154 @@
+"""
+INSTANTÁNEA DEL LECTOR EASYOCR
+==============================
+
+Construir `easyocr.Reader` repite en cada proceso el mismo trabajo: calcular
+el MD5 de los ficheros de modelo (el detector CRAFT ocupa ~80 MB), crear las
+redes, cargar sus pesos y cuantizarlas. Con la instantánea, la primera vez se
+guarda en disco el lector ya construido (detector, reconocedor y conversor de
+etiquetas, con `torch.save`) y las siguientes se carga tal cual:
+
+1. Crear un `easyocr.Reader` vacío (`detector=False, recognizer=False`):
+   solo prepara idiomas y juego de caracteres
+2. Cargar la instantánea y asignar sus modelos al lector
+
+La clave de la instantánea incluye idiomas, dispositivo, cuantización,
+versiones de torch y EasyOCR y tamaño/fecha de los ficheros de modelo; si
+algo cambia, se reconstruye el lector y se guarda una instantánea nueva.
+Si la instantánea no se puede reproducir (clave incalculable, fichero
+dañado, modelos que faltan o un lector que no reconoce un recorte de
+prueba), se avisa y se construye el lector normal desde los pesos.
+
+AVISO: la instantánea es un pickle de torch y cargarla ejecuta código. Su
+directorio merece la misma confianza que el de los modelos de EasyOCR.
+
+Uso:
+    reader = load_reader(['en'], gpu=False)                  # con instantánea
+    reader = load_reader(['en'], gpu=False, snapshot=False)  # como easyocr.Reader
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+
+import numpy as np
+
+try:
+    import easyocr
+    import torch
+    from easyocr.config import MODULE_PATH as EASYOCR_MODULE_PATH
+    SNAPSHOT_AVAILABLE = True
+except ImportError:
+    SNAPSHOT_AVAILABLE = False
+
+
+SNAPSHOT_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'autolens', 'ocr_snapshots')
+
+# Versión del formato de la instantánea; cambiarla invalida las existentes
+SNAPSHOT_FORMAT_VERSION = 1
+
+# Atributos del lector que crean `detector=True` y `recognizer=True`
+SNAPSHOT_ATTRIBUTES = ('detector', 'recognizer', 'converter',
+                       'detect_network', 'get_detector', 'get_textbox')
+
+
+def model_files(model_dir):
+    """Ficheros de modelo de EasyOCR con su tamaño y fecha de modificación"""
+    if not os.path.isdir(model_dir):
+        return []
+    files = []
+    for filename in sorted(os.listdir(model_dir)):
+        path = os.path.join(model_dir, filename)
+        if filename.endswith('.pth') and os.path.isfile(path):
+            stat = os.stat(path)
+            files.append([filename, stat.st_size, stat.st_mtime_ns])
+    return files
+
+
+def snapshot_path(lang_list, gpu=False, quantize=True, snapshot_dir=SNAPSHOT_DIR):
+    """Ruta de la instantánea para una configuración del lector"""
+    description = json.dumps([
+        SNAPSHOT_FORMAT_VERSION, list(lang_list), gpu, quantize,
+        easyocr.__version__, torch.__version__,
+        model_files(os.path.join(EASYOCR_MODULE_PATH, 'model')),
+    ])
+    key = hashlib.blake2b(description.encode('utf-8'), digest_size=12).hexdigest()
+    return os.path.join(snapshot_dir, f"reader_{'-'.join(lang_list)}_{key}.pt")
+
+
+def save_snapshot(reader, path):
+    """
+    Guarda los modelos de un lector ya construido
+
+    Se escribe en un fichero temporal y se renombra, así varios procesos que
+    arrancan a la vez nunca leen una instantánea a medias.
+    """
+    state = {name: getattr(reader, name) for name in SNAPSHOT_ATTRIBUTES if hasattr(reader, name)}
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            torch.save(state, f)
+        os.replace(tmp_path, path)
+    except Exception:
+        os.unlink(tmp_path)
+        raise
+
+
+def load_snapshot(path, lang_list, gpu=False, quantize=True):
+    """Lector vacío con los modelos de la instantánea asignados"""
+    reader = easyocr.Reader(lang_list, gpu=gpu, quantize=quantize,
+                            detector=False, recognizer=False, verbose=False)
+    state = torch.load(path, map_location=reader.device, weights_only=False)
+    for name, value in state.items():
+        setattr(reader, name, value)
+    return reader
+
+
+def check_reader(reader):
+    """Comprueba que un lector restaurado tiene sus modelos y reconoce un recorte en blanco"""
+    missing = [name for name in ('recognizer', 'converter') if getattr(reader, name, None) is None]
+    if missing:
+        raise ValueError(f"faltan {', '.join(missing)}")
+    reader.recognize(np.full((32, 100), 255, dtype=np.uint8))
+
+
+def load_reader(lang_list, gpu=False, quantize=True, snapshot=True, snapshot_dir=SNAPSHOT_DIR):
+    """
+    [OCR] Crea un `easyocr.Reader`, desde la instantánea si existe
+
+    Args:
+        lang_list (list): Idiomas del lector
+        snapshot (bool): Usar (y crear si falta) la instantánea en `snapshot_dir`
+
+    Returns:
+        easyocr.Reader: Lector listo para usar
+    """
+    if not snapshot:
+        return easyocr.Reader(lang_list, gpu=gpu, quantize=quantize)
+
+    try:
+        path = snapshot_path(lang_list, gpu, quantize, snapshot_dir)
+    except Exception as e:
+        print(f"AVISO: instantánea del lector no disponible ({str(e) or type(e).__name__}); "
+              f"se construye el lector normal")
+        return easyocr.Reader(lang_list, gpu=gpu, quantize=quantize)
+
+    if os.path.isfile(path):
+        try:
+            reader = load_snapshot(path, lang_list, gpu, quantize)
+            check_reader(reader)
+            print(f"Lector EasyOCR cargado de la instantánea {os.path.basename(path)}")
+            return reader
+        except Exception as e:
+            print(f"AVISO: la instantánea del lector no se puede reproducir "
+                  f"({str(e) or type(e).__name__}); se construye el lector normal")
+
+    reader = easyocr.Reader(lang_list, gpu=gpu, quantize=quantize)
+    try:
+        save_snapshot(reader, path)
+        print(f"Instantánea del lector guardada en {path}")
+    except Exception as e:
+        print(f"No se pudo guardar la instantánea del lector: {str(e)}")
+    return reader
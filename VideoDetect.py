@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+DETECCIÓN DE MATRÍCULAS EN VÍDEO / STREAMS
+==========================================
+
+Aplica el flujo de `DetectLicenseSimple` sobre cualquier fuente que pueda
+abrir `cv2.VideoCapture` (ficheros como `source/Final.mp4`, cámaras, RTSP).
+
+FLUJO DEL SISTEMA:
+1. [OpenCV] Un hilo decodificador lee la fuente y conserva 1 de cada
+   `frame_stride` fotogramas (el resto solo se avanza con `grab()`, sin decodificar)
+2. Los fotogramas se encolan en una cola acotada
+3. Si la detección va por detrás del tiempo real, la política 'drop_oldest'
+   descarta los fotogramas más antiguos para procesar siempre lo más reciente
+4. [OpenCV + OCR] Cada fotograma se procesa con `detect_plates`
+5. Las detecciones se devuelven con marca de tiempo mediante un generador
+
+Uso:
+    python VideoDetect.py source/Final.mp4 [--stride 5] [--realtime]
+"""
+
+import argparse
+import collections
+import sys
+import threading
+import time
+
+import cv2  # OpenCV - Lectura de vídeo
+
+from DetectLicenseSimple import detect_plates
+
+DROP_OLDEST = 'drop_oldest'
+BLOCK = 'block'
+
+
+class FrameQueue:
+    """Cola acotada de fotogramas con política de descarte configurable"""
+
+    def __init__(self, maxsize, drop_policy=DROP_OLDEST):
+        if drop_policy not in (DROP_OLDEST, BLOCK):
+            raise ValueError(f"Política de descarte no válida: {drop_policy}")
+        self.maxsize = max(1, int(maxsize))
+        self.drop_policy = drop_policy
+        self.dropped = 0
+        self.closed = False
+        self._items = collections.deque()
+        self._cond = threading.Condition()
+
+    def put(self, item, stop_event=None):
+        """Encola un fotograma; descarta el más antiguo o espera si está llena"""
+        with self._cond:
+            while len(self._items) >= self.maxsize:
+                if self.drop_policy == DROP_OLDEST:
+                    self._items.popleft()
+                    self.dropped += 1
+                    break
+                if stop_event is not None and stop_event.is_set():
+                    return
+                self._cond.wait(timeout=0.1)
+            self._items.append(item)
+            self._cond.notify_all()
+
+    def get(self):
+        """Devuelve el siguiente fotograma o None si la cola está cerrada y vacía"""
+        with self._cond:
+            while not self._items and not self.closed:
+                self._cond.wait()
+            if not self._items:
+                return None
+            item = self._items.popleft()
+            self._cond.notify_all()
+            return item
+
+    def close(self):
+        """Indica que no llegarán más fotogramas"""
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+
+def _decode_frames(cap, frame_queue, stop_event, frame_stride, fps, realtime):
+    """[Hilo decodificador] Lee la fuente y encola uno de cada `frame_stride` fotogramas"""
+    frame_index = 0
+    start = time.monotonic()
+    try:
+        while not stop_event.is_set():
+            if frame_index % frame_stride != 0:
+                # Avanzar sin decodificar los fotogramas que se saltan
+                if not cap.grab():
+                    break
+                frame_index += 1
+                continue
+
+            ret, frame = cap.read()
+            if not ret:
+                break
+
+            timestamp_s = frame_index / fps
+            if realtime:
+                # Emular una fuente en directo: no adelantarse al reloj del vídeo
+                delay = timestamp_s - (time.monotonic() - start)
+                if delay > 0:
+                    time.sleep(delay)
+
+            frame_queue.put((frame_index, timestamp_s, frame), stop_event)
+            frame_index += 1
+    finally:
+        frame_queue.close()
+
+
+def detect_plates_in_video(source, sensitivity=0.5, frame_stride=5, queue_size=8,
+                           drop_policy=None, realtime=None):
+    """
+    [OpenCV + OCR] Generador de detecciones de matrículas sobre un vídeo
+
+    Args:
+        source (str | int): Ruta, URL o índice de cámara para `cv2.VideoCapture`
+        sensitivity (float): Sensibilidad de detección (0.0 - 1.0)
+        frame_stride (int): Procesar uno de cada N fotogramas
+        queue_size (int): Tamaño máximo de la cola de decodificación
+        drop_policy (str): 'drop_oldest' o 'block'. Por defecto 'drop_oldest'
+            en tiempo real y 'block' al procesar ficheros completos
+        realtime (bool): Ritmo de tiempo real. Por defecto solo para cámaras
+
+    Yields:
+        dict: frame_start, frame_end, timestamp_s, detections (PlateDetection),
+            success, error, dropped_frames
+    """
+    if realtime is None:
+        realtime = isinstance(source, int)
+    if drop_policy is None:
+        drop_policy = DROP_OLDEST if realtime else BLOCK
+    frame_stride = max(1, int(frame_stride))
+
+    cap = cv2.VideoCapture(source)
+    if not cap.isOpened():
+        raise IOError(f"No se pudo abrir la fuente de vídeo: {source}")
+
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    if fps <= 0:
+        fps = 30.0
+
+    frame_queue = FrameQueue(queue_size, drop_policy)
+    stop_event = threading.Event()
+    decoder = threading.Thread(
+        target=_decode_frames,
+        args=(cap, frame_queue, stop_event, frame_stride, fps, realtime),
+        daemon=True
+    )
+    decoder.start()
+
+    try:
+        while True:
+            item = frame_queue.get()
+            if item is None:
+                break
+
+            frame_index, timestamp_s, frame = item
+            result = detect_plates(frame, sensitivity)
+            yield {
+                'frame_start': frame_index,
+                'frame_end': frame_index + frame_stride - 1,
+                'timestamp_s': round(timestamp_s, 3),
+                'detections': result.detections,
+                'success': result.success,
+                'error': result.error,
+                'dropped_frames': frame_queue.dropped,
+            }
+    finally:
+        stop_event.set()
+        frame_queue.close()
+        decoder.join()
+        cap.release()
+
+
+def main(argv=None):
+    """Punto de entrada por línea de comandos"""
+    parser = argparse.ArgumentParser(
+        description="Detección de matrículas sobre vídeo o stream")
+    parser.add_argument('source', help="Fichero, URL o índice de cámara")
+    parser.add_argument('-s', '--sensitivity', type=float, default=0.5,
+                        help="Sensibilidad de detección (0.0 - 1.0)")
+    parser.add_argument('--stride', type=int, default=5,
+                        help="Procesar uno de cada N fotogramas")
+    parser.add_argument('--queue-size', type=int, default=8,
+                        help="Tamaño de la cola de decodificación")
+    parser.add_argument('--realtime', action='store_true',
+                        help="Ritmo de tiempo real con descarte de fotogramas antiguos")
+    args = parser.parse_args(argv)
+
+    source = int(args.source) if args.source.isdigit() else args.source
+    realtime = True if args.realtime else None
+
+    for detection in detect_plates_in_video(source, args.sensitivity, args.stride,
+                                            args.queue_size, realtime=realtime):
+        print(f"[{detection['timestamp_s']:8.3f}s] fotogramas "
+              f"{detection['frame_start']}-{detection['frame_end']} "
+              f"(descartados: {detection['dropped_frames']})")
+        if not detection['success']:
+            print(f"    • {detection['error']}")
+        for plate in detection['detections']:
+            print(f"    • {plate.box}: {plate.read}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
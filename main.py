@@ -6,9 +6,11 @@ Photo Enhancement Tool - Main Launcher
 This is the main entry point for the Photo Enhancement Tool application.
 It handles the complete application lifecycle:
 
-1. Shows a beautiful 60 FPS video splash screen
-2. Launches the main photo enhancement interface
-3. Handles errors gracefully
+1. Starts loading the detection models (Haar Cascades, EasyOCR) in the
+   background, so the first plate detection does not stall
+2. Shows a beautiful 60 FPS video splash screen
+3. Launches the main photo enhancement interface
+4. Handles errors gracefully
 
 Usage:
     python main.py
@@ -18,6 +20,7 @@ Author: Photo Enhancement Tool Team
 
 import sys
 import os
+import threading
 import traceback
 
 def check_dependencies():
@@ -47,6 +50,18 @@ def check_dependencies():
     
     return True
 
+def start_background_warmup():
+    """Load the detection models in the background while the splash plays"""
+    def warmup():
+        try:
+            # Importing DetectLicenseSimple also imports torch: keep it off the UI thread
+            from DetectLicenseSimple import start_model_warmup
+            start_model_warmup()
+        except Exception as e:
+            print(f"Background model loading failed: {e}")
+
+    threading.Thread(target=warmup, name='autolens-import', daemon=True).start()
+
 def launch_splash_screen():
     """Launch the splash screen with error handling"""
     try:
@@ -92,6 +107,9 @@ def main():
         input("\nPress Enter to exit...")
         sys.exit(1)
     
+    # Overlap model loading with the splash screen
+    start_background_warmup()
+    
     # Launch splash screen (which will then launch main app)
     launch_splash_screen()
 